@@ -0,0 +1,152 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+import database
+from connection_manager import close_connections, get_connection
+
+# database.py işlemlerinin asyncio karşılıkları.
+#
+#   async with AsyncDatabase() as db:
+#       await db.add_kisi("Ali", 3, "istanbul")
+#       sonuc = await db.search_malzeme_types("laptop")
+#
+# Yazmalar tek iş parçacıklı bir yürütücüde sırayla çalışır (tek yazar bağlantısı);
+# okumalar birkaç okuyucu iş parçacığına dağılır. connection_manager bağlantıları
+# iş parçacığı başına tuttuğu için her okuyucunun kendi bağlantısı olur; okuyucu
+# bağlantıları query_only açılır. Aynı anda bekleyen özdeş okumalar tek sorguda
+# birleştirilir ve sonuç tüm bekleyenlere aynı nesne olarak döner (değiştirmeyin).
+
+OKUMALAR = (
+    "get_all_kisiler", "get_kisi", "get_all_kategoriler", "get_all_malzeme_types",
+    "get_malzeme_types_sayfa", "count_malzeme_types", "search_malzeme_types",
+    "count_search_malzeme_types", "get_stickers", "get_zimmetli_malzemeler",
+    "get_sticker_stokkodu", "get_sticker_sahibi", "get_malzeme_fotograf", "get_kategoriler_sayilari",
+    "get_sticker_gecmisi", "get_kisi_gecmisi", "get_sticker_sahibi_tarihte", "get_zimmetler_tarihte",
+)
+
+YAZMALAR = (
+    "create_database", "add_kisi", "update_kisi", "delete_kisi_by_id", "add_kategori",
+    "add_stokkodlu_malzeme_tip", "update_malzeme_type", "delete_malzeme_type_complete",
+    "add_sticker_stokkodlutablo", "delete_last_sticker_stokkodlutablo",
+    "add_zimmetle_malzeme", "bulk_zimmetle", "delete_last_zimmet",
+    "update_varolana_yenizimmet", "bulk_transfer_zimmet", "transfer_kisi_zimmetleri",
+    "zimmet_anlik_goruntusu_al", "zimmet_anlik_goruntusu_gerekirse",
+    # Küçük resim henüz yoksa üretip kaydeder.
+    "get_malzeme_kucuk_resim",
+)
+
+_okuyucu = threading.local()
+
+def _salt_okunur_calistir(kaydet, fn, args, kwargs):
+    conn = get_connection(database.DB_PATH)
+    if getattr(_okuyucu, "conn", None) is not conn:
+        conn.execute("PRAGMA query_only = ON")
+        _okuyucu.conn = conn
+        kaydet(conn)
+    return fn(*args, **kwargs)
+
+def _okuma(ad):
+    fn = getattr(database, ad)
+    @functools.wraps(fn)
+    async def okuma(self, *args, **kwargs):
+        return await self._oku(fn, args, kwargs)
+    return okuma
+
+def _yazma(ad):
+    fn = getattr(database, ad)
+    @functools.wraps(fn)
+    async def yazma(self, *args, **kwargs):
+        return await self._yaz(fn, args, kwargs)
+    return yazma
+
+
+class AsyncDatabase:
+    def __init__(self, okuyucu_sayisi=None, bekleyen_sinir=None, birlestir=True):
+        self.okuyucu_sayisi = okuyucu_sayisi or config.ASYNC_OKUYUCU_SAYISI
+        bekleyen_sinir = bekleyen_sinir or config.ASYNC_BEKLEYEN_ISTEK_SINIRI
+        self.birlestir = birlestir
+        self._yazici = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-yazici")
+        self._okuyucular = ThreadPoolExecutor(max_workers=self.okuyucu_sayisi, thread_name_prefix="db-okuyucu")
+        # Kuyruklar sınırlı: sınır dolunca yeni istekler yer açılana kadar bekler.
+        self._yazma_sinir = asyncio.Semaphore(bekleyen_sinir)
+        self._okuma_sinir = asyncio.Semaphore(bekleyen_sinir)
+        self._suren_okumalar = {}
+        # Her tamamlanan yazmada artar. Birleştirme anahtarına girer; böylece bir
+        # istemci kendi yazmasından önce başlamış bir okumaya eklenmez.
+        self._yazma_nesli = 0
+        # Havuz iş parçacıklarının açtığı bağlantılar; kapat() bunları kapatır.
+        self._baglantilar = set()
+        self._baglanti_kilidi = threading.Lock()
+        self.istatistik = {"okuma": 0, "birlesen_okuma": 0, "yazma": 0}
+
+    async def _yaz(self, fn, args, kwargs):
+        async with self._yazma_sinir:
+            self.istatistik["yazma"] += 1
+            loop = asyncio.get_running_loop()
+            try:
+                return await loop.run_in_executor(self._yazici, self._yazicida, fn, args, kwargs)
+            finally:
+                self._yazma_nesli += 1
+
+    def _kaydet(self, conn):
+        with self._baglanti_kilidi:
+            self._baglantilar.add(conn)
+
+    def _yazicida(self, fn, args, kwargs):
+        self._kaydet(get_connection(database.DB_PATH))
+        return fn(*args, **kwargs)
+
+    async def _oku(self, fn, args, kwargs):
+        self.istatistik["okuma"] += 1
+        anahtar = None
+        if self.birlestir:
+            anahtar = (self._yazma_nesli, fn.__name__, args, tuple(sorted(kwargs.items())))
+            try:
+                hash(anahtar)
+            except TypeError:
+                anahtar = None
+        if anahtar is not None:
+            suren = self._suren_okumalar.get(anahtar)
+            if suren is not None:
+                self.istatistik["birlesen_okuma"] += 1
+                return await asyncio.shield(suren)
+        loop = asyncio.get_running_loop()
+        gorev = loop.create_task(self._okuyucuda(fn, args, kwargs))
+        if anahtar is not None:
+            self._suren_okumalar[anahtar] = gorev
+            gorev.add_done_callback(lambda _: self._suren_okumalar.pop(anahtar, None))
+        return await asyncio.shield(gorev)
+
+    async def _okuyucuda(self, fn, args, kwargs):
+        async with self._okuma_sinir:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._okuyucular, _salt_okunur_calistir,
+                                              self._kaydet, fn, args, kwargs)
+
+    async def aclose(self):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.kapat)
+
+    def kapat(self):
+        self._yazici.shutdown(wait=True)
+        self._okuyucular.shutdown(wait=True)
+        # İş parçacıkları bitti; bağlantıları connection_manager'da açık kalmasın.
+        with self._baglanti_kilidi:
+            baglantilar, self._baglantilar = list(self._baglantilar), set()
+        close_connections(baglantilar)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+
+for _ad in OKUMALAR:
+    setattr(AsyncDatabase, _ad, _okuma(_ad))
+for _ad in YAZMALAR:
+    setattr(AsyncDatabase, _ad, _yazma(_ad))
+del _ad
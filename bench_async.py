@@ -0,0 +1,90 @@
+# bench_async.py
+# async_database.AsyncDatabase'in eşzamanlı istemci sayısı arttıkça verdiği
+# toplam işlem hızını ölçer. Her istemci süre boyunca karışık iş yükü çalıştırır:
+#   - okumalar: get_kisi, get_zimmetli_malzemeler, get_sticker_sahibi ve
+#     sık tekrarlanan birkaç arama (birleştirmenin etkisi burada görülür)
+#   - yazmalar: update_varolana_yenizimmet ile rastgele sticker transferi
+# Çıktı: istemci sayısı başına işlem/sn, p50/p95 gecikme ve birleşen okuma sayısı.
+
+import os, time, random, asyncio, argparse, tempfile
+
+import database
+from async_database import AsyncDatabase
+from connection_manager import close_all
+
+ARAMALAR = ("name_it00", "name_it01", "genel", "it002")
+
+def hazirla(path, kisi_sayisi, malzeme_sayisi, sticker_adedi):
+    close_all()
+    for ek in ("", "-wal", "-shm"):
+        if os.path.exists(path + ek):
+            os.remove(path + ek)
+    database.DB_PATH = path
+    database.create_database()
+    for i in range(kisi_sayisi):
+        database.add_kisi(f"Person_{i}", random.randint(1, 10), "istanbul")
+    stickerlar = []
+    for i in range(malzeme_sayisi):
+        kod = f"IT{i:04d}"
+        database.add_stokkodlu_malzeme_tip(kod, f"Name_{kod}", "genel")
+        for sticker in database.add_sticker_stokkodlutablo(kod, sticker_adedi):
+            stickerlar.append((f"Person_{random.randrange(kisi_sayisi)}", sticker, f"Name_{kod}"))
+    database.bulk_zimmetle(stickerlar)
+    return [sticker for _, sticker, _ in stickerlar]
+
+async def istemci(db, bitis, stickerlar, kisi_sayisi, yazma_orani, gecikmeler):
+    def kisi():
+        return f"Person_{random.randrange(kisi_sayisi)}"
+    while time.perf_counter() < bitis:
+        t0 = time.perf_counter()
+        r = random.random()
+        if r < yazma_orani:
+            await db.update_varolana_yenizimmet(random.choice(stickerlar), kisi())
+        elif r < yazma_orani + 0.3:
+            await db.search_malzeme_types(random.choice(ARAMALAR))
+        elif r < yazma_orani + 0.5:
+            await db.get_zimmetli_malzemeler(kisi())
+        elif r < yazma_orani + 0.7:
+            await db.get_sticker_sahibi(random.choice(stickerlar))
+        else:
+            await db.get_kisi(kisi())
+        gecikmeler.append(time.perf_counter() - t0)
+
+async def kos(istemci_sayisi, sure, stickerlar, kisi_sayisi, yazma_orani, okuyucu, birlestir):
+    gecikmeler = []
+    async with AsyncDatabase(okuyucu_sayisi=okuyucu, birlestir=birlestir) as db:
+        bitis = time.perf_counter() + sure
+        await asyncio.gather(*(istemci(db, bitis, stickerlar, kisi_sayisi, yazma_orani, gecikmeler)
+                               for _ in range(istemci_sayisi)))
+        istatistik = dict(db.istatistik)
+    gecikmeler.sort()
+    def yuzdelik(p):
+        return gecikmeler[min(len(gecikmeler) - 1, int(len(gecikmeler) * p))] * 1000
+    return len(gecikmeler) / sure, yuzdelik(0.50), yuzdelik(0.95), istatistik
+
+def main():
+    ap = argparse.ArgumentParser(description="ERP-APP asyncio veri katmanı eşzamanlılık ölçümü")
+    ap.add_argument("--istemci", type=int, nargs="*", default=[1, 2, 4, 8, 16, 32])
+    ap.add_argument("--sure", type=float, default=3.0, help="İstemci sayısı başına süre (sn)")
+    ap.add_argument("--okuyucu", type=int, default=None, help="Okuyucu bağlantı sayısı")
+    ap.add_argument("--yazma-orani", type=float, default=0.2)
+    ap.add_argument("--birlestirme-yok", action="store_true", help="Özdeş okumaları birleştirme")
+    ap.add_argument("--kisi", type=int, default=200)
+    ap.add_argument("--malzeme", type=int, default=50)
+    ap.add_argument("--sticker", type=int, default=40, help="Malzeme başına sticker")
+    ap.add_argument("--db", default=os.path.join(tempfile.gettempdir(), "erp_bench_async.db"))
+    args = ap.parse_args()
+
+    random.seed(1234)
+    stickerlar = hazirla(args.db, args.kisi, args.malzeme, args.sticker)
+
+    print(f"{'istemci':>8}{'işlem/sn':>12}{'p50 (ms)':>10}{'p95 (ms)':>10}{'okuma':>9}{'birleşen':>10}{'yazma':>8}")
+    for n in args.istemci:
+        hiz, p50, p95, ist = asyncio.run(kos(n, args.sure, stickerlar, args.kisi, args.yazma_orani,
+                                             args.okuyucu, not args.birlestirme_yok))
+        print(f"{n:>8}{hiz:>12.0f}{p50:>10.2f}{p95:>10.2f}{ist['okuma']:>9}{ist['birlesen_okuma']:>10}{ist['yazma']:>8}")
+
+    close_all()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# bench_connection.py
+# Bağlantı yeniden kullanımının işlem başına kazandırdığı gecikmeyi ölçer.
+# Her işlem iki kez koşturulur:
+#   - "yeni":    her çağrıda sqlite3.connect (eski davranış, varsayılan PRAGMA'lar)
+#   - "yeniden": connection_manager'ın iş parçacığı başına tuttuğu bağlantı
+# Çıktı: işlem başına ortalama süre (µs) ve kazanılan süre.
+# Referans veri önbelleği (referans_onbellek) ölçüm sırasında kapatılır.
+
+import os, time, random, argparse, tempfile
+
+import config
+import database
+from connection_manager import close_all
+
+def hazirla(path, kisi_sayisi, malzeme_sayisi, sticker_adedi):
+    close_all()
+    for ek in ("", "-wal", "-shm"):
+        if os.path.exists(path + ek):
+            os.remove(path + ek)
+    database.DB_PATH = path
+    database.create_database()
+    for i in range(kisi_sayisi):
+        database.add_kisi(f"Person_{i}", random.randint(1, 10), "istanbul")
+    for i in range(malzeme_sayisi):
+        kod = f"IT{i:04d}"
+        database.add_stokkodlu_malzeme_tip(kod, f"Name_{kod}", "genel")
+        database.add_sticker_stokkodlutablo(kod, sticker_adedi)
+
+def islemler(kisi_sayisi, malzeme_sayisi):
+    def kisi():
+        return f"Person_{random.randrange(kisi_sayisi)}"
+    def kod():
+        return f"IT{random.randrange(malzeme_sayisi):04d}"
+    return {
+        "get_kisi":               lambda: database.get_kisi(kisi()),
+        "get_all_kisiler":        lambda: database.get_all_kisiler(),
+        "get_all_kategoriler":    lambda: database.get_all_kategoriler(),
+        "get_all_malzeme_types":  lambda: database.get_all_malzeme_types(),
+        "search_malzeme_types":   lambda: database.search_malzeme_types("name_it00"),
+        "get_stickers":           lambda: database.get_stickers(kod()),
+        "get_zimmetli_malzemeler": lambda: database.get_zimmetli_malzemeler(kisi()),
+        "get_sticker_stokkodu":   lambda: database.get_sticker_stokkodu(f"2000_{kod()}_000001"),
+    }
+
+def olc(fn, tekrar):
+    fn()  # ısınma
+    t0 = time.perf_counter()
+    for _ in range(tekrar):
+        fn()
+    return (time.perf_counter() - t0) / tekrar * 1_000_000
+
+def main():
+    ap = argparse.ArgumentParser(description="ERP-APP bağlantı yeniden kullanım ölçümü")
+    ap.add_argument("--tekrar", type=int, default=500, help="İşlem başına tekrar sayısı")
+    ap.add_argument("--kisi", type=int, default=200)
+    ap.add_argument("--malzeme", type=int, default=50)
+    ap.add_argument("--sticker", type=int, default=20, help="Malzeme başına sticker")
+    ap.add_argument("--db", default=os.path.join(tempfile.gettempdir(), "erp_bench_connection.db"))
+    args = ap.parse_args()
+
+    # Kişi/kategori listeleri referans önbelleğinden gelirse "yeniden" satırı
+    # bağlantıyı değil önbelleği ölçer; ölçüm boyunca önbellek kapalıdır.
+    config.REFERANS_ONBELLEK = False
+    random.seed(1234)
+    hazirla(args.db, args.kisi, args.malzeme, args.sticker)
+
+    print(f"{'işlem':<26}{'yeni (µs)':>12}{'yeniden (µs)':>14}{'kazanç (µs)':>13}{'hızlanma':>10}")
+    for ad, fn in islemler(args.kisi, args.malzeme).items():
+        config.SQLITE_BAGLANTI_YENIDEN_KULLAN = False
+        eski = olc(fn, args.tekrar)
+        config.SQLITE_BAGLANTI_YENIDEN_KULLAN = True
+        yeni = olc(fn, args.tekrar)
+        print(f"{ad:<26}{eski:>12.1f}{yeni:>14.1f}{eski - yeni:>13.1f}{eski / yeni:>9.1f}x")
+
+    close_all()
+
+if __name__ == "__main__":
+    main()
@@ -3,13 +3,15 @@
 # Her seferde yalnızca bir parametre değişir: {M, Ns, assigns, transfers}
 # Çıktılar: sweep_*.csv ve times_*.png, db_*.png grafikleri
 
-import os, csv, time, math, random, string, sqlite3, argparse
+import os, csv, time, math, random, string, sqlite3, argparse, tempfile
 import matplotlib
 matplotlib.use("Agg")  # GUI olmadan PNG kaydı
 import matplotlib.pyplot as plt
 
 HERE = os.path.abspath(os.path.dirname(__file__))
-DB_PATH = os.path.join(HERE, "erp_database.db")
+# Ölçüm veritabanı her koşuda silinip yeniden oluşturulur; uygulamanın
+# erp_database.db dosyasına dokunmamak için geçici klasörde tutulur.
+DB_PATH = os.path.join(tempfile.gettempdir(), "erp_bench_sensitivity.db")
 
 # ÇIKTI DOSYALARI
 def csv_path(param): return os.path.join(HERE, f"sweep_{param}.csv")
@@ -36,12 +38,21 @@ QUICK_SWEEPS = {
 # Opsiyonel hız ayarı (yalnızca benchmark için)
 PRAGMA_FAST = False
 
+# Zimmet fazı: "single" = sticker başına add_zimmetle_malzeme, "bulk" = bulk_zimmetle
+ASSIGN_MODE = "single"
+# Transfer fazı: "single" = sticker başına update_varolana_yenizimmet, "bulk" = bulk_transfer_zimmet
+TRANSFER_MODE = "single"
+
 # ------------------- DB hazırlık -------------------
 def reset_db(path=DB_PATH):
-    if os.path.exists(path):
-        os.remove(path)
-    from database import create_database
-    create_database()
+    import database
+    from connection_manager import close_all
+    close_all()  # açık bağlantılar silinen dosyayı tutmasın
+    for ek in ("", "-wal", "-shm"):
+        if os.path.exists(path + ek):
+            os.remove(path + ek)
+    database.DB_PATH = path
+    database.create_database()
 
 def open_conn():
     conn = sqlite3.connect(DB_PATH)
@@ -108,6 +119,10 @@ def call_assign(kisiisim, stickerkod, isim=None):
             continue
     raise
 
+def call_assign_bulk(satirlar):
+    from database import bulk_zimmetle
+    return bulk_zimmetle(satirlar)
+
 def call_transfer(stickerkod, yeni_kisi):
     from database import update_varolana_yenizimmet
     for args in [
@@ -120,6 +135,10 @@ def call_transfer(stickerkod, yeni_kisi):
             continue
     raise
 
+def call_transfer_bulk(ciftler):
+    from database import bulk_transfer_zimmet
+    return bulk_transfer_zimmet(ciftler)
+
 # ------------------- Tek koşu -------------------
 def bench_case(M, Ns, assigns, transfers):
     """
@@ -165,24 +184,32 @@ def bench_case(M, Ns, assigns, transfers):
 
     # 4) Zimmet
     t2 = time.perf_counter()
-    for s in stickers:
-        kisi = random.choice(people)
-        try:
-            stock_from_code = s.split('_')[1]
-            call_assign(kisi, s, f"Name_{stock_from_code}")
-        except Exception:
-            call_assign(kisi, s)
+    if ASSIGN_MODE == "bulk":
+        call_assign_bulk((random.choice(people), s, f"Name_{s.split('_')[1]}") for s in stickers)
+    else:
+        for s in stickers:
+            kisi = random.choice(people)
+            try:
+                stock_from_code = s.split('_')[1]
+                call_assign(kisi, s, f"Name_{stock_from_code}")
+            except Exception:
+                call_assign(kisi, s)
     t3 = time.perf_counter()
 
     # 5) Transfer
     t4 = time.perf_counter()
-    for s in random.sample(stickers, min(transfers_eff, len(stickers))):
-        call_transfer(s, random.choice(people))
+    secilen = random.sample(stickers, min(transfers_eff, len(stickers)))
+    if TRANSFER_MODE == "bulk":
+        call_transfer_bulk([(s, random.choice(people)) for s in secilen])
+    else:
+        for s in secilen:
+            call_transfer(s, random.choice(people))
     t5 = time.perf_counter()
 
     conn.close()
     return {
         "M": M, "Ns": Ns, "assigns": assigns_eff, "transfers": transfers_eff,
+        "assign_mode": ASSIGN_MODE, "transfer_mode": TRANSFER_MODE,
         "t_create_stickers_s": round(t1 - t0, 4),
         "t_assign_s": round(t3 - t2, 4),
         "t_transfer_s": round(t5 - t4, 4),
@@ -252,15 +279,24 @@ def sweep(param, values, baseline):
 
 # ------------------- CLI -------------------
 def main():
-    global PRAGMA_FAST
+    global PRAGMA_FAST, ASSIGN_MODE, TRANSFER_MODE
     ap = argparse.ArgumentParser(description="ERP-APP Tek Parametre Duyarlılık Analizi")
     ap.add_argument("--quick", action="store_true", help="Küçük hızlı taramalar")
     ap.add_argument("--fast-pragma", action="store_true", help="Benchmark hız PRAGMA'ları (yalnızca test)")
+    ap.add_argument("--assign-mode", choices=["single", "bulk"], default="single",
+                    help="Zimmet fazı: tek tek add_zimmetle_malzeme veya bulk_zimmetle")
+    ap.add_argument("--transfer-mode", choices=["single", "bulk"], default="single",
+                    help="Transfer fazı: tek tek update_varolana_yenizimmet veya bulk_transfer_zimmet")
     ap.add_argument("--only", nargs="*", choices=["M","Ns","assigns","transfers"],
                     help="Sadece bu parametre(ler)i tara")
+    ap.add_argument("--seed", type=int, default=1234, help="Rastgele veri tohumu")
     args = ap.parse_args()
 
+    random.seed(args.seed)
+
     PRAGMA_FAST = bool(args.fast_pragma)
+    ASSIGN_MODE = args.assign_mode
+    TRANSFER_MODE = args.transfer_mode
     sweeps = QUICK_SWEEPS if args.quick else DEFAULT_SWEEPS
 
     todo = args.only if args.only else ["M","Ns","assigns","transfers"]
@@ -0,0 +1,131 @@
+# bench_startup.py
+# Uygulamanın açılış maliyetini ölçer:
+#   - içe aktarma profili: "python -X importtime -c 'import main'" çıktısından
+#     en pahalı modüller (kümülatif) ve toplam içe aktarma süresi
+#   - ilk boyamaya kadar geçen süre: her koşu yeni bir Python süreci başlatır,
+#     main.baslat() ile pencereyi açar ve ana pencerenin ilk paint olayında durur.
+#     İlk koşu boş veritabanında (şema oluşturulur), sonrakiler hazır veritabanında çalışır.
+# Ölçüm geçici bir veritabanında yapılır; erp_database.db'ye dokunulmaz.
+
+import os, sys, json, time, argparse, tempfile, statistics, subprocess
+
+HERE = os.path.abspath(os.path.dirname(__file__))
+
+COCUK = r"""
+import os, sys, time, json
+baslangic = float(os.environ["ERP_BENCH_BASLANGIC"])
+isaretler = {"python": time.time() - baslangic}
+sys.path.insert(0, os.environ["ERP_BENCH_KOK"])
+import database
+database.DB_PATH = os.environ["ERP_BENCH_DB"]
+import main
+isaretler["import"] = time.time() - baslangic
+
+_create_database = main.create_database
+def create_database():
+    t0 = time.time()
+    try:
+        return _create_database()
+    finally:
+        isaretler["create_database_ms"] = (time.time() - t0) * 1000
+main.create_database = create_database
+
+from PyQt5.QtCore import QObject, QEvent, QTimer
+
+class IlkBoyama(QObject):
+    def eventFilter(self, nesne, olay):
+        if olay.type() == QEvent.Paint and "ilk_boyama" not in isaretler:
+            isaretler["ilk_boyama"] = time.time() - baslangic
+            QTimer.singleShot(0, app.quit)
+        return False
+
+app, pencere = main.baslat(sys.argv[:1])
+isaretler["pencere"] = time.time() - baslangic
+filtre = IlkBoyama()
+pencere.installEventFilter(filtre)
+pencere.update()
+QTimer.singleShot(10000, app.quit)
+app.exec_()
+print(json.dumps(isaretler))
+"""
+
+def import_profili(ilk=15):
+    """-X importtime çıktısını ayrıştırır. Dönüş: (toplam_ms, [(modül, kümülatif_ms, kendi_ms)])"""
+    sonuc = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"],
+                           cwd=HERE, capture_output=True, text=True,
+                           env=dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen")))
+    satirlar = []
+    toplam_us = 0
+    for satir in sonuc.stderr.splitlines():
+        if not satir.startswith("import time:") or "self [us]" in satir:
+            continue
+        kendi, kumulatif, ad = satir[len("import time:"):].split("|")
+        toplam_us += int(kendi)
+        satirlar.append((ad.rstrip(), int(kumulatif) / 1000, int(kendi) / 1000))
+    # Girinti iç içeliği gösterir ve alt modüller üst modülden önce yazılır: "main"
+    # satırından hemen önceki blok onun içe aktardıklarıdır. Bu bloktaki 1. ve 2.
+    # düzey modüller (girintileriyle) kümülatif süreye göre sıralanır.
+    ust, blok = [], []
+    for ad, kum, kendi in satirlar:
+        derinlik = (len(ad) - len(ad.lstrip())) // 2
+        if derinlik == 0:
+            if ad.strip() == "main":
+                ust = blok
+            blok = []
+        elif derinlik <= 2:
+            blok.append((ad[1:], kum, kendi))
+    ust.sort(key=lambda s: s[1], reverse=True)
+    yuklenen = {ad.strip() for ad, _, _ in satirlar}
+    return toplam_us / 1000, ust[:ilk], yuklenen
+
+def ilk_boyama(db, offscreen):
+    env = dict(os.environ, ERP_BENCH_KOK=HERE, ERP_BENCH_DB=db)
+    if offscreen:
+        env["QT_QPA_PLATFORM"] = "offscreen"
+    env["ERP_BENCH_BASLANGIC"] = repr(time.time())
+    sonuc = subprocess.run([sys.executable, "-c", COCUK], cwd=HERE, env=env, capture_output=True, text=True)
+    son_satir = sonuc.stdout.strip().splitlines()[-1:]
+    if sonuc.returncode != 0 or not son_satir:
+        raise RuntimeError(f"Alt süreç başarısız:\n{sonuc.stderr}")
+    return json.loads(son_satir[0])
+
+def main():
+    ap = argparse.ArgumentParser(description="ERP-APP açılış süresi ölçümü")
+    ap.add_argument("--tekrar", type=int, default=5, help="Hazır veritabanıyla açılış sayısı")
+    ap.add_argument("--ilk", type=int, default=15, help="Profilde gösterilecek modül sayısı")
+    ap.add_argument("--ekranli", action="store_true", help="Gerçek ekranda aç (varsayılan: offscreen)")
+    ap.add_argument("--cikti", help="Sonuçların yazılacağı JSON dosyası")
+    args = ap.parse_args()
+
+    toplam_ms, ust, yuklenen = import_profili(args.ilk)
+    print(f"İçe aktarma toplamı: {toplam_ms:.1f} ms ({len(yuklenen)} modül)")
+    print(f"{'modül':<40}{'kümülatif ms':>14}{'kendi ms':>10}")
+    for ad, kum, kendi in ust:
+        print(f"{ad:<40}{kum:>14.1f}{kendi:>10.1f}")
+    ertelenen = [m for m in ("PIL", "ekle_duzenle", "zimmetle", "zimmetleyeni", "sorgu_izleme") if m not in yuklenen]
+    print(f"Açılışta yüklenmeyen: {', '.join(ertelenen) or '-'}")
+
+    with tempfile.TemporaryDirectory(prefix="erp_bench_startup_") as klasor:
+        db = os.path.join(klasor, "erp_database.db")
+        soguk = ilk_boyama(db, not args.ekranli)
+        sicak = [ilk_boyama(db, not args.ekranli) for _ in range(args.tekrar)]
+
+    def ortanca(alan):
+        return statistics.median(k[alan] for k in sicak) * 1000
+    print()
+    print(f"{'aşama (ms, süreç başından)':<32}{'boş db':>10}{'hazır db':>10}")
+    for alan, ad in (("python", "yorumlayıcı"), ("import", "import main"),
+                     ("pencere", "pencere gösterildi"), ("ilk_boyama", "ilk boyama")):
+        print(f"{ad:<32}{soguk[alan] * 1000:>10.1f}{ortanca(alan):>10.1f}")
+    print(f"{'create_database':<32}{soguk['create_database_ms']:>10.1f}"
+          f"{statistics.median(k['create_database_ms'] for k in sicak):>10.1f}")
+
+    if args.cikti:
+        with open(args.cikti, "w", encoding="utf-8") as f:
+            json.dump({"import_toplam_ms": toplam_ms,
+                       "import_ust": [{"modul": a, "kumulatif_ms": k, "kendi_ms": s} for a, k, s in ust],
+                       "bos_db": soguk, "hazir_db": sicak,
+                       "ilk_boyama_ms": ortanca("ilk_boyama")}, f, ensure_ascii=False, indent=2)
+
+if __name__ == "__main__":
+    main()
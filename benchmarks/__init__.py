@@ -0,0 +1,5 @@
+# ERP-APP ölçüm paketi.
+#   python -m benchmarks --cikti sonuc.json
+#   python -m benchmarks --karsilastir baseline.json --esik 0.25
+# Senaryolar senaryolar.py'de, çalıştırıcı ve yüzdelikler olcum.py'de,
+# sabit tohumlu veri seti ve geçici veritabanı ortam.py'dedir.
@@ -0,0 +1,71 @@
+import sys
+import json
+import argparse
+
+import sorgu_izleme
+from .ortam import Ortam, OLCEKLER
+from .senaryolar import SENARYOLAR
+from .olcum import senaryo_kos, meta, karsilastir
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m benchmarks", description="ERP-APP ölçüm paketi")
+    ap.add_argument("--senaryo", nargs="*", choices=sorted(SENARYOLAR), help="Yalnızca bu senaryolar")
+    ap.add_argument("--olcek", choices=sorted(OLCEKLER), default="orta", help="Veri seti büyüklüğü")
+    ap.add_argument("--tekrar", type=int, default=5, help="Senaryo başına tekrar")
+    ap.add_argument("--adet", type=int, default=None, help="Koşu başına işlem sayısı (varsayılan: senaryoya göre)")
+    ap.add_argument("--tohum", type=int, default=1234)
+    ap.add_argument("--cikti", help="Sonuçların yazılacağı JSON dosyası")
+    ap.add_argument("--karsilastir", metavar="BASELINE", help="Karşılaştırılacak baseline JSON dosyası")
+    ap.add_argument("--esik", type=float, default=0.25, help="İzin verilen gerileme oranı (0.25 = %%25)")
+    ap.add_argument("--min-fark-ms", type=float, default=0.05, help="p95 için en küçük anlamlı fark")
+    ap.add_argument("--sorgu-izleme", metavar="DOSYA",
+                    help="Senaryolardaki SQL ifadelerini ölçüp bu JSON dosyasına yazar "
+                         "(ölçüm ek yük getirir; karşılaştırma için kullanmayın)")
+    args = ap.parse_args(argv)
+
+    ortam = Ortam(args.olcek, args.tohum)
+    try:
+        print(f"Veri seti hazırlanıyor ({args.olcek}, tohum={args.tohum})...", file=sys.stderr)
+        ortam.hazirla()
+        if args.sorgu_izleme:
+            sorgu_izleme.etkinlestir()
+            sorgu_izleme.sifirla()
+        sonuc = {"meta": meta(ortam, args.tekrar), "senaryolar": {}}
+        print(f"{'senaryo':<26}{'işlem/sn':>11}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}", file=sys.stderr)
+        for ad in args.senaryo or list(SENARYOLAR):
+            olcum = senaryo_kos(ortam, ad, args.tekrar, args.adet)
+            sonuc["senaryolar"][ad] = olcum
+            if olcum is None:
+                print(f"{ad:<26}{'atlandı':>11}", file=sys.stderr)
+                continue
+            print(f"{ad:<26}{olcum['islem_per_sn']:>11.1f}{olcum['p50_ms']:>10.3f}"
+                  f"{olcum['p95_ms']:>10.3f}{olcum['p99_ms']:>10.3f}", file=sys.stderr)
+    finally:
+        ortam.kapat()
+    if args.sorgu_izleme:
+        sorgu_izleme.json_yaz(args.sorgu_izleme)
+
+    metin = json.dumps(sonuc, ensure_ascii=False, indent=2)
+    if args.cikti:
+        with open(args.cikti, "w", encoding="utf-8") as f:
+            f.write(metin + "\n")
+    else:
+        print(metin)
+
+    if args.karsilastir:
+        with open(args.karsilastir, encoding="utf-8") as f:
+            baseline = json.load(f)
+        satirlar, gerileme = karsilastir(sonuc, baseline, args.esik, args.min_fark_ms)
+        print(f"\n{'senaryo':<26}{'p95 oranı':>11}{'hız oranı':>11}  durum", file=sys.stderr)
+        for ad, p95_orani, hiz_orani, durum in satirlar:
+            if p95_orani is None:
+                print(f"{ad:<26}{'-':>11}{'-':>11}  {durum}", file=sys.stderr)
+            else:
+                print(f"{ad:<26}{p95_orani:>11.2f}{hiz_orani:>11.2f}  {durum}", file=sys.stderr)
+        if gerileme:
+            print(f"Gerileme: eşik %{args.esik * 100:.0f} aşıldı.", file=sys.stderr)
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+import gc
+import time
+import random
+import platform
+import sqlite3
+import datetime
+
+import database
+from .ortam import sessiz
+from .senaryolar import SENARYOLAR
+
+# Bundan az işlemli koşularda p95 karşılaştırmada kullanılmaz.
+P95_MIN_ISLEM = 100
+
+def yuzdelik(sirali, p):
+    """Sıralı listede en yakın sıra yöntemiyle p (0-1) yüzdeliği."""
+    if not sirali:
+        return 0.0
+    return sirali[min(len(sirali) - 1, max(0, int(round(p * len(sirali))) - 1))]
+
+def _ortanca(degerler):
+    sirali = sorted(degerler)
+    orta = len(sirali) // 2
+    return sirali[orta] if len(sirali) % 2 else (sirali[orta - 1] + sirali[orta]) / 2
+
+def senaryo_kos(ortam, ad, tekrar, adet=None):
+    """Senaryoyu tekrar kez, her seferinde şablonun taze kopyasında çalıştırır.
+
+    Yüzdelikler her koşu için ayrı hesaplanır ve koşuların ortancası raporlanır;
+    tek bir gürültülü koşu sonucu kaydırmaz.
+    """
+    fn, varsayilan_adet = SENARYOLAR[ad]
+    adet = adet or varsayilan_adet
+    ms = 1000.0
+    kosular = []
+    for kosu in range(tekrar):
+        ortam.calisma_kopyasi()
+        # Aynı tohum: her tekrar aynı iş yükünü çalıştırır, fark yalnızca ölçüm gürültüsüdür.
+        rng = random.Random(f"{ortam.tohum}:{ad}")
+        islemler = fn(ortam.veri, rng, adet)
+        if not islemler:
+            return None
+        with sessiz():
+            # Bağlantıyı açıp şemayı yükler; ilk işlem bu maliyeti taşımasın.
+            database.count_malzeme_types()
+        gc.collect()
+        sureler = []
+        with sessiz():
+            for islem in islemler:
+                t0 = time.perf_counter()
+                islem()
+                sureler.append(time.perf_counter() - t0)
+        sirali = sorted(sureler)
+        kosular.append({
+            "islem_per_sn": len(sureler) / sum(sureler),
+            "ortalama_ms": sum(sureler) / len(sureler) * ms,
+            "p50_ms": yuzdelik(sirali, 0.50) * ms,
+            "p95_ms": yuzdelik(sirali, 0.95) * ms,
+            "p99_ms": yuzdelik(sirali, 0.99) * ms,
+            "en_uzun_ms": sirali[-1] * ms,
+            "islem": len(sureler),
+        })
+    sonuc = {"islem": sum(k["islem"] for k in kosular), "tekrar": tekrar}
+    for alan in ("islem_per_sn", "ortalama_ms", "p50_ms", "p95_ms", "p99_ms", "en_uzun_ms"):
+        sonuc[alan] = round(_ortanca([k[alan] for k in kosular]), 4)
+    sonuc["kosu_islem_per_sn"] = [round(k["islem_per_sn"], 1) for k in kosular]
+    return sonuc
+
+def meta(ortam, tekrar):
+    return {
+        "tarih": datetime.datetime.now().isoformat(timespec="seconds"),
+        "olcek": ortam.olcek,
+        "parametreler": ortam.parametreler,
+        "tohum": ortam.tohum,
+        "tekrar": tekrar,
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+    }
+
+def karsilastir(sonuc, baseline, esik, min_fark_ms=0.05):
+    """Her senaryo için p95 ve işlem/sn'yi baseline ile karşılaştırır.
+
+    p95, baseline'ın (1 + esik) katını ve en az min_fark_ms kadar aşarsa ya da
+    işlem/sn (1 - esik) katının altına düşerse gerileme sayılır. Koşu başına
+    P95_MIN_ISLEM'den az işlem varsa p95 birkaç örnekten ibarettir ve yalnızca
+    raporlanır; karar işlem/sn'ye göre verilir.
+    Dönüş: (satırlar, gerileme_var_mi)
+    """
+    satirlar, gerileme = [], False
+    for ad, yeni in sonuc["senaryolar"].items():
+        eski = baseline.get("senaryolar", {}).get(ad)
+        if not yeni or not eski:
+            satirlar.append((ad, None, None, "baseline yok"))
+            continue
+        p95_orani = yeni["p95_ms"] / eski["p95_ms"] if eski["p95_ms"] else 1.0
+        hiz_orani = yeni["islem_per_sn"] / eski["islem_per_sn"] if eski["islem_per_sn"] else 1.0
+        p95_gecerli = yeni["islem"] / yeni["tekrar"] >= P95_MIN_ISLEM
+        kotu = ((p95_gecerli and p95_orani > 1 + esik and yeni["p95_ms"] - eski["p95_ms"] >= min_fark_ms)
+                or hiz_orani < 1 - esik)
+        gerileme = gerileme or kotu
+        satirlar.append((ad, p95_orani, hiz_orani, "GERİLEME" if kotu else "ok"))
+    return satirlar, gerileme
@@ -0,0 +1,124 @@
+import os
+import io
+import random
+import logging
+import shutil
+import tempfile
+import contextlib
+
+import database
+import thumbnails
+from connection_manager import close_all, get_connection
+
+# Ölçümler her zaman geçici bir klasördeki veritabanında çalışır; uygulamanın
+# erp_database.db dosyasına dokunulmaz. Veri seti bir kez, sabit tohumla
+# "şablon" veritabanına yazılır; her senaryo koşusu şablonun kopyasıyla başlar.
+
+OLCEKLER = {
+    "kucuk":  dict(kisi=50,  malzeme=20,  sticker=20, zimmet_orani=0.5, fotograf=5),
+    "orta":   dict(kisi=200, malzeme=100, sticker=50, zimmet_orani=0.5, fotograf=20),
+    "buyuk":  dict(kisi=1000, malzeme=500, sticker=100, zimmet_orani=0.5, fotograf=50),
+}
+
+SUBELER = ("ankara merkez", "ankara ek", "istanbul")
+KATEGORILER = ("elektronik", "mobilya", "kırtasiye", "bilgisayar", "ışıklandırma")
+
+
+@contextlib.contextmanager
+def sessiz():
+    """Ölçüm süresince database.py günlük kayıtlarını (beklenen uyarılar dahil) kapatır."""
+    logging.disable(logging.CRITICAL)
+    try:
+        yield
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+def _fotograf(rng, i):
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    renk = (rng.randrange(256), rng.randrange(256), rng.randrange(256))
+    resim = Image.new("RGB", (1200 + (i % 5) * 100, 900), renk)
+    cikti = io.BytesIO()
+    resim.save(cikti, "JPEG", quality=90)
+    return cikti.getvalue()
+
+
+class Ortam:
+    """Geçici klasör, şablon veritabanı ve şablondaki veri setinin özeti."""
+
+    def __init__(self, olcek="orta", tohum=1234, klasor=None):
+        self.olcek = olcek
+        self.tohum = tohum
+        self.parametreler = OLCEKLER[olcek]
+        self._gecici = None if klasor else tempfile.TemporaryDirectory(prefix="erp_bench_")
+        self.klasor = klasor or self._gecici.name
+        self.sablon = os.path.join(self.klasor, "sablon.db")
+        self.calisma = os.path.join(self.klasor, "calisma.db")
+        self.veri = None
+
+    def hazirla(self):
+        rng = random.Random(self.tohum)
+        p = self.parametreler
+        self._sil(self.sablon)
+        database.DB_PATH = self.sablon
+        with sessiz():
+            database.create_database()
+            kisiler = [f"Kisi_{i:05d}" for i in range(p["kisi"])]
+            for isim in kisiler:
+                database.add_kisi(isim, rng.randint(1, 10), rng.choice(SUBELER))
+            malzemeler, fotografli, stickerlar = [], [], []
+            foto_klasoru = os.path.join(self.klasor, "fotograflar")
+            os.makedirs(foto_klasoru, exist_ok=True)
+            for i in range(p["malzeme"]):
+                kod = f"BM{i:05d}"
+                foto_yolu = None
+                if i < p["fotograf"]:
+                    veri = _fotograf(rng, i)
+                    if veri:
+                        foto_yolu = os.path.join(foto_klasoru, f"{kod}.jpg")
+                        with open(foto_yolu, "wb") as f:
+                            f.write(veri)
+                        fotografli.append(kod)
+                database.add_stokkodlu_malzeme_tip(kod, f"Malzeme {kod} {rng.choice(KATEGORILER)}",
+                                                   rng.choice(KATEGORILER), foto_yolu)
+                malzemeler.append(kod)
+                for sticker in database.add_sticker_stokkodlutablo(kod, p["sticker"]) or []:
+                    stickerlar.append((sticker, f"Malzeme {kod}"))
+            rng.shuffle(stickerlar)
+            zimmet_adedi = int(len(stickerlar) * p["zimmet_orani"])
+            zimmetler = [(rng.choice(kisiler), sticker, isim) for sticker, isim in stickerlar[:zimmet_adedi]]
+            database.bulk_zimmetle(zimmetler)
+        conn = get_connection(self.sablon)
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        close_all()
+        self.veri = {
+            "kisiler": kisiler,
+            "malzemeler": malzemeler,
+            "fotografli": fotografli,
+            "zimmetli": [(kisi, sticker) for kisi, sticker, _ in zimmetler],
+            "bos": [sticker for sticker, _ in stickerlar[zimmet_adedi:]],
+            "sticker_isim": dict(stickerlar),
+        }
+        return self
+
+    def calisma_kopyasi(self):
+        """Şablonun taze bir kopyasını açar; DB_PATH ona yönlendirilir."""
+        close_all()
+        thumbnails.onbellek.clear()
+        self._sil(self.calisma)
+        shutil.copyfile(self.sablon, self.calisma)
+        database.DB_PATH = self.calisma
+        return self.calisma
+
+    def _sil(self, yol):
+        for ek in ("", "-wal", "-shm"):
+            if os.path.exists(yol + ek):
+                os.remove(yol + ek)
+
+    def kapat(self):
+        close_all()
+        if self._gecici is not None:
+            self._gecici.cleanup()
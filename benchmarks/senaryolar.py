@@ -0,0 +1,107 @@
+import database
+import thumbnails
+
+# Adlandırılmış senaryolar. Her senaryo, veri setinden ve tohumlu rng'den
+# ölçülecek işlemlerin listesini (argümansız çağrılabilirler) üretir; argüman
+# hazırlığı ölçüme girmez. adet, bir koşudaki işlem sayısıdır.
+
+SENARYOLAR = {}
+
+def senaryo(ad, adet):
+    def kaydet(fn):
+        SENARYOLAR[ad] = (fn, adet)
+        return fn
+    return kaydet
+
+
+@senaryo("create_malzeme", 200)
+def create_malzeme(veri, rng, adet):
+    return [lambda i=i: database.add_stokkodlu_malzeme_tip(f"YN{i:05d}", f"Yeni malzeme {i}", "elektronik")
+            for i in range(adet)]
+
+@senaryo("create_sticker", 200)
+def create_sticker(veri, rng, adet):
+    kodlar = [rng.choice(veri["malzemeler"]) for _ in range(adet)]
+    return [lambda kod=kod: database.add_sticker_stokkodlutablo(kod, 1) for kod in kodlar]
+
+@senaryo("assign", 500)
+def assign(veri, rng, adet):
+    stickerlar = veri["bos"][:adet]
+    return [lambda s=s, k=rng.choice(veri["kisiler"]): database.add_zimmetle_malzeme(k, s, veri["sticker_isim"][s])
+            for s in stickerlar]
+
+@senaryo("assign_bulk", 10)
+def assign_bulk(veri, rng, adet):
+    # Her işlem 100 satırlık bir toplu zimmet.
+    bos = veri["bos"]
+    parcalar = [[(rng.choice(veri["kisiler"]), s, veri["sticker_isim"][s]) for s in bos[i * 100:(i + 1) * 100]]
+                for i in range(min(adet, len(bos) // 100))]
+    return [lambda satirlar=satirlar: database.bulk_zimmetle(satirlar) for satirlar in parcalar]
+
+@senaryo("transfer", 500)
+def transfer(veri, rng, adet):
+    ciftler = [(rng.choice(veri["zimmetli"])[1], rng.choice(veri["kisiler"])) for _ in range(adet)]
+    return [lambda s=s, k=k: database.update_varolana_yenizimmet(s, k) for s, k in ciftler]
+
+@senaryo("transfer_bulk", 10)
+def transfer_bulk(veri, rng, adet):
+    return [lambda ciftler=[(rng.choice(veri["zimmetli"])[1], rng.choice(veri["kisiler"])) for _ in range(100)]:
+                database.bulk_transfer_zimmet(ciftler)
+            for _ in range(adet)]
+
+@senaryo("search", 500)
+def search(veri, rng, adet):
+    terimler = ["bm000", "malzeme", "ışık", "isik", "elektronik", "mob", "kırtasiye", "BM0001", "bilg", "xyz"]
+    return [lambda t=rng.choice(terimler): database.search_malzeme_types(t) for _ in range(adet)]
+
+@senaryo("list_page", 500)
+def list_page(veri, rng, adet):
+    kolonlar = ("isim", "stokkodu", "kategori")
+    return [lambda k=rng.choice(kolonlar), a=rng.random() < 0.5: database.get_malzeme_types_sayfa(k, a)
+            for _ in range(adet)]
+
+@senaryo("list_all", 50)
+def list_all(veri, rng, adet):
+    return [database.get_all_malzeme_types for _ in range(adet)]
+
+@senaryo("get_zimmetli_malzemeler", 500)
+def get_zimmetli_malzemeler(veri, rng, adet):
+    return [lambda k=rng.choice(veri["kisiler"]): database.get_zimmetli_malzemeler(k) for _ in range(adet)]
+
+@senaryo("photo_thumbnail", 200)
+def photo_thumbnail(veri, rng, adet):
+    # Bellek önbelleği her işlemden önce boşaltılır: veritabanından okuma ölçülür.
+    def getir(kod, boyut):
+        thumbnails.onbellek.clear()
+        return database.get_malzeme_kucuk_resim(kod, boyut)
+    if not veri["fotografli"]:
+        return []
+    return [lambda k=rng.choice(veri["fotografli"]), b=rng.choice((100, 400, 1000)): getir(k, b)
+            for _ in range(adet)]
+
+@senaryo("photo_full", 200)
+def photo_full(veri, rng, adet):
+    if not veri["fotografli"]:
+        return []
+    return [lambda k=rng.choice(veri["fotografli"]): database.get_malzeme_fotograf(k) for _ in range(adet)]
+
+@senaryo("kisi_crud", 200)
+def kisi_crud(veri, rng, adet):
+    # Her işlem bir kişiyi ekler, günceller, okur ve siler.
+    def dongu(i):
+        isim = f"Gecici_{i:05d}"
+        kisi_id = database.add_kisi(isim, 1, "istanbul")
+        database.update_kisi(kisi_id, yeni_bulunankat=2)
+        database.get_kisi(isim)
+        database.delete_kisi_by_id(kisi_id, isim)
+    return [lambda i=i: dongu(i) for i in range(adet)]
+
+@senaryo("delete_zimmet", 200)
+def delete_zimmet(veri, rng, adet):
+    sahipler = sorted({kisi for kisi, _ in veri["zimmetli"]})
+    return [lambda k=rng.choice(sahipler): database.delete_last_zimmet(k) for _ in range(adet)]
+
+@senaryo("delete_malzeme", 50)
+def delete_malzeme(veri, rng, adet):
+    kodlar = rng.sample(veri["malzemeler"], min(adet, len(veri["malzemeler"])))
+    return [lambda k=k: database.delete_malzeme_type_complete(k) for k in kodlar]
@@ -0,0 +1,274 @@
+import re
+import sys
+import json
+import random
+import sqlite3
+import argparse
+
+import database
+import envanter
+import sorgu_izleme
+from connection_manager import close_all, get_connection
+from .ortam import Ortam, OLCEKLER, sessiz
+from .senaryolar import SENARYOLAR
+
+# Sorgu planı denetimi. Ölçüm senaryolarını ve senaryolarda olmayan birkaç okuma
+# yolunu küçük adetle çalıştırır, çalışan her SQL ifadesini yakalar ve ifade
+# biçimi (parmak izi) başına bir kez EXPLAIN QUERY PLAN alır. Büyük bir tabloda
+# indekssiz tam tarama (SCAN t) ya da sıralama için geçici B-ağacı (USE TEMP
+# B-TREE) görülürse ihlal sayılır; bilinçli istisnalar IZINLI listesindedir.
+#
+#   python -m benchmarks.sorgu_plani [--olcek orta] [--cikti plan.json]
+#
+# Çıkış kodu ihlal ya da planlanamayan ifade varsa 1'dir; yeni bir sorgu ya da
+# indeks değişikliği sonrasında çalıştırılır.
+
+# Satır sayısı veriyle büyümeyen tablolar; bunlarda tarama sorun değildir.
+KUCUK_TABLOLAR = {"kategoriler", "sticker_sayaclari", "malzemetypes_fts_config",
+                  "kategori_sayaclari", "konum_sayaclari",
+                  "sqlite_master", "sqlite_schema", "sqlite_sequence"}
+
+# (tablo, parmak izinde geçen metin, gerekçe). İzin yalnızca ifade o tabloyu
+# okuyor ya da yazıyorsa geçerlidir; stok_? malzeme başına sticker tablolarıdır.
+IZINLI = (
+    ("malzemetypes", "FROM malzemetypes ORDER BY isim",
+     "get_all_malzeme_types tüm kataloğu döndürür; idx_malzemetypes_isim ile sırayla okunur"),
+    ("stok_?", "SELECT id, stickerkod FROM stok_? ORDER BY id DESC LIMIT ?",
+     "son sticker rowid sırasının sonundan okunur; tarama ilk satırda durur"),
+    ("zimmet_anlik_goruntuleri", "FROM zimmet_anlik_goruntuleri ORDER BY id DESC LIMIT ?",
+     "en son anlık görüntü rowid sırasının sonundan okunur; tarama ilk satırda durur"),
+    ("stok_?", "UPDATE stok_? SET isim = ?",
+     "malzeme adı değişince o malzemenin bütün stickerları güncellenir"),
+    ("malzemetypes_fts", "MATCH ? ORDER BY",
+     "arama sonuçları sıralanır; sıralanan küme yalnızca eşleşen satırlardır"),
+    ("malzemetypes", "LIKE ? ESCAPE",
+     "FTS5 olmayan kurulumlarda arama LIKE ile yapılır ve tarama kaçınılmazdır"),
+    ("malzemetypes_fts", "DELETE FROM malzemetypes_fts",
+     "rebuild_arama_indeksi tüm indeksi baştan yazar"),
+    ("stok_sayaclari", "FROM stok_sayaclari ORDER BY stokkodu",
+     "envanter.stok_durumlari her malzemenin sayacını birincil anahtar sırasıyla döndürür"),
+    ("toplu_transfer", "temp.toplu_transfer",
+     "bulk_transfer_zimmet'in çalışma tablosu yalnızca o çağrının çiftlerini tutar; her satırı işlenir"),
+    ("konum_sayaclari", "FROM konum_sayaclari WHERE bulunansube = ? ORDER BY CAST(NULLIF(bulunankat, ?) AS INTEGER)",
+     "katlar metin olarak tutulur, sayısal sıra için sıralanır; şubenin kat başına bir satırıdır"),
+    ("konum_sayaclari", "FROM konum_sayaclari ORDER BY bulunansube, CAST(NULLIF(bulunankat, ?) AS INTEGER)",
+     "katlar metin olarak tutulur, sayısal sıra için sıralanır; tablo şube/kat başına bir satırdır"),
+)
+
+_ATLA = re.compile(r"^\s*(BEGIN|COMMIT|ROLLBACK|SAVEPOINT|RELEASE|PRAGMA|CREATE|DROP|ALTER|ANALYZE|VACUUM|--)",
+                   re.IGNORECASE)
+# Parmak izlerinde malzeme tabloları stok_? olarak geçer; ? da ada dahildir.
+_TABLO = re.compile(r'\b(?:FROM|JOIN|UPDATE|INTO)\s+("?[\w.?]+"?)(?:\s+(?:AS\s+)?(?!WHERE|ON|USING|ORDER|GROUP|LIMIT|SET|VALUES|SELECT|LEFT|JOIN|INNER)(\w+))?',
+                    re.IGNORECASE)
+_TARAMA = re.compile(r"^SCAN (\S+)(.*)$")
+_GECICI_TABLO = re.compile(r"^\s*CREATE\s+TEMP(?:ORARY)?\s+TABLE\b", re.IGNORECASE)
+
+
+def _takma_adlar(sql):
+    """Plandaki adları (takma ad ya da tablo adı) gerçek tablo adlarına eşler."""
+    adlar = {}
+    for tablo, takma in _TABLO.findall(sql):
+        tablo = tablo.strip('"').split(".")[-1]
+        adlar[tablo] = tablo
+        if takma:
+            adlar[takma] = tablo
+    return adlar
+
+
+def izin_gerekcesi(parmak_izi):
+    """Parmak izine uyan IZINLI kaydının gerekçesi; yoksa None."""
+    tablolar = set(_takma_adlar(parmak_izi).values())
+    return next((gerekce for tablo, metin, gerekce in IZINLI
+                 if tablo in tablolar and metin in parmak_izi), None)
+
+
+def _buyuk_mu(tablo):
+    tablo = tablo.split(".")[-1]
+    return tablo not in KUCUK_TABLOLAR and not tablo.startswith("sqlite_")
+
+
+def plan_ihlalleri(plan, sql):
+    """EXPLAIN QUERY PLAN satırlarından ihlalleri döndürür."""
+    adlar = _takma_adlar(sql)
+    ihlaller = []
+    for detay in plan:
+        if detay.startswith("USE TEMP B-TREE"):
+            ihlaller.append(detay)
+            continue
+        tarama = _TARAMA.match(detay)
+        if not tarama or "USING" in tarama.group(2) or "VIRTUAL TABLE" in tarama.group(2):
+            continue
+        tablo = adlar.get(tarama.group(1), tarama.group(1))
+        if _buyuk_mu(tablo):
+            ihlaller.append(f"{detay} (tam tablo taraması: {tablo})")
+    return ihlaller
+
+
+class Denetci:
+    """Yakalanan ifadeleri parmak izine göre toplar ve ilk görüldüklerinde planlar.
+
+    Plan ayrı bir salt okunur bağlantıdan alınır: iz geri çağrısı ifade çalışmadan
+    hemen önce gelir, bu yüzden birazdan silinecek tablolar (ör. stok_*) hâlâ
+    şemadadır. Geçici tablolar (temp.*) o bağlantıdan görünmez; CREATE TEMP TABLE
+    ifadeleri bu yüzden planlayıcı bağlantısında da çalıştırılır.
+    """
+
+    def __init__(self):
+        self.ifadeler = {}
+        self._okuyucu = None
+        self._senaryo = None
+
+    def baslat(self, yol, senaryo):
+        self._senaryo = senaryo
+        if self._okuyucu is not None:
+            self._okuyucu.close()
+        self._okuyucu = sqlite3.connect(f"file:{yol}?mode=ro", uri=True)
+        get_connection(yol).set_trace_callback(self._iz)
+
+    def bitir(self):
+        if self._okuyucu is not None:
+            self._okuyucu.close()
+            self._okuyucu = None
+
+    def _iz(self, sql):
+        if _GECICI_TABLO.match(sql):
+            try:
+                self._okuyucu.execute(sql)
+            except sqlite3.Error as e:
+                print(f"Geçici tablo planlayıcıda oluşturulamadı: {e}", file=sys.stderr)
+            return
+        if _ATLA.match(sql):
+            return
+        anahtar = sorgu_izleme.parmak_izi(sql)
+        kayit = self.ifadeler.get(anahtar)
+        if kayit is not None:
+            kayit["adet"] += 1
+            kayit["senaryolar"].add(self._senaryo)
+            return
+        kayit = self.ifadeler[anahtar] = {"adet": 1, "senaryolar": {self._senaryo}, "ornek": sql,
+                                          "plan": None, "hata": None}
+        try:
+            kayit["plan"] = [satir[3] for satir in self._okuyucu.execute("EXPLAIN QUERY PLAN " + sql)]
+        except sqlite3.Error as e:
+            kayit["hata"] = str(e)
+
+    def rapor(self):
+        satirlar = []
+        for anahtar, kayit in sorted(self.ifadeler.items()):
+            ihlaller = plan_ihlalleri(kayit["plan"] or [], kayit["ornek"])
+            izin = izin_gerekcesi(anahtar)
+            if kayit["hata"]:
+                durum = "planlanamadı"
+            elif ihlaller and izin:
+                durum = "izinli"
+            elif ihlaller:
+                durum = "İHLAL"
+            else:
+                durum = "ok"
+            satirlar.append({"parmak_izi": anahtar, "durum": durum, "adet": kayit["adet"],
+                             "senaryolar": sorted(kayit["senaryolar"]), "plan": kayit["plan"],
+                             "ihlaller": ihlaller, "gerekce": izin if ihlaller else None,
+                             "hata": kayit["hata"]})
+        return satirlar
+
+
+def _ek_okumalar(veri):
+    """Senaryolarda olmayan, listeleme ve ayrıntı ekranlarının okuma yolları."""
+    kod = veri["malzemeler"][0]
+    kisi, sticker = veri["zimmetli"][0]
+    return [
+        lambda: database.get_all_kisiler(),
+        lambda: database.get_all_kategoriler(),
+        lambda: database.get_kategoriler_sayilari(),
+        lambda: database.get_kisi(kisi),
+        lambda: database.get_stickers(kod),
+        lambda: database.get_sticker_stokkodu(sticker),
+        lambda: database.get_sticker_sahibi(sticker),
+        lambda: database.get_sticker_gecmisi(sticker),
+        lambda: database.get_kisi_gecmisi(kisi, limit=50),
+        lambda: database.get_sticker_sahibi_tarihte(sticker, "2999-01-01"),
+        lambda: database.get_zimmetler_tarihte("2999-01-01"),
+        lambda: database.get_zimmetler_tarihte("2999-01-01", kisi),
+        lambda: database.zimmet_anlik_goruntusu_gerekirse(),
+        lambda: envanter.stok_durumu(kod),
+        lambda: envanter.stok_durumlari(),
+        lambda: envanter.kategori_durumlari(),
+        lambda: envanter.kisi_zimmet_adedi(kisi),
+        lambda: envanter.sube_durumu("istanbul"),
+        lambda: envanter.konum_durumlari(),
+        lambda: envanter.ozet(),
+        lambda: database.count_malzeme_types(),
+        lambda: database.count_search_malzeme_types("malzeme"),
+        lambda: database.search_malzeme_types("malzeme", sirala="isim", limit=50),
+        lambda: database.get_malzeme_types_sayfa("isim", sonra={"isim": "Malzeme", "stokkodu": kod}),
+        lambda: database.get_malzeme_types_sayfa("kategori", True, sonra={"kategori": "mobilya", "stokkodu": kod}),
+        lambda: database.get_malzeme_types_sayfa("stokkodu", sonra={"stokkodu": kod}),
+        lambda: list(database.stream_malzeme_fotograf(veri["fotografli"][0])) if veri["fotografli"] else None,
+        lambda: database.update_malzeme_type(kod, isim="Yeniden adlandırılan"),
+        lambda: database.transfer_kisi_zimmetleri(kisi, veri["kisiler"][-1]),
+        lambda: database.delete_last_sticker_stokkodlutablo(kod),
+    ]
+
+
+def denetle(ortam, adet):
+    denetci = Denetci()
+    try:
+        for ad in list(SENARYOLAR) + ["ek_okumalar"]:
+            yol = ortam.calisma_kopyasi()
+            if ad == "ek_okumalar":
+                islemler = _ek_okumalar(ortam.veri)
+            else:
+                islemler = SENARYOLAR[ad][0](ortam.veri, random.Random(f"{ortam.tohum}:{ad}"), adet)
+            denetci.baslat(yol, ad)
+            with sessiz():
+                for islem in islemler:
+                    islem()
+    finally:
+        denetci.bitir()
+        close_all()
+    return denetci.rapor()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.sorgu_plani",
+                                 description="ERP-APP sorgu planı denetimi")
+    ap.add_argument("--olcek", choices=sorted(OLCEKLER), default="orta", help="Veri seti büyüklüğü")
+    ap.add_argument("--adet", type=int, default=20, help="Senaryo başına işlem sayısı")
+    ap.add_argument("--tohum", type=int, default=1234)
+    ap.add_argument("--ayrintili", action="store_true", help="Sorun olmayan ifadeleri de yaz")
+    ap.add_argument("--cikti", help="Raporun yazılacağı JSON dosyası")
+    args = ap.parse_args(argv)
+
+    ortam = Ortam(args.olcek, args.tohum)
+    try:
+        print(f"Veri seti hazırlanıyor ({args.olcek}, tohum={args.tohum})...", file=sys.stderr)
+        ortam.hazirla()
+        rapor = denetle(ortam, args.adet)
+    finally:
+        ortam.kapat()
+
+    sayilar = {}
+    for satir in rapor:
+        sayilar[satir["durum"]] = sayilar.get(satir["durum"], 0) + 1
+        if satir["durum"] == "ok" and not args.ayrintili:
+            continue
+        print(f"[{satir['durum']}] {satir['parmak_izi']}")
+        print(f"    senaryolar: {', '.join(satir['senaryolar'])}")
+        for detay in satir["plan"] or []:
+            print(f"    {detay}")
+        for ihlal in satir["ihlaller"]:
+            print(f"    ! {ihlal}")
+        if satir["gerekce"]:
+            print(f"    izin: {satir['gerekce']}")
+        if satir["hata"]:
+            print(f"    hata: {satir['hata']}")
+    print(f"{len(rapor)} ifade: " + ", ".join(f"{d} {n}" for d, n in sorted(sayilar.items())))
+
+    if args.cikti:
+        with open(args.cikti, "w", encoding="utf-8") as f:
+            json.dump(rapor, f, ensure_ascii=False, indent=2)
+    return 1 if sayilar.get("İHLAL") or sayilar.get("planlanamadı") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
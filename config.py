@@ -0,0 +1,120 @@
+import os
+
+# Uygulama ayarları. Her değer aynı isimli ERP_* ortam değişkeniyle ezilebilir.
+
+def _env_str(ad, varsayilan):
+    return os.environ.get(ad, varsayilan)
+
+def _env_int(ad, varsayilan):
+    deger = os.environ.get(ad)
+    if deger is None or deger.strip() == "":
+        return varsayilan
+    try:
+        return int(deger)
+    except ValueError:
+        return varsayilan
+
+def _env_bool(ad, varsayilan):
+    deger = os.environ.get(ad)
+    if deger is None or deger.strip() == "":
+        return varsayilan
+    return deger.strip().lower() in ("1", "true", "evet", "yes", "on")
+
+# ------------------- SQLite bağlantıları -------------------
+# Bağlantılar iş parçacığı başına bir kez açılır ve yeniden kullanılır.
+# False yapılırsa her çağrı yeni bağlantı açar (yalnızca ölçüm için).
+SQLITE_BAGLANTI_YENIDEN_KULLAN = _env_bool("ERP_SQLITE_BAGLANTI_YENIDEN_KULLAN", True)
+
+SQLITE_JOURNAL_MODE = _env_str("ERP_SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = _env_str("ERP_SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_MMAP_SIZE = _env_int("ERP_SQLITE_MMAP_SIZE", 256 * 1024 * 1024)   # bayt
+SQLITE_CACHE_SIZE = _env_int("ERP_SQLITE_CACHE_SIZE", -64000)            # negatif: KiB
+SQLITE_BUSY_TIMEOUT_MS = _env_int("ERP_SQLITE_BUSY_TIMEOUT_MS", 5000)
+SQLITE_STATEMENT_CACHE = _env_int("ERP_SQLITE_STATEMENT_CACHE", 256)
+
+# ------------------- Toplu işlemler -------------------
+# Toplu zimmet/transfer işlemlerinde tek işlemde (commit) yazılacak satır sayısı.
+TOPLU_ISLEM_PARCA_BOYUTU = _env_int("ERP_TOPLU_ISLEM_PARCA_BOYUTU", 500)
+
+# ------------------- Sticker numaraları -------------------
+# "son":  son sticker silinirse numarası bir sonraki sticker'a yeniden verilir
+# "asla": silinen numaralar bir daha kullanılmaz
+STICKER_NUMARA_YENIDEN_KULLANIM = _env_str("ERP_STICKER_NUMARA_YENIDEN_KULLANIM", "son")
+
+# ------------------- Fotoğraflar -------------------
+# Fotoğraf kaydedilirken üretilen küçük resimlerin en uzun kenarı (piksel)
+KUCUK_RESIM_BOYUTLARI = (100, 400, 1000)
+KUCUK_RESIM_JPEG_KALITESI = _env_int("ERP_KUCUK_RESIM_JPEG_KALITESI", 85)
+# Bellekte tutulacak en fazla küçük resim sayısı (LRU)
+KUCUK_RESIM_ONBELLEK_ADEDI = _env_int("ERP_KUCUK_RESIM_ONBELLEK_ADEDI", 128)
+
+# ------------------- Malzeme listesi -------------------
+# Ana penceredeki tablo satırları bu büyüklükte sayfalar halinde, kaydırdıkça yüklenir.
+MALZEME_LISTE_SAYFA_BOYUTU = _env_int("ERP_MALZEME_LISTE_SAYFA_BOYUTU", 200)
+
+# ------------------- Referans veri önbelleği -------------------
+# Kişi ve kategori listeleri bellekte tutulur; yazan fonksiyonlar önbelleği boşaltır.
+REFERANS_ONBELLEK = _env_bool("ERP_REFERANS_ONBELLEK", True)
+# Başka bir bağlantının/sürecin yazmaları PRAGMA data_version ile fark edilir.
+REFERANS_ONBELLEK_DATA_VERSION = _env_bool("ERP_REFERANS_ONBELLEK_DATA_VERSION", True)
+
+# ------------------- Zimmet geçmişi -------------------
+# Son anlık görüntüden bu yana bu kadar olay birikince yeni sahiplik görüntüsü alınır;
+# "tarihte kimdeydi" sorguları en fazla bu kadar olayı yeniden oynatır.
+ZIMMET_ANLIK_GORUNTU_OLAY_ARALIGI = _env_int("ERP_ZIMMET_ANLIK_GORUNTU_OLAY_ARALIGI", 10000)
+# Uygulama açıkken görüntü gereksinimi bu aralıkla (dakika) kontrol edilir. 0: kapalı.
+ZIMMET_ANLIK_GORUNTU_KONTROL_DK = _env_int("ERP_ZIMMET_ANLIK_GORUNTU_KONTROL_DK", 10)
+
+# ------------------- Dışa aktarım -------------------
+# disa_aktar.py satırları veritabanından bu büyüklükteki parçalarla okur ve yazar.
+DISA_AKTARIM_PARCA_BOYUTU = _env_int("ERP_DISA_AKTARIM_PARCA_BOYUTU", 5000)
+
+# ------------------- İçe aktarım -------------------
+# ice_aktar.py her işlemde (commit) bu kadar satır yazar. Toplu zimmetten büyüktür:
+# aktarım genellikle tek seferliktir ve her commit stok tablolarının sayfalarını
+# yeniden yazar; 5000 satırlık bir işlem yazma kilidini yarım saniye kadar tutar.
+ICE_AKTARIM_PARCA_BOYUTU = _env_int("ERP_ICE_AKTARIM_PARCA_BOYUTU", 5000)
+
+# ------------------- Yedekleme -------------------
+# Boşsa yedekler veritabanının yanındaki yedekler/ klasörüne yazılır.
+YEDEK_KLASORU = _env_str("ERP_YEDEK_KLASORU", "")
+# Klasörde tutulacak en yeni yedek sayısı; eskileri her yedekten sonra silinir.
+YEDEK_SAKLAMA_ADEDI = _env_int("ERP_YEDEK_SAKLAMA_ADEDI", 7)
+YEDEK_SIKISTIR = _env_bool("ERP_YEDEK_SIKISTIR", True)
+YEDEK_GZIP_SEVIYESI = _env_int("ERP_YEDEK_GZIP_SEVIYESI", 6)
+# Kopyalama bu kadar sayfalık adımlarla yapılır, adımlar arasında bu kadar (ms) beklenir.
+YEDEK_SAYFA_ADIMI = _env_int("ERP_YEDEK_SAYFA_ADIMI", 1024)
+YEDEK_ADIM_BEKLEME_MS = _env_int("ERP_YEDEK_ADIM_BEKLEME_MS", 5)
+# Uygulama açıkken en yeni yedek bu kadar saatten eskiyse yeni yedek alınır. 0: kapalı.
+YEDEK_ARALIK_SAAT = _env_int("ERP_YEDEK_ARALIK_SAAT", 24)
+
+# ------------------- Arka plan veritabanı iş parçacığı -------------------
+# Pencerelerin veritabanı çağrıları db_worker üzerinden GUI dışında çalışır.
+# False yapılırsa çağrılar eskisi gibi GUI iş parçacığında çalışır (karşılaştırma için).
+DB_ARKAPLAN_IS_PARCACIGI = _env_bool("ERP_DB_ARKAPLAN", True)
+# Açılırsa GUI olay döngüsü gecikmesi ölçülür ve çıkışta özet günlüğe (INFO) yazılır.
+UI_DONMA_OLCUMU = _env_bool("ERP_UI_DONMA_OLCUMU", False)
+
+# ------------------- asyncio veri katmanı -------------------
+# async_database.AsyncDatabase: okuyucu iş parçacığı (bağlantı) sayısı ve
+# okuma/yazma kuyruklarının her birinde bekleyebilecek en fazla istek.
+ASYNC_OKUYUCU_SAYISI = _env_int("ERP_ASYNC_OKUYUCU_SAYISI", 4)
+ASYNC_BEKLEYEN_ISTEK_SINIRI = _env_int("ERP_ASYNC_BEKLEYEN_ISTEK_SINIRI", 256)
+
+# ------------------- Günlük -------------------
+# DEBUG, INFO, WARNING, ERROR. Varsayılan WARNING: başarılı işlemler hiçbir şey yazmaz.
+LOG_SEVIYESI = _env_str("ERP_LOG_SEVIYESI", "WARNING")
+# Boşsa konsola (stderr) yazılır. Dosya LOG_DOSYA_BOYUTU baytı aşınca döndürülür (3 yedek).
+LOG_DOSYASI = _env_str("ERP_LOG_DOSYASI", "")
+LOG_DOSYA_BOYUTU = _env_int("ERP_LOG_DOSYA_BOYUTU", 5 * 1024 * 1024)
+
+# ------------------- Sorgu ölçümü -------------------
+# Açılırsa her SQL ifadesinin süresi, satır sayısı ve çağıran fonksiyonu
+# sorgu_izleme modülünde toplanır. Kapalıyken ek maliyeti yoktur.
+SORGU_IZLEME = _env_bool("ERP_SORGU_IZLEME", False)
+# Bu süreyi (ms) aşan ifadeler yavaş sorgu kaydına eklenir; kayıt en fazla
+# SORGU_YAVAS_KAYIT_ADEDI ifade tutar (en eskisi düşer).
+SORGU_YAVAS_ESIK_MS = _env_int("ERP_SORGU_YAVAS_ESIK_MS", 20)
+SORGU_YAVAS_KAYIT_ADEDI = _env_int("ERP_SORGU_YAVAS_KAYIT_ADEDI", 500)
+# Doluysa uygulama kapanırken ölçüm özeti bu JSON dosyasına yazılır.
+SORGU_IZLEME_DOSYASI = _env_str("ERP_SORGU_IZLEME_DOSYASI", "")
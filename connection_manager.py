@@ -0,0 +1,108 @@
+import atexit
+import os
+import sqlite3
+import threading
+
+import config
+
+# İş parçacığı başına uzun ömürlü SQLite bağlantıları.
+# Her iş parçacığı aynı veritabanı yolu için hep aynı bağlantıyı alır; böylece
+# SQLite'ın sayfa önbelleği ve hazırlanmış ifade önbelleği çağrılar arasında korunur.
+
+_yerel = threading.local()
+_kilit = threading.Lock()
+_acik_baglantilar = []
+_nesil = 0
+
+def _pragmalari_uygula(conn):
+    conn.execute(f"PRAGMA busy_timeout = {int(config.SQLITE_BUSY_TIMEOUT_MS)}")
+    conn.execute(f"PRAGMA journal_mode = {config.SQLITE_JOURNAL_MODE}")
+    conn.execute(f"PRAGMA synchronous = {config.SQLITE_SYNCHRONOUS}")
+    conn.execute(f"PRAGMA mmap_size = {int(config.SQLITE_MMAP_SIZE)}")
+    conn.execute(f"PRAGMA cache_size = {int(config.SQLITE_CACHE_SIZE)}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+
+def _baglanti_sinifi():
+    if config.SORGU_IZLEME:
+        from sorgu_izleme import IzlenenBaglanti
+        return IzlenenBaglanti
+    return sqlite3.Connection
+
+def open_connection(path):
+    conn = sqlite3.connect(
+        path,
+        timeout=config.SQLITE_BUSY_TIMEOUT_MS / 1000,
+        cached_statements=config.SQLITE_STATEMENT_CACHE,
+        check_same_thread=False,
+        factory=_baglanti_sinifi(),
+    )
+    conn.row_factory = sqlite3.Row
+    _pragmalari_uygula(conn)
+    return conn
+
+def _anahtar(path):
+    if path == ":memory:" or path.startswith("file:"):
+        return path
+    return os.path.abspath(path)
+
+def get_connection(path):
+    if not config.SQLITE_BAGLANTI_YENIDEN_KULLAN:
+        conn = sqlite3.connect(path, factory=_baglanti_sinifi())
+        conn.row_factory = sqlite3.Row
+        return conn
+    baglantilar = getattr(_yerel, "baglantilar", None)
+    if baglantilar is None or getattr(_yerel, "nesil", None) != _nesil:
+        baglantilar = _yerel.baglantilar = {}
+        _yerel.nesil = _nesil
+    anahtar = _anahtar(path)
+    conn = baglantilar.get(anahtar)
+    if conn is None:
+        conn = open_connection(path)
+        baglantilar[anahtar] = conn
+        with _kilit:
+            _acik_baglantilar.append(conn)
+    return conn
+
+def nesil():
+    """close_all her çağrıldığında artar; bağlantılara bağlı önbellekler bunu izler."""
+    return _nesil
+
+def close_connection(path):
+    baglantilar = getattr(_yerel, "baglantilar", None)
+    if not baglantilar or getattr(_yerel, "nesil", None) != _nesil:
+        return
+    conn = baglantilar.pop(_anahtar(path), None)
+    if conn is None:
+        return
+    with _kilit:
+        if conn in _acik_baglantilar:
+            _acik_baglantilar.remove(conn)
+    conn.close()
+
+def close_connections(baglantilar):
+    """Başka iş parçacıklarında açılmış bağlantıları kapatır (ör. kapatılmış bir
+    iş parçacığı havuzununkiler). Sahibi iş parçacıkları artık çalışmamalıdır."""
+    with _kilit:
+        for conn in baglantilar:
+            if conn in _acik_baglantilar:
+                _acik_baglantilar.remove(conn)
+    for conn in baglantilar:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+def close_all():
+    """Tüm iş parçacıklarındaki bağlantıları kapatır (ör. veritabanı dosyası silinmeden önce)."""
+    global _nesil
+    with _kilit:
+        baglantilar = list(_acik_baglantilar)
+        _acik_baglantilar.clear()
+        _nesil += 1
+    for conn in baglantilar:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+atexit.register(close_all)
@@ -1,347 +1,577 @@
 import sqlite3
 import os
 import datetime
+import hashlib
+from itertools import islice
+import config
+import gunluk
+import thumbnails
+import referans_onbellek
+from connection_manager import get_connection
+
+log = gunluk.kaydedici(__name__)
 
 DB_PATH = 'erp_database.db'
 
+_TURKCE_KATLAMA = {
+    'İ': 'i', 'I': 'i', 'ı': 'i', 'Ş': 's', 'ş': 's', 'Ğ': 'g', 'ğ': 'g',
+    'Ü': 'u', 'ü': 'u', 'Ö': 'o', 'ö': 'o', 'Ç': 'c', 'ç': 'c',
+    'Â': 'a', 'â': 'a', 'Î': 'i', 'î': 'i', 'Û': 'u', 'û': 'u',
+}
+_TURKCE_KATLAMA_TABLOSU = str.maketrans(_TURKCE_KATLAMA)
+
+def turkce_katla(metin):
+    return (metin or '').translate(_TURKCE_KATLAMA_TABLOSU).lower()
+
+def _turkce_katla_sql(ifade):
+    for harf, karsilik in _TURKCE_KATLAMA.items():
+        ifade = f"replace({ifade}, '{harf}', '{karsilik}')"
+    return f"lower(COALESCE({ifade}, ''))"
+
 def create_database():
+    """Veritabanı dosyasını oluşturur ve şemayı son sürüme taşır (bkz. migrations.py)."""
     try:
         if not os.path.exists(DB_PATH):
             open(DB_PATH, 'w').close()
-            print(f"Veritabanı oluşturuldu: {DB_PATH}")
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS malzemetypes (
-            stokkodu TEXT PRIMARY KEY,
+            log.info("Veritabanı oluşturuldu: %s", DB_PATH)
+        # migrations bu modülü içe aktarır; döngüye girmemek için burada yüklenir.
+        from migrations import migrate
+        rapor = migrate(DB_PATH)
+        if rapor["adimlar"] and rapor["basarili"]:
+            log.info("Veritabanı ve tablolar hazır (şema sürümü %s).", rapor["surum"])
+        return rapor["basarili"]
+    except Exception as e:
+        log.error("Veritabanı oluşturma hatası: %s", e)
+        return False
+
+def _create_stokkodu_table(cursor, stokkodu):
+    table_name = stok_tablo_adi(stokkodu)
+    cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS {table_name} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            stickerkod TEXT UNIQUE NOT NULL,
             isim TEXT NOT NULL,
             kategori TEXT,
-            fotograf BLOB
-        )
-        ''')
-        
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS kisiler (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            kisiisim TEXT NOT NULL,
-            bulunankat INTEGER,
-            bulunansube TEXT
+            olusturma_tarihi TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
         ''')
-        
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS kategoriler (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            kategori_adi TEXT UNIQUE NOT NULL
-        )
+    _stok_tablosu_indeksi(cursor, table_name)
+    return table_name
+
+def _stok_tablosu_indeksi(cursor, table_name):
+    # get_stickers tarih sırasıyla okur; indeks sorguyu tabloya gitmeden karşılar.
+    cursor.execute(f'''
+        CREATE INDEX IF NOT EXISTS idx_{table_name}_tarih
+        ON {table_name} (olusturma_tarihi, stickerkod, isim, kategori)
         ''')
-        
-        conn.commit()
-        conn.close()
-        print("Veritabanı ve tablolar hazır.")
-        return True
-    except Exception as e:
-        print(f"Veritabanı oluşturma hatası: {e}")
-        if 'conn' in locals() and conn:
-            conn.close()
-        return False
 
 def create_stokkodu_table(stokkodu):
+    conn = None
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = get_connection(DB_PATH)
         cursor = conn.cursor()
-        table_name = f"stok_{stokkodu.replace(' ', '').replace('-', '_')}"
-        cursor.execute(f'''
-            CREATE TABLE IF NOT EXISTS {table_name} (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                stickerkod TEXT UNIQUE NOT NULL,
-                isim TEXT NOT NULL,
-                kategori TEXT,
-                olusturma_tarihi TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-            ''')
+        table_name = _create_stokkodu_table(cursor, stokkodu)
         conn.commit()
-        conn.close()
-        print(f"'{stokkodu}' için stok tablosu oluşturuldu: {table_name}")
+        log.info("'%s' için stok tablosu oluşturuldu: %s", stokkodu, table_name)
         return True
     except Exception as e:
-        print(f"Stok tablosu oluşturma hatası: {e}")
-        if 'conn' in locals() and conn:
-            conn.close()
+        log.error("Stok tablosu oluşturma hatası: %s", e)
+        if conn:
+            conn.rollback()
         return False
 
-def create_kisi_malzemeleri_table(kisiisim):
+def _arama_indeksini_doldur(cursor):
+    cursor.execute('DELETE FROM malzemetypes_fts')
+    cursor.execute(f'''
+        INSERT INTO malzemetypes_fts (rowid, stokkodu, isim, kategori)
+        SELECT rowid, {_turkce_katla_sql("stokkodu")}, {_turkce_katla_sql("isim")}, {_turkce_katla_sql("kategori")}
+        FROM malzemetypes
+    ''')
+    return cursor.rowcount
+
+def rebuild_arama_indeksi():
+    conn = None
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = get_connection(DB_PATH)
         cursor = conn.cursor()
-        table_name = f"{kisiisim}_malzemeleri".replace(' ', '').lower()
-        cursor.execute(f'''
-        CREATE TABLE IF NOT EXISTS "{table_name}" (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            stickerid TEXT UNIQUE NOT NULL,
-            isim TEXT NOT NULL,
-            olusturmatarihi TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        ''')
+        adet = _arama_indeksini_doldur(cursor)
         conn.commit()
-        conn.close()
-        print(f"'{kisiisim}' için malzemeler tablosu oluşturuldu: {table_name}")
+        log.info("Arama indeksi yeniden oluşturuldu: %s malzeme.", adet)
         return True
     except Exception as e:
-        print(f"Kişi malzemeleri tablosu oluşturma hatası: {e}")
-        if 'conn' in locals() and conn:
-            conn.close()
+        log.error("Arama indeksi oluşturma hatası: %s", e)
+        if conn:
+            conn.rollback()
         return False
 
+def stok_tablo_adi(stokkodu):
+    return f"stok_{stokkodu.replace(' ', '').replace('-', '_')}"
+
+def kisi_malzemeleri_tablo_adi(kisiisim):
+    return f"{kisiisim}_malzemeleri".replace(' ', '').lower()
+
 def add_kisi(kisiisim, bulunankat, bulunansube):
+    conn = None
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = get_connection(DB_PATH)
         cursor = conn.cursor()
         cursor.execute('SELECT id FROM kisiler WHERE kisiisim = ?', (kisiisim,))
         if cursor.fetchone():
-            print(f"'{kisiisim}' zaten veritabanında mevcut!")
-            conn.close()
+            log.warning("'%s' zaten veritabanında mevcut!", kisiisim)
             return -1
         cursor.execute('INSERT INTO kisiler (kisiisim, bulunankat, bulunansube) VALUES (?, ?, ?)', 
                        (kisiisim, bulunankat, bulunansube))
         kisi_id = cursor.lastrowid
         conn.commit()
-        conn.close()
-        create_kisi_malzemeleri_table(kisiisim)
-        print(f"'{kisiisim}' kişisi başarıyla eklendi. ID: {kisi_id}")
+        referans_onbellek.gecersiz_kil("kisiler")
+        log.debug("'%s' kişisi başarıyla eklendi. ID: %s", kisiisim, kisi_id)
         return kisi_id
     except Exception as e:
-        print(f"Kişi ekleme hatası: {e}")
-        if 'conn' in locals() and conn:
+        log.error("Kişi ekleme hatası: %s", e)
+        if conn:
             conn.rollback()
-            conn.close()
         return -1
 
+def _kisileri_oku(conn):
+    cursor = conn.cursor()
+    cursor.execute('SELECT * FROM kisiler ORDER BY kisiisim')
+    return [dict(row) for row in cursor.fetchall()]
+
+def _satir_kopyasi(satirlar):
+    return [dict(satir) for satir in satirlar]
+
 def get_all_kisiler():
     try:
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM kisiler ORDER BY kisiisim')
-        kisiler = cursor.fetchall()
-        conn.close()
-        return [dict(row) for row in kisiler]
+        return referans_onbellek.getir("kisiler", DB_PATH, _kisileri_oku, _satir_kopyasi)
     except Exception as e:
-        print(f"Kişileri getirme hatası: {e}")
+        log.error("Kişileri getirme hatası: %s", e)
         return []
 
 def delete_kisi_by_id(kisi_id, kisiisim):
+    conn = None
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = get_connection(DB_PATH)
         cursor = conn.cursor()
+        cursor.execute('''
+            INSERT INTO zimmet_olaylari (tur, stickerkod, eski_kisi_id, eski_kisiisim)
+            SELECT 'iade', a.sticker_id, a.kisi_id, k.kisiisim
+            FROM assignments a LEFT JOIN kisiler k ON k.id = a.kisi_id
+            WHERE a.kisi_id = ? ORDER BY a.rowid
+        ''', (kisi_id,))
         cursor.execute("DELETE FROM kisiler WHERE id = ?", (kisi_id,))
-        table_name = f"{kisiisim}_malzemeleri".replace(' ', '').lower()
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table_name,))
-        if cursor.fetchone():
-            cursor.execute(f"DROP TABLE IF EXISTS \"{table_name}\"")
+        cursor.execute("DELETE FROM assignments WHERE kisi_id = ?", (kisi_id,))
         conn.commit()
-        conn.close()
-        print(f"'{kisiisim}' kişisi ve malzemeler tablosu silindi.")
+        referans_onbellek.gecersiz_kil("kisiler")
+        log.debug("'%s' kişisi ve zimmetleri silindi.", kisiisim)
         return True
     except Exception as e:
-        print(f"Kişi silme hatası: {e}")
-        if 'conn' in locals() and conn:
+        log.error("Kişi silme hatası: %s", e)
+        if conn:
             conn.rollback()
-            conn.close()
         return False
 
-def create_sticker_id(stokkodu, numara):
-    yil = datetime.datetime.now().year
+def create_sticker_id(stokkodu, numara, yil=None):
+    yil = yil or datetime.datetime.now().year
     return f"{yil}_{stokkodu}_{numara:06d}"
 
+def sticker_numarasi(stickerkod, stokkodu):
+    yil, _, numara = stickerkod.partition(f"_{stokkodu}_")
+    if not (yil.isdigit() and numara.isdigit()):
+        return None
+    return int(yil), int(numara)
+
+def _sticker_numaralari_ayir(cursor, stokkodu, adet, yil):
+    sorgu = '''
+        UPDATE sticker_sayaclari SET son_numara = son_numara + ?
+        WHERE stokkodu = ? AND yil = ? RETURNING son_numara
+    '''
+    cursor.execute(sorgu, (adet, stokkodu, yil))
+    row = cursor.fetchone()
+    if row is None:
+        onek = f"{yil}_{stokkodu}_"
+        cursor.execute('''
+            INSERT OR IGNORE INTO sticker_sayaclari (stokkodu, yil, son_numara)
+            SELECT ?, ?, COALESCE(MAX(CAST(substr(stickerkod, ?) AS INTEGER)), 0)
+            FROM stickerlar WHERE stokkodu = ? AND substr(stickerkod, 1, ?) = ?
+        ''', (stokkodu, yil, len(onek) + 1, stokkodu, len(onek), onek))
+        cursor.execute(sorgu, (adet, stokkodu, yil))
+        row = cursor.fetchone()
+    son_numara = row[0]
+    return range(son_numara - adet + 1, son_numara + 1)
+
 def add_stokkodlu_malzeme_tip(stokkodu, isim, kategori, fotograf_yolu=None):
     conn = None
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = get_connection(DB_PATH)
         cursor = conn.cursor()
         cursor.execute('SELECT stokkodu FROM malzemetypes WHERE stokkodu = ?', (stokkodu,))
         if cursor.fetchone():
-            print(f"Hata: '{stokkodu}' stok kodlu malzeme zaten var! Farklı bir stok kodu kullanın.")
-            conn.close()
+            log.warning("'%s' stok kodlu malzeme zaten var! Farklı bir stok kodu kullanın.", stokkodu)
             return False
         fotograf_blob = None
         if fotograf_yolu and os.path.exists(fotograf_yolu):
             with open(fotograf_yolu, 'rb') as f:
                 fotograf_blob = f.read()
-        cursor.execute('INSERT INTO malzemetypes (stokkodu, isim, kategori, fotograf) VALUES (?, ?, ?, ?)',
-                       (stokkodu, isim, kategori, fotograf_blob))
+        foto_hash = _fotograf_kaydet(cursor, fotograf_blob) if fotograf_blob else None
+        cursor.execute('INSERT INTO malzemetypes (stokkodu, isim, kategori, fotograf_hash) VALUES (?, ?, ?, ?)',
+                       (stokkodu, isim, kategori, foto_hash))
         conn.commit()
-        conn.close()
-        conn = None
+        referans_onbellek.gecersiz_kil("kategoriler", "kategori_sayilari")
         if not create_stokkodu_table(stokkodu):
-            print(f"Uyarı: Malzeme eklendi ancak stok kodu tablosu oluşturulamadı!")
-        print(f"Malzeme tipi '{isim}' başarıyla eklendi.")
+            log.warning("Malzeme eklendi ancak stok kodu tablosu oluşturulamadı!")
+        log.debug("Malzeme tipi '%s' başarıyla eklendi.", isim)
         return True
     except sqlite3.IntegrityError:
-        print(f"Hata: '{stokkodu}' stok kodlu malzeme zaten var!")
+        log.warning("'%s' stok kodlu malzeme zaten var!", stokkodu)
         if conn:
-            conn.close()
+            conn.rollback()
         return False
     except Exception as e:
-        print(f"Hata: {e}")
+        log.error("Malzeme ekleme hatası: %s", e)
         if conn:
             conn.rollback()
-            conn.close()
         return False
 
+def fotograf_hash(fotograf):
+    return hashlib.sha256(fotograf).hexdigest()
+
+def _fotograf_kaydet(cursor, fotograf, kucuk_resim=True):
+    """Fotoğrafı SHA-256 özetiyle saklar; aynı görüntü ikinci kez yazılmaz. Özeti döndürür."""
+    foto_hash = fotograf_hash(fotograf)
+    cursor.execute('INSERT OR IGNORE INTO fotograflar (hash, boyut, veri) VALUES (?, ?, ?)',
+                   (foto_hash, len(fotograf), fotograf))
+    if cursor.rowcount and kucuk_resim:
+        _kucuk_resimleri_kaydet(cursor, foto_hash, fotograf)
+    return foto_hash
+
+def _fotograf_birak(cursor, foto_hash):
+    """Hiçbir malzeme artık kullanmıyorsa fotoğrafı ve küçük resimlerini siler."""
+    if not foto_hash:
+        return False
+    cursor.execute('SELECT 1 FROM malzemetypes WHERE fotograf_hash = ? LIMIT 1', (foto_hash,))
+    if cursor.fetchone():
+        return False
+    cursor.execute('DELETE FROM fotograflar WHERE hash = ?', (foto_hash,))
+    cursor.execute('DELETE FROM kucuk_resimler WHERE fotograf_hash = ?', (foto_hash,))
+    thumbnails.onbellek.discard(foto_hash)
+    return True
+
+def _kucuk_resimleri_kaydet(cursor, foto_hash, fotograf):
+    kucuk_resimler = thumbnails.kucuk_resimler_olustur(fotograf)
+    cursor.executemany('INSERT OR REPLACE INTO kucuk_resimler (fotograf_hash, boyut, veri) VALUES (?, ?, ?)',
+                       [(foto_hash, boyut, veri) for boyut, veri in kucuk_resimler.items()])
+    return kucuk_resimler
+
 def add_sticker_stokkodlutablo(stokkodu, adet=1):
     conn = None
     try:
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
+        conn = get_connection(DB_PATH)
         cursor = conn.cursor()
         cursor.execute('SELECT isim, kategori FROM malzemetypes WHERE stokkodu = ?', (stokkodu,))
         malzeme = cursor.fetchone()
         if not malzeme:
-            print(f"Hata: '{stokkodu}' stok kodlu malzeme bulunamadı!")
-            conn.close()
+            log.warning("'%s' stok kodlu malzeme bulunamadı!", stokkodu)
             return []
         table_name = f"stok_{stokkodu.replace(' ', '').replace('-', '_')}"
         cursor.execute('SELECT name FROM sqlite_master WHERE type="table" AND name=?', (table_name,))
         if not cursor.fetchone():
-            print(f"'{stokkodu}' için tablo bulunamadı, oluşturuyor")
-            create_stokkodu_table(stokkodu)
-            conn.close()
-            conn = sqlite3.connect(DB_PATH)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-        cursor.execute(f'SELECT id FROM {table_name} ORDER BY id DESC LIMIT 1')
-        son_kayit = cursor.fetchone()
-        son_id = son_kayit['id'] if son_kayit else 0
-        eklenen_stickerlar = []
-        for i in range(adet):
-            yeni_id = son_id + i + 1
-            stickerkod = create_sticker_id(stokkodu, yeni_id)
-            cursor.execute(f'INSERT INTO {table_name} (stickerkod, isim, kategori) VALUES (?, ?, ?)',
-                           (stickerkod, malzeme['isim'], malzeme['kategori']))
-            eklenen_stickerlar.append(stickerkod)
+            log.debug("'%s' için tablo bulunamadı, oluşturuyor", stokkodu)
+            _create_stokkodu_table(cursor, stokkodu)
+        yil = datetime.datetime.now().year
+        numaralar = _sticker_numaralari_ayir(cursor, stokkodu, adet, yil)
+        eklenen_stickerlar = [create_sticker_id(stokkodu, numara, yil) for numara in numaralar]
+        cursor.executemany(f'INSERT INTO {table_name} (stickerkod, isim, kategori) VALUES (?, ?, ?)',
+                           [(stickerkod, malzeme['isim'], malzeme['kategori']) for stickerkod in eklenen_stickerlar])
+        cursor.executemany('INSERT INTO stickerlar (stickerkod, stokkodu) VALUES (?, ?)',
+                           [(stickerkod, stokkodu) for stickerkod in eklenen_stickerlar])
+        _olaylari_yaz(cursor, 'sticker_olustur', [(stickerkod, None, None) for stickerkod in eklenen_stickerlar])
         conn.commit()
-        conn.close()
-        conn = None
-        print(f"{adet} adet sticker başarıyla eklendi.")
+        log.debug("%s adet sticker başarıyla eklendi.", adet)
         return eklenen_stickerlar
     except Exception as e:
-        print(f"Hata: {e}")
+        log.error("Sticker ekleme hatası: %s", e)
         if conn:
             conn.rollback()
-            conn.close()
         return []
 
+# Zimmet olay kaydı (zimmet_olaylari, bkz. migrations.py adım 9). Olaylar değişikliği
+# yapan fonksiyonun işleminde (commit'ten önce) yazılır; kişi isimleri olay anındaki
+# haliyle saklanır.
+ZIMMET_OLAY_TURLERI = ('zimmet', 'transfer', 'iade', 'sticker_olustur', 'sticker_sil')
+
+def _olaylari_yaz(cursor, tur, olaylar):
+    """olaylar: (stickerkod, kisi_id, eski_kisi_id) demetleri."""
+    cursor.executemany('''
+        INSERT INTO zimmet_olaylari (tur, stickerkod, kisi_id, kisiisim, eski_kisi_id, eski_kisiisim)
+        VALUES (?1, ?2, ?3, (SELECT kisiisim FROM kisiler WHERE id = ?3),
+                ?4, (SELECT kisiisim FROM kisiler WHERE id = ?4))
+    ''', [(tur, stickerkod, kisi_id, eski_kisi_id) for stickerkod, kisi_id, eski_kisi_id in olaylar])
+
+def _sticker_zimmetlerini_kaldir(cursor, stickerlar, params):
+    """Silinecek stickerların (stickerlar: IN listesi ya da alt sorgu) zimmetlerini
+    kaldırır ve her biri için 'iade' yazar. Sticker satırları silinmeden önce
+    çağrılır; zimmet sayaçları sticker'ın malzemesini stickerlar üzerinden bulur.
+    """
+    cursor.execute(f'''
+        INSERT INTO zimmet_olaylari (tur, stickerkod, eski_kisi_id, eski_kisiisim)
+        SELECT 'iade', a.sticker_id, a.kisi_id, k.kisiisim
+        FROM assignments a LEFT JOIN kisiler k ON k.id = a.kisi_id
+        WHERE a.sticker_id IN ({stickerlar})
+    ''', params)
+    cursor.execute(f'DELETE FROM assignments WHERE sticker_id IN ({stickerlar})', params)
+
+def _sticker_silme_olaylari(cursor, stokkodu):
+    _sticker_zimmetlerini_kaldir(cursor, 'SELECT stickerkod FROM stickerlar WHERE stokkodu = ?', (stokkodu,))
+    cursor.execute('''
+        INSERT INTO zimmet_olaylari (tur, stickerkod)
+        SELECT 'sticker_sil', stickerkod FROM stickerlar WHERE stokkodu = ?
+    ''', (stokkodu,))
+
 def add_zimmetle_malzeme(kisiisim, stickerid, isim):
+    conn = None
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = get_connection(DB_PATH)
         cursor = conn.cursor()
         cursor.execute('SELECT id FROM kisiler WHERE kisiisim = ?', (kisiisim,))
-        if not cursor.fetchone():
-            print(f"Hata: '{kisiisim}' isimli kişi bulunamadı!")
-            conn.close()
+        kisi = cursor.fetchone()
+        if not kisi:
+            log.warning("'%s' isimli kişi bulunamadı!", kisiisim)
             return False
-        table_name = f"{kisiisim}_malzemeleri".replace(' ', '').lower()
-        cursor.execute(f'INSERT INTO "{table_name}" (stickerid, isim) VALUES (?, ?)', (stickerid, isim))
+        cursor.execute('INSERT INTO assignments (sticker_id, kisi_id, isim) VALUES (?, ?, ?)', (stickerid, kisi[0], isim))
+        _olaylari_yaz(cursor, 'zimmet', [(stickerid, kisi[0], None)])
         conn.commit()
-        conn.close()
-        print(f"'{stickerid}' kodlu malzeme '{kisiisim}' kişisine zimmetlendi.")
+        log.debug("'%s' kodlu malzeme '%s' kişisine zimmetlendi.", stickerid, kisiisim)
         return True
     except Exception as e:
-        print(f"Zimmetleme hatası: {e}")
-        if 'conn' in locals() and conn:
+        log.error("Zimmetleme hatası: %s", e)
+        if conn:
             conn.rollback()
-            conn.close()
         return False
 
+def _yer_tutucular(adet):
+    return ', '.join('?' * adet)
+
+def bulk_zimmetle_stream(satirlar, parca_boyutu=None):
+    parca_boyutu = parca_boyutu or config.TOPLU_ISLEM_PARCA_BOYUTU
+    satirlar = iter(satirlar)
+    conn = get_connection(DB_PATH)
+    cursor = conn.cursor()
+    while True:
+        parca = list(islice(satirlar, parca_boyutu))
+        if not parca:
+            break
+        sonuclar = [{'kisiisim': kisiisim, 'stickerid': stickerid, 'durum': None}
+                    for kisiisim, stickerid, _ in parca]
+        try:
+            isimler = list({kisiisim for kisiisim, _, _ in parca})
+            cursor.execute(f'SELECT id, kisiisim FROM kisiler WHERE kisiisim IN ({_yer_tutucular(len(isimler))})', isimler)
+            kisi_idleri = {row['kisiisim']: row['id'] for row in cursor.fetchall()}
+            stickerlar = list({stickerid for _, stickerid, _ in parca})
+            cursor.execute(f'SELECT sticker_id FROM assignments WHERE sticker_id IN ({_yer_tutucular(len(stickerlar))})', stickerlar)
+            zimmetli = {row['sticker_id'] for row in cursor.fetchall()}
+            eklenecek = []
+            for sonuc, (kisiisim, stickerid, isim) in zip(sonuclar, parca):
+                if kisiisim not in kisi_idleri:
+                    sonuc['durum'] = 'kisi_yok'
+                elif stickerid in zimmetli:
+                    sonuc['durum'] = 'zaten_zimmetli'
+                else:
+                    zimmetli.add(stickerid)
+                    eklenecek.append((stickerid, kisi_idleri[kisiisim], isim))
+                    sonuc['durum'] = 'zimmetlendi'
+            cursor.executemany('INSERT INTO assignments (sticker_id, kisi_id, isim) VALUES (?, ?, ?)', eklenecek)
+            _olaylari_yaz(cursor, 'zimmet', [(stickerid, kisi_id, None) for stickerid, kisi_id, _ in eklenecek])
+            conn.commit()
+        except Exception as e:
+            log.error("Toplu zimmetleme hatası: %s", e)
+            conn.rollback()
+            for sonuc in sonuclar:
+                sonuc['durum'] = 'hata'
+        yield from sonuclar
+
+def bulk_zimmetle(satirlar, parca_boyutu=None):
+    sonuclar = list(bulk_zimmetle_stream(satirlar, parca_boyutu))
+    basarili = sum(1 for sonuc in sonuclar if sonuc['durum'] == 'zimmetlendi')
+    log.debug("Toplu zimmetleme: %s/%s sticker zimmetlendi.", basarili, len(sonuclar))
+    return sonuclar
+
+def _bulk_transfer(cursor, ciftler):
+    cursor.execute('''
+        CREATE TEMP TABLE IF NOT EXISTS toplu_transfer (
+            stickerid TEXT PRIMARY KEY,
+            kisiisim TEXT NOT NULL,
+            kisi_id INTEGER,
+            eski_kisi_id INTEGER,
+            isim TEXT,
+            durum TEXT
+        )
+    ''')
+    cursor.execute('DELETE FROM temp.toplu_transfer')
+    cursor.executemany('INSERT OR REPLACE INTO temp.toplu_transfer (stickerid, kisiisim) VALUES (?, ?)', ciftler)
+    cursor.execute('''
+        UPDATE temp.toplu_transfer SET
+            kisi_id = (SELECT k.id FROM kisiler k WHERE k.kisiisim = toplu_transfer.kisiisim),
+            eski_kisi_id = (SELECT a.kisi_id FROM assignments a WHERE a.sticker_id = toplu_transfer.stickerid),
+            isim = (SELECT m.isim FROM stickerlar s JOIN malzemetypes m ON m.stokkodu = s.stokkodu
+                    WHERE s.stickerkod = toplu_transfer.stickerid)
+    ''')
+    cursor.execute('''
+        UPDATE temp.toplu_transfer SET durum = CASE
+            WHEN kisi_id IS NULL THEN 'kisi_yok'
+            WHEN isim IS NULL THEN 'eksik'
+            WHEN eski_kisi_id = kisi_id THEN 'zaten_sahibi'
+            ELSE 'tasinan'
+        END
+    ''')
+    cursor.execute('''
+        INSERT INTO zimmet_olaylari (tur, stickerkod, kisi_id, kisiisim, eski_kisi_id, eski_kisiisim)
+        SELECT CASE WHEN t.eski_kisi_id IS NULL THEN 'zimmet' ELSE 'transfer' END,
+               t.stickerid, t.kisi_id, t.kisiisim, t.eski_kisi_id,
+               (SELECT k.kisiisim FROM kisiler k WHERE k.id = t.eski_kisi_id)
+        FROM temp.toplu_transfer t WHERE t.durum = 'tasinan' ORDER BY t.rowid
+    ''')
+    cursor.execute('''
+        DELETE FROM assignments WHERE sticker_id IN
+            (SELECT stickerid FROM temp.toplu_transfer WHERE durum = 'tasinan' AND eski_kisi_id IS NOT NULL)
+    ''')
+    cursor.execute('''
+        INSERT INTO assignments (sticker_id, kisi_id, isim)
+        SELECT stickerid, kisi_id, isim FROM temp.toplu_transfer WHERE durum = 'tasinan' ORDER BY rowid
+    ''')
+    cursor.execute('SELECT durum, COUNT(*) AS adet FROM temp.toplu_transfer GROUP BY durum')
+    rapor = {'tasinan': 0, 'eksik': 0, 'zaten_sahibi': 0, 'kisi_yok': 0}
+    for row in cursor.fetchall():
+        rapor[row['durum']] = row['adet']
+    cursor.execute('DELETE FROM temp.toplu_transfer')
+    return rapor
+
+def bulk_transfer_zimmet(ciftler):
+    conn = None
+    try:
+        conn = get_connection(DB_PATH)
+        cursor = conn.cursor()
+        rapor = _bulk_transfer(cursor, ciftler)
+        conn.commit()
+        log.debug("Toplu transfer: %s taşındı, %s bulunamadı, %s zaten sahibinde, %s kişi bulunamadı.",
+                  rapor['tasinan'], rapor['eksik'], rapor['zaten_sahibi'], rapor['kisi_yok'])
+        return rapor
+    except Exception as e:
+        log.error("Toplu transfer hatası: %s", e)
+        if conn:
+            conn.rollback()
+        return None
+
+def transfer_kisi_zimmetleri(eski_kisiisim, yeni_kisiisim):
+    conn = None
+    try:
+        conn = get_connection(DB_PATH)
+        cursor = conn.cursor()
+        cursor.execute('SELECT id FROM kisiler WHERE kisiisim = ?', (eski_kisiisim,))
+        eski_kisi = cursor.fetchone()
+        if not eski_kisi:
+            log.warning("'%s' isimli kişi bulunamadı!", eski_kisiisim)
+            return None
+        cursor.execute('SELECT sticker_id FROM assignments WHERE kisi_id = ? ORDER BY rowid', (eski_kisi['id'],))
+        ciftler = [(row['sticker_id'], yeni_kisiisim) for row in cursor.fetchall()]
+        rapor = _bulk_transfer(cursor, ciftler)
+        conn.commit()
+        log.debug("'%s' kişisinin %s zimmeti '%s' kişisine taşındı.", eski_kisiisim, rapor['tasinan'], yeni_kisiisim)
+        return rapor
+    except Exception as e:
+        log.error("Toplu transfer hatası: %s", e)
+        if conn:
+            conn.rollback()
+        return None
+
 def delete_last_sticker_stokkodlutablo(stokkodu):
     conn = None
     try:
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
+        conn = get_connection(DB_PATH)
         cursor = conn.cursor()
         table_name = f"stok_{stokkodu.replace(' ', '').replace('-', '_')}"
         cursor.execute('SELECT name FROM sqlite_master WHERE type="table" AND name=?', (table_name,))
         if not cursor.fetchone():
-            print(f"Hata: '{stokkodu}' stok kodlu malzeme için tablo bulunamadı!")
-            conn.close()
+            log.warning("'%s' stok kodlu malzeme için tablo bulunamadı!", stokkodu)
             return None
         cursor.execute(f'SELECT id, stickerkod FROM {table_name} ORDER BY id DESC LIMIT 1')
         son_kayit = cursor.fetchone()
         if not son_kayit:
-            print(f"Hata: '{stokkodu}' stok kodlu malzeme için silinecek sticker bulunamadı!")
-            conn.close()
+            log.warning("'%s' stok kodlu malzeme için silinecek sticker bulunamadı!", stokkodu)
             return None
         cursor.execute(f'DELETE FROM {table_name} WHERE id = ?', (son_kayit['id'],))
+        _sticker_zimmetlerini_kaldir(cursor, '?', (son_kayit['stickerkod'],))
+        cursor.execute('DELETE FROM stickerlar WHERE stickerkod = ?', (son_kayit['stickerkod'],))
+        _olaylari_yaz(cursor, 'sticker_sil', [(son_kayit['stickerkod'], None, None)])
+        numara = sticker_numarasi(son_kayit['stickerkod'], stokkodu)
+        if numara and config.STICKER_NUMARA_YENIDEN_KULLANIM == 'son':
+            cursor.execute('''
+                UPDATE sticker_sayaclari SET son_numara = son_numara - 1
+                WHERE stokkodu = ? AND yil = ? AND son_numara = ?
+            ''', (stokkodu, numara[0], numara[1]))
         conn.commit()
-        conn.close()
-        conn = None
-        print(f"Son sticker başarıyla silindi: {son_kayit['stickerkod']}")
+        log.debug("Son sticker başarıyla silindi: %s", son_kayit['stickerkod'])
         return son_kayit['stickerkod']
     except Exception as e:
-        print(f"Son sticker silme hatası: {e}")
+        log.error("Son sticker silme hatası: %s", e)
         if conn:
             conn.rollback()
-            conn.close()
         return None
 
 def delete_malzeme_type_complete(stokkodu):
     conn = None
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = get_connection(DB_PATH)
         cursor = conn.cursor()
-        cursor.execute('SELECT stokkodu FROM malzemetypes WHERE stokkodu = ?', (stokkodu,))
-        if not cursor.fetchone():
-            print(f"Hata: '{stokkodu}' stok kodlu malzeme bulunamadı!")
-            conn.close()
+        cursor.execute('SELECT fotograf_hash FROM malzemetypes WHERE stokkodu = ?', (stokkodu,))
+        malzeme = cursor.fetchone()
+        if not malzeme:
+            log.warning("'%s' stok kodlu malzeme bulunamadı!", stokkodu)
             return False
         table_name = f"stok_{stokkodu.replace(' ', '').replace('-', '_')}"
         cursor.execute('SELECT name FROM sqlite_master WHERE type="table" AND name=?', (table_name,))
         if cursor.fetchone():
             cursor.execute(f'DROP TABLE {table_name}')
-            print(f"Stok tablosu silindi: {table_name}")
+            log.info("Stok tablosu silindi: %s", table_name)
+        _sticker_silme_olaylari(cursor, stokkodu)
+        cursor.execute('DELETE FROM stickerlar WHERE stokkodu = ?', (stokkodu,))
+        cursor.execute('DELETE FROM sticker_sayaclari WHERE stokkodu = ?', (stokkodu,))
         cursor.execute('DELETE FROM malzemetypes WHERE stokkodu = ?', (stokkodu,))
+        _fotograf_birak(cursor, malzeme['fotograf_hash'])
         conn.commit()
-        conn.close()
-        conn = None
-        print(f"Malzeme tipi başarıyla silindi: {stokkodu}")
+        referans_onbellek.gecersiz_kil("kategori_sayilari")
+        log.debug("Malzeme tipi başarıyla silindi: %s", stokkodu)
         return True
     except Exception as e:
-        print(f"Malzeme tipi silme hatası: {e}")
+        log.error("Malzeme tipi silme hatası: %s", e)
         if conn:
             conn.rollback()
-            conn.close()
         return False
 
 def delete_last_zimmet(kisiisim):
+    conn = None
     try:
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
+        conn = get_connection(DB_PATH)
         cursor = conn.cursor()
-        table_name = f"{kisiisim}_malzemeleri".replace(' ', '').lower() 
-        cursor.execute('SELECT name FROM sqlite_master WHERE type="table" AND name=?', (table_name,))
-        if not cursor.fetchone():
-            print(f"Hata: '{kisiisim}' kişisine ait malzeme tablosu bulunamadı!")
-            conn.close()
+        cursor.execute('SELECT id FROM kisiler WHERE kisiisim = ?', (kisiisim,))
+        kisi = cursor.fetchone()
+        if not kisi:
+            log.warning("'%s' isimli kişi bulunamadı!", kisiisim)
             return None
-        cursor.execute(f'SELECT id, stickerid FROM "{table_name}" ORDER BY id DESC LIMIT 1')
+        cursor.execute('SELECT rowid, sticker_id FROM assignments WHERE kisi_id = ? ORDER BY rowid DESC LIMIT 1', (kisi['id'],))
         son_kayit = cursor.fetchone()
         if not son_kayit:
-            print(f"Hata: '{kisiisim}' kişisine ait silinecek zimmet bulunamadı!")
-            conn.close()
+            log.warning("'%s' kişisine ait silinecek zimmet bulunamadı!", kisiisim)
             return None
-        sticker_id = son_kayit['stickerid']
-        cursor.execute(f'DELETE FROM "{table_name}" WHERE id = ?', (son_kayit['id'],))
+        sticker_id = son_kayit['sticker_id']
+        cursor.execute('DELETE FROM assignments WHERE rowid = ?', (son_kayit['rowid'],))
+        _olaylari_yaz(cursor, 'iade', [(sticker_id, None, kisi['id'])])
         conn.commit()
-        conn.close()
-        print(f"Son zimmetlenen malzeme başarıyla silindi: {sticker_id}")
+        log.debug("Son zimmetlenen malzeme başarıyla silindi: %s", sticker_id)
         return sticker_id
     except Exception as e:
-        print(f"Son zimmet silme hatası: {e}")
-        if 'conn' in locals() and conn:
+        log.error("Son zimmet silme hatası: %s", e)
+        if conn:
             conn.rollback()
-            conn.close()
         return None
 
 def update_malzeme_type(eski_stokkodu, yeni_stokkodu=None, isim=None, kategori=None, fotograf_yolu=None):
@@ -349,6 +579,7 @@ def update_malzeme_type(eski_stokkodu, yeni_stokkodu=None, isim=None, kategori=N
     try:
         update_fields = []
         params = []
+        yeni_fotograf = False
         if yeni_stokkodu is not None:
             update_fields.append("stokkodu = ?")
             params.append(yeni_stokkodu)
@@ -360,37 +591,53 @@ def update_malzeme_type(eski_stokkodu, yeni_stokkodu=None, isim=None, kategori=N
             params.append(kategori)
         if fotograf_yolu is not None: 
             if fotograf_yolu == "":
-                update_fields.append("fotograf = ?")
+                update_fields.append("fotograf_hash = ?")
                 params.append(None)
-                print(f"Malzeme '{eski_stokkodu}' fotoğrafı silindi.")
+                yeni_fotograf, fotograf_blob = True, None
+                log.debug("Malzeme '%s' fotoğrafı silindi.", eski_stokkodu)
             elif os.path.exists(fotograf_yolu):
                 with open(fotograf_yolu, 'rb') as f:
                     fotograf_blob = f.read()
-                update_fields.append("fotograf = ?")
-                params.append(fotograf_blob)
-                print(f"Yeni fotoğraf yüklendi: {fotograf_yolu}")
+                update_fields.append("fotograf_hash = ?")
+                params.append(fotograf_hash(fotograf_blob))
+                yeni_fotograf = True
+                log.debug("Yeni fotoğraf yüklendi: %s", fotograf_yolu)
             else:
-                print(f"Uyarı: Fotoğraf dosyası bulunamadı: {fotograf_yolu}")
+                log.warning("Fotoğraf dosyası bulunamadı: %s", fotograf_yolu)
         if not update_fields:
-            print("Hata: Güncellenecek alan belirtilmedi!")
+            log.warning("Güncellenecek alan belirtilmedi!")
             return False
-        conn = sqlite3.connect(DB_PATH)
+        conn = get_connection(DB_PATH)
         cursor = conn.cursor()
+        eski_hash = None
+        if yeni_fotograf:
+            cursor.execute('SELECT fotograf_hash FROM malzemetypes WHERE stokkodu = ?', (eski_stokkodu,))
+            row = cursor.fetchone()
+            eski_hash = row['fotograf_hash'] if row else None
         query = f"UPDATE malzemetypes SET {', '.join(update_fields)} WHERE stokkodu = ?"
         params.append(eski_stokkodu)
         cursor.execute(query, params)
         if cursor.rowcount == 0:
-            print(f"Hata: '{eski_stokkodu}' stok kodlu malzeme bulunamadı!")
-            conn.close()
+            log.warning("'%s' stok kodlu malzeme bulunamadı!", eski_stokkodu)
+            conn.rollback()
             return False
         if yeni_stokkodu is not None and yeni_stokkodu != eski_stokkodu:
             eski_table_name = f"stok_{eski_stokkodu.replace(' ', '').replace('-', '_')}"
             cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (eski_table_name,))
             if cursor.fetchone():
                 cursor.execute(f"DROP TABLE {eski_table_name}")
-                print(f"Eski stok tablosu silindi: {eski_table_name}")
-            create_stokkodu_table(yeni_stokkodu) 
+                log.info("Eski stok tablosu silindi: %s", eski_table_name)
+            _sticker_silme_olaylari(cursor, eski_stokkodu)
+            cursor.execute('DELETE FROM stickerlar WHERE stokkodu = ?', (eski_stokkodu,))
+            # Sayaç tetikleyicileri eski kodun satırını silmeler bitene kadar kullanır;
+            # sıfırlanan satır artık bir malzemeye ait değildir.
+            cursor.execute('DELETE FROM stok_sayaclari WHERE stokkodu = ?', (eski_stokkodu,))
+            _create_stokkodu_table(cursor, yeni_stokkodu)
         kullanilacak_stokkodu = yeni_stokkodu if (yeni_stokkodu and yeni_stokkodu != eski_stokkodu) else eski_stokkodu
+        if yeni_fotograf:
+            if fotograf_blob:
+                _fotograf_kaydet(cursor, fotograf_blob)
+            _fotograf_birak(cursor, eski_hash)
         if isim is not None or kategori is not None:
             table_name = f"stok_{kullanilacak_stokkodu.replace(' ', '').replace('-', '_')}"
             cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table_name,))
@@ -406,16 +653,16 @@ def update_malzeme_type(eski_stokkodu, yeni_stokkodu=None, isim=None, kategori=N
                 if update_sticker_fields:
                      sticker_query = f"UPDATE {table_name} SET {', '.join(update_sticker_fields)}"
                      cursor.execute(sticker_query, sticker_params)
-                     print(f"İlgili stok tablosu ({table_name}) güncellendi.")
+                     log.debug("İlgili stok tablosu (%s) güncellendi.", table_name)
         conn.commit()
-        conn.close()
-        print(f"Malzeme '{eski_stokkodu}' başarıyla güncellendi.")
+        if kategori is not None:
+            referans_onbellek.gecersiz_kil("kategoriler", "kategori_sayilari")
+        log.debug("Malzeme '%s' başarıyla güncellendi.", eski_stokkodu)
         return True
     except Exception as e:
-        print(f"Malzeme güncelleme hatası: {e}")
+        log.error("Malzeme güncelleme hatası: %s", e)
         if conn:
             conn.rollback()
-            conn.close()
         return False
 
 def update_kisi(kisi_id, yeni_kisiisim=None, yeni_bulunankat=None, yeni_bulunansube=None):
@@ -424,14 +671,11 @@ def update_kisi(kisi_id, yeni_kisiisim=None, yeni_bulunankat=None, yeni_bulunans
         update_fields = []
         params = []
         if yeni_kisiisim is not None:
-            conn_temp = sqlite3.connect(DB_PATH)
-            cursor_temp = conn_temp.cursor()
+            cursor_temp = get_connection(DB_PATH).cursor()
             cursor_temp.execute('SELECT id FROM kisiler WHERE kisiisim = ? AND id != ?', (yeni_kisiisim, kisi_id))
             if cursor_temp.fetchone():
-                print(f"Hata: '{yeni_kisiisim}' isimli başka bir kişi zaten var!")
-                conn_temp.close()
+                log.warning("'%s' isimli başka bir kişi zaten var!", yeni_kisiisim)
                 return False
-            conn_temp.close()
             update_fields.append("kisiisim = ?")
             params.append(yeni_kisiisim)
         if yeni_bulunankat is not None:
@@ -441,127 +685,95 @@ def update_kisi(kisi_id, yeni_kisiisim=None, yeni_bulunankat=None, yeni_bulunans
             update_fields.append("bulunansube = ?")
             params.append(yeni_bulunansube)
         if not update_fields:
-            print("Hata: Güncellenecek alan belirtilmedi!")
+            log.warning("Güncellenecek alan belirtilmedi!")
             return False
-        conn = sqlite3.connect(DB_PATH)
+        conn = get_connection(DB_PATH)
         cursor = conn.cursor()
-        cursor.execute("SELECT kisiisim FROM kisiler WHERE id = ?", (kisi_id,))
-        eski_kayit = cursor.fetchone()
-        if not eski_kayit:
-             print(f"Hata: ID'si {kisi_id} olan kişi bulunamadı!")
-             conn.close()
-             return False
-        eski_kisiisim = eski_kayit[0]
         query = f"UPDATE kisiler SET {', '.join(update_fields)} WHERE id = ?"
         params.append(kisi_id)
         cursor.execute(query, params)
-        if yeni_kisiisim is not None and yeni_kisiisim != eski_kisiisim:
-            eski_table_name = f"{eski_kisiisim}_malzemeleri".replace(' ', '').lower()
-            yeni_table_name = f"{yeni_kisiisim}_malzemeleri".replace(' ', '').lower()
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (eski_table_name,))
-            if cursor.fetchone():
-                try:
-                    cursor.execute(f'ALTER TABLE "{eski_table_name}" RENAME TO "{yeni_table_name}"')
-                    print(f"Kişi malzemeleri tablosu adı değiştirildi: '{eski_table_name}' -> '{yeni_table_name}'")
-                except sqlite3.Error as e:
-                    print(f"Kişi malzemeleri tablosu adı değiştirilirken hata: {e}")
-                    conn.rollback()
-                    conn.close()
-                    return False
-            else:
-                 print(f"Uyarı: '{eski_kisiisim}' için malzeme tablosu bulunamadı, adı değiştirilemedi.")
+        if cursor.rowcount == 0:
+             log.warning("ID'si %s olan kişi bulunamadı!", kisi_id)
+             conn.rollback()
+             return False
         conn.commit()
-        conn.close()
-        print(f"Kişi (ID: {kisi_id}) başarıyla güncellendi.")
+        referans_onbellek.gecersiz_kil("kisiler")
+        log.debug("Kişi (ID: %s) başarıyla güncellendi.", kisi_id)
         return True
     except Exception as e:
-        print(f"Kişi güncelleme hatası: {e}")
+        log.error("Kişi güncelleme hatası: %s", e)
         if conn:
             conn.rollback()
-            conn.close()
         return False
 
 def get_stickers(stokkodu):
     try:
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
+        conn = get_connection(DB_PATH)
         cursor = conn.cursor()
         table_name = f"stok_{stokkodu.replace(' ', '').replace('-', '_')}"
         cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table_name,))
         if not cursor.fetchone():
-            print(f"Hata: '{stokkodu}' stok kodlu malzeme için tablo bulunamadı!")
-            conn.close()
+            log.warning("'%s' stok kodlu malzeme için tablo bulunamadı!", stokkodu)
             return []
         cursor.execute(f'SELECT id, stickerkod, isim, kategori, olusturma_tarihi FROM {table_name} ORDER BY olusturma_tarihi DESC')
         rows = cursor.fetchall()
-        conn.close()
         return [dict(row) for row in rows]
     except Exception as e:
-        print(f"Sticker listesi getirme hatası: {e}")
+        log.error("Sticker listesi getirme hatası: %s", e)
         return []
 
 def update_varolana_yenizimmet(stickerid, kisiisimyeni):
     conn = None
     try:
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row 
+        conn = get_connection(DB_PATH)
         cursor = conn.cursor()
-        tum_kisiler = get_all_kisiler() 
-        eski_sahip_isim = None
-        eski_sahip_tablo = None
-        stok_tablo_adi = None
-        malzeme_ismi = None
-
-        cursor.execute('SELECT name FROM sqlite_master WHERE type="table" AND name LIKE "stok_%"')
-        stok_tablolari = cursor.fetchall()
-        for stok_tablo in stok_tablolari:
-            tablo_adi = stok_tablo[0]
-            cursor.execute(f'SELECT isim FROM "{tablo_adi}" WHERE stickerkod = ?', (stickerid,))
-            sonuc = cursor.fetchone()
-            if sonuc:
-                stok_tablo_adi = tablo_adi
-                malzeme_ismi = sonuc['isim']
-                break
-        
-        if not stok_tablo_adi:
-            print(f"Hata: '{stickerid}' sticker ID'si hiçbir stok tablosunda bulunamadı!")
-            conn.close()
+        cursor.execute('''
+            SELECT m.isim FROM stickerlar s JOIN malzemetypes m ON m.stokkodu = s.stokkodu
+            WHERE s.stickerkod = ?
+        ''', (stickerid,))
+        malzeme = cursor.fetchone()
+        if not malzeme:
+            log.warning("'%s' sticker ID'si hiçbir stok tablosunda bulunamadı!", stickerid)
             return False
+        malzeme_ismi = malzeme['isim']
 
-        for kisi in tum_kisiler:
-            kisi_tablo_adi = f"{kisi['kisiisim']}_malzemeleri".replace(' ', '').lower()
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (kisi_tablo_adi,))
-            if cursor.fetchone():
-                 cursor.execute(f'SELECT stickerid FROM "{kisi_tablo_adi}" WHERE stickerid = ?', (stickerid,))
-                 sonuc = cursor.fetchone()
-                 if sonuc:
-                     eski_sahip_isim = kisi['kisiisim']
-                     eski_sahip_tablo = kisi_tablo_adi
-                     break 
+        cursor.execute('SELECT id FROM kisiler WHERE kisiisim = ?', (kisiisimyeni,))
+        yeni_kisi = cursor.fetchone()
+        if not yeni_kisi:
+            log.warning("'%s' isimli kişi bulunamadı!", kisiisimyeni)
+            return False
 
-        if eski_sahip_isim:
-            cursor.execute(f'DELETE FROM "{eski_sahip_tablo}" WHERE stickerid = ?', (stickerid,))
-            print(f"'{stickerid}' sticker ID'si '{eski_sahip_isim}' kişisinden silindi.")
+        cursor.execute('''
+            SELECT a.kisi_id, k.kisiisim FROM assignments a LEFT JOIN kisiler k ON k.id = a.kisi_id
+            WHERE a.sticker_id = ?
+        ''', (stickerid,))
+        sonuc = cursor.fetchone()
+        eski_sahip_isim = None
+        if sonuc:
+            eski_sahip_isim = sonuc['kisiisim']
+            cursor.execute('DELETE FROM assignments WHERE sticker_id = ?', (stickerid,))
+            log.debug("'%s' sticker ID'si '%s' kişisinden silindi.", stickerid, eski_sahip_isim)
         else:
-            print(f"Bilgi: '{stickerid}' sticker ID'si hiçbir kişide bulunamadı, doğrudan zimmetleniyor.")
+            log.debug("'%s' sticker ID'si hiçbir kişide bulunamadı, doğrudan zimmetleniyor.", stickerid)
 
-        yeni_kisi_tablo = f"{kisiisimyeni}_malzemeleri".replace(' ', '').lower()
-        cursor.execute(f'INSERT INTO "{yeni_kisi_tablo}" (stickerid, isim) VALUES (?, ?)', (stickerid, malzeme_ismi))
+        cursor.execute('INSERT INTO assignments (sticker_id, kisi_id, isim) VALUES (?, ?, ?)', (stickerid, yeni_kisi['id'], malzeme_ismi))
+        if sonuc:
+            _olaylari_yaz(cursor, 'transfer', [(stickerid, yeni_kisi['id'], sonuc['kisi_id'])])
+        else:
+            _olaylari_yaz(cursor, 'zimmet', [(stickerid, yeni_kisi['id'], None)])
         
         conn.commit()
-        conn.close()
         
         if eski_sahip_isim:
-            print(f"'{stickerid}' sticker ID'si '{eski_sahip_isim}' kişisinden '{kisiisimyeni}' kişisine transfer edildi.")
+            log.debug("'%s' sticker ID'si '%s' kişisinden '%s' kişisine transfer edildi.", stickerid, eski_sahip_isim, kisiisimyeni)
         else:
-            print(f"'{stickerid}' sticker ID'si '{kisiisimyeni}' kişisine zimmetlendi.")
+            log.debug("'%s' sticker ID'si '%s' kişisine zimmetlendi.", stickerid, kisiisimyeni)
             
         return True 
     except Exception as e:
-        print(f"Sticker transfer hatası: {e}")
+        log.error("Sticker transfer hatası: %s", e)
         if conn:
             conn.rollback()
-            conn.close()
         return False
 
 def save_image_to_file(malzeme_data, output_path):
@@ -569,121 +781,542 @@ def save_image_to_file(malzeme_data, output_path):
         if malzeme_data and 'fotograf' in malzeme_data and malzeme_data['fotograf']:
             with open(output_path, 'wb') as f:
                 f.write(malzeme_data['fotograf'])
-            print(f"Fotoğraf '{output_path}' dosyasına kaydedildi.")
+            log.debug("Fotoğraf '%s' dosyasına kaydedildi.", output_path)
             return True
         else:
-            print("Hata: Fotoğraf verisi bulunamadı!")
+            log.warning("Fotoğraf verisi bulunamadı!")
             return False
     except Exception as e:
-        print(f"Fotoğraf kaydetme hatası: {e}")
+        log.error("Fotoğraf kaydetme hatası: %s", e)
         return False
 
-def search_malzeme_types(arama_metni):
+def _fotograf_satiri(cursor, stokkodu):
+    cursor.execute('''
+        SELECT f.id, f.boyut FROM malzemetypes m JOIN fotograflar f ON f.hash = m.fotograf_hash
+        WHERE m.stokkodu = ?
+    ''', (stokkodu,))
+    return cursor.fetchone()
+
+def stream_malzeme_fotograf(stokkodu, parca_boyutu=64 * 1024):
+    """Fotoğrafı tamamını belleğe almadan parça parça döndürür (artımlı BLOB okuma)."""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
+        conn = get_connection(DB_PATH)
         cursor = conn.cursor()
-        arama_metni_kucuk = arama_metni.lower()
-        cursor.execute('''
-            SELECT stokkodu, isim, kategori, fotograf,
-                   CASE WHEN fotograf IS NULL THEN 0 ELSE 1 END as fotograf_var
-            FROM malzemetypes
-            WHERE LOWER(stokkodu) LIKE ? OR LOWER(isim) LIKE ? OR LOWER(kategori) LIKE ?
-            ORDER BY isim
-        ''', (f'%{arama_metni_kucuk}%', f'%{arama_metni_kucuk}%', f'%{arama_metni_kucuk}%'))
+        row = _fotograf_satiri(cursor, stokkodu)
+        if not row:
+            return
+        if hasattr(conn, 'blobopen'):
+            with conn.blobopen('fotograflar', 'veri', row['id'], readonly=True) as blob:
+                while True:
+                    parca = blob.read(parca_boyutu)
+                    if not parca:
+                        break
+                    yield parca
+        else:
+            for baslangic in range(1, row['boyut'] + 1, parca_boyutu):
+                cursor.execute('SELECT substr(veri, ?, ?) FROM fotograflar WHERE id = ?',
+                               (baslangic, parca_boyutu, row['id']))
+                yield cursor.fetchone()[0]
+    except Exception as e:
+        log.error("Fotoğraf okuma hatası: %s", e)
+
+def get_malzeme_fotograf(stokkodu):
+    return b''.join(stream_malzeme_fotograf(stokkodu)) or None
+
+def _like_deseni(metin):
+    metin = metin.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f'%{metin}%'
+
+def _fts_match_ifadesi(metin, trigram):
+    if trigram:
+        return '"' + metin.replace('"', '""') + '"'
+    return ' '.join('"' + kelime.replace('"', '""') + '"*' for kelime in metin.split())
+
+def get_malzeme_kucuk_resim(stokkodu, boyut):
+    boyut = thumbnails.uygun_boyut(boyut)
+    conn = None
+    try:
+        conn = get_connection(DB_PATH)
+        cursor = conn.cursor()
+        cursor.execute('SELECT fotograf_hash FROM malzemetypes WHERE stokkodu = ?', (stokkodu,))
+        row = cursor.fetchone()
+        if not row or not row['fotograf_hash']:
+            return None
+        foto_hash = row['fotograf_hash']
+        veri = thumbnails.onbellek.get((foto_hash, boyut))
+        if veri is not None:
+            return veri
+        cursor.execute('SELECT veri FROM kucuk_resimler WHERE fotograf_hash = ? AND boyut = ?', (foto_hash, boyut))
+        row = cursor.fetchone()
+        if row:
+            veri = row['veri']
+        else:
+            fotograf = get_malzeme_fotograf(stokkodu)
+            if not fotograf:
+                return None
+            kucuk_resimler = _kucuk_resimleri_kaydet(cursor, foto_hash, fotograf)
+            conn.commit()
+            veri = kucuk_resimler.get(boyut, fotograf)
+        thumbnails.onbellek.put((foto_hash, boyut), veri)
+        return veri
+    except Exception as e:
+        log.error("Küçük resim getirme hatası: %s", e)
+        if conn:
+            conn.rollback()
+        return None
+
+_MALZEME_SECIMI = '''
+    SELECT m.stokkodu, m.isim, m.kategori,
+           CASE WHEN m.fotograf_hash IS NULL THEN 0 ELSE 1 END as fotograf_var
+'''
+
+# Liste sıralaması için izin verilen kolonlar; kategori NULL olabildiği için
+# idx_malzemetypes_kategori ile aynı ifade kullanılır.
+_MALZEME_SIRALAMA_IFADELERI = {
+    'stokkodu': 'm.stokkodu',
+    'isim': 'm.isim',
+    'kategori': "IFNULL(m.kategori, '')",
+}
+
+def _malzeme_siralama_ifadesi(sirala):
+    ifade = _MALZEME_SIRALAMA_IFADELERI.get(sirala)
+    if ifade is None:
+        raise ValueError(f"Geçersiz sıralama kolonu: {sirala}")
+    return ifade
+
+def _arama_kosulu(cursor, katlanmis):
+    """Arama metni için (FROM ... WHERE ..., parametreler, ilgi sırası) döndürür."""
+    cursor.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name='malzemetypes_fts'")
+    fts = cursor.fetchone()
+    trigram = fts is not None and 'trigram' in fts['sql']
+    if fts and (len(katlanmis) >= 3 or not trigram):
+        return ('''
+            FROM malzemetypes_fts f JOIN malzemetypes m ON m.rowid = f.rowid
+            WHERE malzemetypes_fts MATCH ?
+        ''', (_fts_match_ifadesi(katlanmis, trigram),), 'f.rank, m.isim')
+    desen = _like_deseni(katlanmis)
+    if fts:
+        return ('''
+            FROM malzemetypes_fts f JOIN malzemetypes m ON m.rowid = f.rowid
+            WHERE f.stokkodu LIKE ? ESCAPE '\\' OR f.isim LIKE ? ESCAPE '\\' OR f.kategori LIKE ? ESCAPE '\\'
+        ''', (desen, desen, desen), 'm.isim')
+    return (f'''
+        FROM malzemetypes m
+        WHERE {_turkce_katla_sql("m.stokkodu")} LIKE ? ESCAPE '\\'
+           OR {_turkce_katla_sql("m.isim")} LIKE ? ESCAPE '\\'
+           OR {_turkce_katla_sql("m.kategori")} LIKE ? ESCAPE '\\'
+    ''', (desen, desen, desen), 'm.isim')
+
+def search_malzeme_types(arama_metni, sirala=None, azalan=False, limit=None, offset=0):
+    try:
+        conn = get_connection(DB_PATH)
+        cursor = conn.cursor()
+        katlanmis = turkce_katla(arama_metni).strip()
+        if not katlanmis:
+            return []
+        kaynak, params, siralama = _arama_kosulu(cursor, katlanmis)
+        if sirala is not None:
+            yon = 'DESC' if azalan else 'ASC'
+            siralama = f"{_malzeme_siralama_ifadesi(sirala)} {yon}, m.stokkodu {yon}"
+        sorgu = f"{_MALZEME_SECIMI} {kaynak} ORDER BY {siralama}"
+        if limit is not None:
+            sorgu += ' LIMIT ? OFFSET ?'
+            params += (limit, offset)
+        cursor.execute(sorgu, params)
         rows = cursor.fetchall()
-        conn.close()
         return [dict(row) for row in rows]
     except Exception as e:
-        print(f"Malzeme tipi arama hatası: {e}")
+        log.error("Malzeme tipi arama hatası: %s", e)
         return []
 
+def count_search_malzeme_types(arama_metni):
+    try:
+        conn = get_connection(DB_PATH)
+        cursor = conn.cursor()
+        katlanmis = turkce_katla(arama_metni).strip()
+        if not katlanmis:
+            return 0
+        kaynak, params, _ = _arama_kosulu(cursor, katlanmis)
+        cursor.execute(f"SELECT COUNT(*) {kaynak}", params)
+        return cursor.fetchone()[0]
+    except Exception as e:
+        log.error("Malzeme tipi arama hatası: %s", e)
+        return 0
+
 def add_kategori(kategori_adi):
+    conn = None
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = get_connection(DB_PATH)
         cursor = conn.cursor()
         cursor.execute('SELECT id FROM kategoriler WHERE kategori_adi = ?', (kategori_adi,))
         if cursor.fetchone():
-            print(f"'{kategori_adi}' kategorisi zaten mevcut!")
-            conn.close()
+            log.warning("'%s' kategorisi zaten mevcut!", kategori_adi)
             return False
         cursor.execute('INSERT INTO kategoriler (kategori_adi) VALUES (?)', (kategori_adi,))
         conn.commit()
-        conn.close()
-        print(f"'{kategori_adi}' kategorisi başarıyla eklendi.")
+        referans_onbellek.gecersiz_kil("kategoriler", "kategori_sayilari")
+        log.debug("'%s' kategorisi başarıyla eklendi.", kategori_adi)
         return True
     except Exception as e:
-        print(f"Kategori ekleme hatası: {e}")
-        if 'conn' in locals() and conn:
+        log.error("Kategori ekleme hatası: %s", e)
+        if conn:
             conn.rollback()
-            conn.close()
         return False
 
+def _kategorileri_oku(conn):
+    cursor = conn.cursor()
+    cursor.execute('SELECT kategori_adi FROM kategoriler ORDER BY kategori_adi')
+    return [row['kategori_adi'] for row in cursor.fetchall()]
+
+def _kategori_sayilarini_hesapla(cursor):
+    """kategoriler.malzeme_adedi'ni malzemetypes'tan baştan hesaplar (tetikleyiciler sonrasını günceller)."""
+    cursor.execute('''
+        INSERT OR IGNORE INTO kategoriler (kategori_adi)
+        SELECT DISTINCT kategori FROM malzemetypes WHERE IFNULL(kategori, '') != ''
+    ''')
+    cursor.execute('SELECT kategori, COUNT(*) FROM malzemetypes GROUP BY kategori')
+    sayilar = cursor.fetchall()
+    cursor.execute('UPDATE kategoriler SET malzeme_adedi = 0')
+    cursor.executemany('UPDATE kategoriler SET malzeme_adedi = ? WHERE kategori_adi = ?',
+                       [(adet, kategori) for kategori, adet in sayilar])
+    return len(sayilar)
+
 def get_all_kategoriler():
     try:
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        cursor.execute('SELECT kategori_adi FROM kategoriler ORDER BY kategori_adi')
-        rows = cursor.fetchall()
-        conn.close()
-        return [row['kategori_adi'] for row in rows]
+        return referans_onbellek.getir("kategoriler", DB_PATH, _kategorileri_oku)
     except Exception as e:
-        print(f"Kategori listesi getirme hatası: {e}")
+        log.error("Kategori listesi getirme hatası: %s", e)
+        return []
+
+def _kategori_sayilarini_oku(conn):
+    cursor = conn.cursor()
+    cursor.execute('SELECT kategori_adi, malzeme_adedi FROM kategoriler ORDER BY kategori_adi')
+    return [dict(row) for row in cursor.fetchall()]
+
+def get_kategoriler_sayilari():
+    """Tüm kategoriler ve her birindeki malzeme tipi sayısı: [{'kategori_adi', 'malzeme_adedi'}]."""
+    try:
+        return referans_onbellek.getir("kategori_sayilari", DB_PATH, _kategori_sayilarini_oku, _satir_kopyasi)
+    except Exception as e:
+        log.error("Kategori sayıları getirme hatası: %s", e)
         return []
 
 def get_all_malzeme_types():
     try:
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row 
+        conn = get_connection(DB_PATH)
         cursor = conn.cursor()
         cursor.execute('''
             SELECT stokkodu, isim, kategori,
-                   CASE WHEN fotograf IS NULL THEN 0 ELSE 1 END as fotograf_var
+                   CASE WHEN fotograf_hash IS NULL THEN 0 ELSE 1 END as fotograf_var
             FROM malzemetypes
             ORDER BY isim
         ''')
         rows = cursor.fetchall()
-        conn.close()
         return [dict(row) for row in rows]
     except Exception as e:
-        print(f"Malzeme tipleri getirme hatası: {e}")
+        log.error("Malzeme tipleri getirme hatası: %s", e)
         return []
 
+def get_malzeme_types_sayfa(sirala='isim', azalan=False, sonra=None, limit=200):
+    """Malzeme listesinin bir sayfasını anahtar kümesi (keyset) ile döndürür.
+
+    sonra: önceki sayfanın son satırı; bir sonraki sayfa bu satırdan devam eder.
+    OFFSET kullanılmadığı için sayfa maliyeti katalog büyüdükçe artmaz.
+    """
+    try:
+        conn = get_connection(DB_PATH)
+        cursor = conn.cursor()
+        ifade = _malzeme_siralama_ifadesi(sirala)
+        yon, karsilastirma = ('DESC', '<') if azalan else ('ASC', '>')
+        params = []
+        kosul = ''
+        if sonra is not None:
+            if sirala == 'stokkodu':
+                kosul = f'WHERE m.stokkodu {karsilastirma} ?'
+                params.append(sonra['stokkodu'])
+            else:
+                # İlk koşul gereksiz görünür ama ifade indeksinde aralık aramasını sağlar.
+                kosul = f'WHERE {ifade} {karsilastirma}= ? AND ({ifade}, m.stokkodu) {karsilastirma} (?, ?)'
+                params.extend((sonra[sirala] or '', sonra[sirala] or '', sonra['stokkodu']))
+        siralama = 'm.stokkodu' if sirala == 'stokkodu' else f'{ifade} {yon}, m.stokkodu'
+        params.append(limit)
+        cursor.execute(f"{_MALZEME_SECIMI} FROM malzemetypes m {kosul} ORDER BY {siralama} {yon} LIMIT ?", params)
+        rows = cursor.fetchall()
+        return [dict(row) for row in rows]
+    except Exception as e:
+        log.error("Malzeme tipleri getirme hatası: %s", e)
+        return []
+
+def count_malzeme_types():
+    try:
+        conn = get_connection(DB_PATH)
+        cursor = conn.cursor()
+        cursor.execute('SELECT COUNT(*) FROM malzemetypes')
+        return cursor.fetchone()[0]
+    except Exception as e:
+        log.error("Malzeme tipi sayma hatası: %s", e)
+        return 0
+
 def get_kisi(kisiisim):
     try:
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row 
+        conn = get_connection(DB_PATH)
         cursor = conn.cursor()
         cursor.execute('SELECT id, kisiisim, bulunankat, bulunansube FROM kisiler WHERE kisiisim = ?', (kisiisim,))
         row = cursor.fetchone()
-        conn.close()
         if row:
             return dict(row)
         else:
             return None
     except Exception as e:
-        print(f"Kişi bilgisi getirme hatası: {e}")
+        log.error("Kişi bilgisi getirme hatası: %s", e)
         return None
 
 def get_zimmetli_malzemeler(kisiisim):
     try:
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row 
+        conn = get_connection(DB_PATH)
         cursor = conn.cursor()
-        table_name = f"{kisiisim}_malzemeleri".replace(' ', '').lower()
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table_name,))
-        if not cursor.fetchone():
-            print(f"Hata: '{kisiisim}' kişisine ait malzeme tablosu bulunamadı!")
-            conn.close()
+        cursor.execute('SELECT id FROM kisiler WHERE kisiisim = ?', (kisiisim,))
+        kisi = cursor.fetchone()
+        if not kisi:
+            log.warning("'%s' isimli kişi bulunamadı!", kisiisim)
             return []
-        cursor.execute(f'SELECT id, stickerid, isim, olusturmatarihi FROM "{table_name}" ORDER BY olusturmatarihi DESC')
+        cursor.execute('''
+            SELECT rowid AS id, sticker_id AS stickerid, isim, olusturmatarihi FROM assignments
+            WHERE kisi_id = ? ORDER BY olusturmatarihi DESC
+        ''', (kisi['id'],))
         rows = cursor.fetchall()
-        conn.close()
         return [dict(row) for row in rows]
     except Exception as e:
-        print(f"Zimmetli malzeme listesi getirme hatası: {e}")
+        log.error("Zimmetli malzeme listesi getirme hatası: %s", e)
         return []
 
+def get_sticker_stokkodu(stickerkod):
+    try:
+        conn = get_connection(DB_PATH)
+        cursor = conn.cursor()
+        cursor.execute('SELECT stokkodu FROM stickerlar WHERE stickerkod = ?', (stickerkod,))
+        row = cursor.fetchone()
+        return row[0] if row else None
+    except Exception as e:
+        log.error("Sticker stok kodu getirme hatası: %s", e)
+        return None
+
+def get_sticker_sahibi(stickerid):
+    try:
+        conn = get_connection(DB_PATH)
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT a.kisi_id, k.kisiisim, a.isim, a.olusturmatarihi
+            FROM assignments a LEFT JOIN kisiler k ON k.id = a.kisi_id
+            WHERE a.sticker_id = ?
+        ''', (stickerid,))
+        row = cursor.fetchone()
+        return dict(row) if row else None
+    except Exception as e:
+        log.error("Sticker sahibi getirme hatası: %s", e)
+        return None
+
+def _olay_zamani(tarih):
+    """Yerel saatle verilen tarihi olay zamanlarıyla (UTC, 'YYYY-AA-GG SS:DD:ss')
+    karşılaştırılabilir metne çevirir.
+
+    Saat verilmemişse yerel günün sonu alınır: "2024-03-01 tarihinde" o günün
+    bütün olaylarını kapsar. Saat dilimi taşıyan datetime'lar kendi dilimindedir.
+    """
+    if isinstance(tarih, datetime.datetime):
+        an = tarih
+    elif isinstance(tarih, datetime.date):
+        an = datetime.datetime.combine(tarih, datetime.time(23, 59, 59))
+    else:
+        metin = str(tarih).strip().replace('T', ' ')
+        if len(metin) == 10:
+            an = datetime.datetime.combine(datetime.date.fromisoformat(metin), datetime.time(23, 59, 59))
+        else:
+            an = datetime.datetime.fromisoformat(metin)
+    # Saat dilimsiz datetime'ı astimezone yerel saat kabul eder.
+    return an.astimezone(datetime.timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+def _zimmet_anlik_goruntusu(cursor):
+    # Görüntü satırı önce eklenir; olay_id aynı yazma işleminde okunduğundan
+    # görüntü ile o ana kadarki olaylar tutarlıdır.
+    cursor.execute('''
+        INSERT INTO zimmet_anlik_goruntuleri (olay_id, zaman, adet)
+        SELECT COALESCE(MAX(id), 0), CURRENT_TIMESTAMP, 0 FROM zimmet_olaylari
+    ''')
+    goruntu_id = cursor.lastrowid
+    cursor.execute('''
+        INSERT INTO zimmet_anlik_satirlari (goruntu_id, stickerkod, kisi_id, kisiisim)
+        SELECT ?, a.sticker_id, a.kisi_id, k.kisiisim
+        FROM assignments a LEFT JOIN kisiler k ON k.id = a.kisi_id
+    ''', (goruntu_id,))
+    adet = cursor.rowcount
+    cursor.execute('UPDATE zimmet_anlik_goruntuleri SET adet = ? WHERE id = ?', (adet, goruntu_id))
+    return adet
+
+def zimmet_anlik_goruntusu_al():
+    conn = None
+    try:
+        conn = get_connection(DB_PATH)
+        cursor = conn.cursor()
+        adet = _zimmet_anlik_goruntusu(cursor)
+        conn.commit()
+        log.info("Zimmet anlık görüntüsü alındı: %s zimmet.", adet)
+        return adet
+    except Exception as e:
+        log.error("Zimmet anlık görüntüsü hatası: %s", e)
+        if conn:
+            conn.rollback()
+        return None
+
+def zimmet_anlik_goruntusu_gerekirse(olay_araligi=None):
+    """Son görüntüden bu yana yeterince olay biriktiyse yeni görüntü alır; alınmadıysa None."""
+    olay_araligi = olay_araligi or config.ZIMMET_ANLIK_GORUNTU_OLAY_ARALIGI
+    try:
+        cursor = get_connection(DB_PATH).cursor()
+        cursor.execute('SELECT olay_id FROM zimmet_anlik_goruntuleri ORDER BY id DESC LIMIT 1')
+        son = cursor.fetchone()
+        cursor.execute('SELECT MAX(id) FROM zimmet_olaylari')
+        en_son_olay = cursor.fetchone()[0] or 0
+    except Exception as e:
+        log.error("Zimmet anlık görüntüsü kontrol hatası: %s", e)
+        return None
+    if en_son_olay - (son['olay_id'] if son else 0) < olay_araligi:
+        return None
+    return zimmet_anlik_goruntusu_al()
+
+def get_sticker_gecmisi(stickerkod):
+    try:
+        conn = get_connection(DB_PATH)
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT id, zaman, tur, kisi_id, kisiisim, eski_kisi_id, eski_kisiisim FROM zimmet_olaylari
+            WHERE stickerkod = ? ORDER BY zaman, id
+        ''', (stickerkod,))
+        return [dict(row) for row in cursor.fetchall()]
+    except Exception as e:
+        log.error("Sticker geçmişi getirme hatası: %s", e)
+        return []
+
+def get_kisi_gecmisi(kisiisim, limit=None):
+    """Kişiye zimmetlenen ve kişiden çıkan stickerların olayları, en yeniden eskiye."""
+    try:
+        conn = get_connection(DB_PATH)
+        cursor = conn.cursor()
+        cursor.execute('SELECT id FROM kisiler WHERE kisiisim = ?', (kisiisim,))
+        kisi = cursor.fetchone()
+        if not kisi:
+            log.warning("'%s' isimli kişi bulunamadı!", kisiisim)
+            return []
+        olaylar = {}
+        for sutun in ('kisi_id', 'eski_kisi_id'):
+            cursor.execute(f'''
+                SELECT id, zaman, tur, stickerkod, kisi_id, kisiisim, eski_kisi_id, eski_kisiisim
+                FROM zimmet_olaylari WHERE {sutun} = ? ORDER BY id DESC LIMIT ?
+            ''', (kisi['id'], -1 if limit is None else limit))
+            for row in cursor.fetchall():
+                olaylar[row['id']] = dict(row)
+        sirali = sorted(olaylar.values(), key=lambda olay: olay['id'], reverse=True)
+        return sirali if limit is None else sirali[:limit]
+    except Exception as e:
+        log.error("Kişi geçmişi getirme hatası: %s", e)
+        return []
+
+def _anlik_goruntu_tarihte(cursor, zaman):
+    cursor.execute('''
+        SELECT id, olay_id, zaman FROM zimmet_anlik_goruntuleri
+        WHERE zaman <= ? ORDER BY zaman DESC, id DESC LIMIT 1
+    ''', (zaman,))
+    return cursor.fetchone()
+
+def get_sticker_sahibi_tarihte(stickerkod, tarih):
+    """Stickerın verilen tarihteki sahibi.
+
+    durum: 'zimmetli', 'bosta' ya da kayıt o tarihe uzanmıyorsa 'bilinmiyor'.
+    """
+    try:
+        zaman = _olay_zamani(tarih)
+        conn = get_connection(DB_PATH)
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT tur, kisi_id, kisiisim, zaman FROM zimmet_olaylari
+            WHERE stickerkod = ? AND zaman <= ? AND tur IN ('zimmet', 'transfer', 'iade')
+            ORDER BY zaman DESC, id DESC LIMIT 1
+        ''', (stickerkod, zaman))
+        olay = cursor.fetchone()
+        if olay:
+            zimmetli = olay['tur'] != 'iade'
+            return {'stickerkod': stickerkod, 'durum': 'zimmetli' if zimmetli else 'bosta',
+                    'kisi_id': olay['kisi_id'] if zimmetli else None,
+                    'kisiisim': olay['kisiisim'] if zimmetli else None, 'zaman': olay['zaman']}
+        goruntu = _anlik_goruntu_tarihte(cursor, zaman)
+        if not goruntu:
+            return {'stickerkod': stickerkod, 'durum': 'bilinmiyor', 'kisi_id': None, 'kisiisim': None, 'zaman': None}
+        cursor.execute('''
+            SELECT kisi_id, kisiisim FROM zimmet_anlik_satirlari WHERE goruntu_id = ? AND stickerkod = ?
+        ''', (goruntu['id'], stickerkod))
+        satir = cursor.fetchone()
+        return {'stickerkod': stickerkod, 'durum': 'zimmetli' if satir else 'bosta',
+                'kisi_id': satir['kisi_id'] if satir else None,
+                'kisiisim': satir['kisiisim'] if satir else None, 'zaman': goruntu['zaman']}
+    except Exception as e:
+        log.error("Tarihteki sticker sahibi getirme hatası: %s", e)
+        return None
+
+def get_zimmetler_tarihte(tarih, kisiisim=None):
+    """Verilen tarihteki zimmetler (kisiisim verilirse yalnızca o kişininkiler).
+
+    Tarihten önceki en son anlık görüntüden başlar ve yalnızca ondan sonraki
+    olayları uygular. Kayıt o tarihe uzanmıyorsa None döner.
+    """
+    try:
+        zaman = _olay_zamani(tarih)
+        conn = get_connection(DB_PATH)
+        cursor = conn.cursor()
+        kisi_id = None
+        if kisiisim is not None:
+            cursor.execute('SELECT id FROM kisiler WHERE kisiisim = ?', (kisiisim,))
+            kisi = cursor.fetchone()
+            if not kisi:
+                log.warning("'%s' isimli kişi bulunamadı!", kisiisim)
+                return []
+            kisi_id = kisi['id']
+        goruntu = _anlik_goruntu_tarihte(cursor, zaman)
+        if not goruntu:
+            log.warning("Zimmet geçmişi %s tarihine uzanmıyor.", zaman)
+            return None
+        if kisi_id is None:
+            cursor.execute('''
+                SELECT stickerkod, kisi_id, kisiisim FROM zimmet_anlik_satirlari WHERE goruntu_id = ?
+            ''', (goruntu['id'],))
+            olay_sorgulari = [('''
+                SELECT id, tur, stickerkod, kisi_id, kisiisim FROM zimmet_olaylari
+                WHERE id > ? AND zaman <= ? AND tur IN ('zimmet', 'transfer', 'iade') ORDER BY id
+            ''', (goruntu['olay_id'], zaman))]
+        else:
+            cursor.execute('''
+                SELECT stickerkod, kisi_id, kisiisim FROM zimmet_anlik_satirlari WHERE goruntu_id = ? AND kisi_id = ?
+            ''', (goruntu['id'], kisi_id))
+            olay_sorgulari = [(f'''
+                SELECT id, tur, stickerkod, kisi_id, kisiisim FROM zimmet_olaylari
+                WHERE {sutun} = ? AND id > ? AND zaman <= ? ORDER BY id
+            ''', (kisi_id, goruntu['olay_id'], zaman)) for sutun in ('kisi_id', 'eski_kisi_id')]
+        zimmetler = {row['stickerkod']: (row['kisi_id'], row['kisiisim']) for row in cursor.fetchall()}
+        olaylar = {}
+        for sorgu, params in olay_sorgulari:
+            cursor.execute(sorgu, params)
+            for row in cursor.fetchall():
+                olaylar[row['id']] = row
+        for olay_id in sorted(olaylar):
+            olay = olaylar[olay_id]
+            if olay['tur'] == 'iade' or (kisi_id is not None and olay['kisi_id'] != kisi_id):
+                zimmetler.pop(olay['stickerkod'], None)
+            else:
+                zimmetler[olay['stickerkod']] = (olay['kisi_id'], olay['kisiisim'])
+        return [{'stickerid': stickerkod, 'kisi_id': sahip[0], 'kisiisim': sahip[1]}
+                for stickerkod, sahip in sorted(zimmetler.items())]
+    except Exception as e:
+        log.error("Tarihteki zimmetleri getirme hatası: %s", e)
+        return None
+
 if __name__ == "__main__":
     create_database()
\ No newline at end of file
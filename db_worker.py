@@ -0,0 +1,181 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+import config
+import gunluk
+
+log = gunluk.kaydedici(__name__)
+
+# Veritabanı çağrılarını GUI iş parçacığı dışında çalıştırır.
+# Tek bir arka plan iş parçacığı kullanılır: SQLite'a tek yazar yazabildiği gibi,
+# sırayla gönderilen bir yazma ve ardından gelen okuma da aynı sırada çalışır.
+# Sonuçlar Qt sinyaliyle GUI iş parçacığına geri taşınır; geri çağrılar hep
+# GUI iş parçacığında çalıştığı için pencereler doğrudan güncellenebilir.
+
+class DbIstek:
+    """Gönderilmiş bir veritabanı çağrısı. future alanı concurrent.futures.Future'dır."""
+
+    def __init__(self, anahtar, basarili, hata):
+        self.anahtar = anahtar
+        self.basarili = basarili
+        self.hata = hata
+        self.future = Future()
+        self.iptal_edildi = False
+
+    def iptal(self):
+        """Henüz başlamadıysa çalıştırılmaz; başladıysa sonucu yok sayılır."""
+        self.iptal_edildi = True
+        self.future.cancel()
+
+    def result(self, timeout=None):
+        return self.future.result(timeout)
+
+
+class _SinyalKoprusu(QObject):
+    tamamlandi = pyqtSignal(object)
+
+
+class DbWorker:
+    def __init__(self):
+        self._havuz = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db")
+        self._kopru = _SinyalKoprusu()
+        self._kopru.tamamlandi.connect(self._tamamlandi)
+        self._son_istekler = {}
+        self._kilit = threading.Lock()
+
+    def calistir(self, fn, *args, anahtar=None, basarili=None, hata=None, **kwargs):
+        """fn(*args, **kwargs)'ı arka planda çalıştırır.
+
+        anahtar verilirse aynı anahtarlı önceki istek iptal edilir (ör. kullanıcı
+        yazmaya devam ederken eski aramalar). basarili(sonuc) ve hata(istisna)
+        GUI iş parçacığında çağrılır.
+        """
+        istek = DbIstek(anahtar, basarili, hata)
+        if anahtar is not None:
+            with self._kilit:
+                onceki = self._son_istekler.get(anahtar)
+                self._son_istekler[anahtar] = istek
+            if onceki is not None:
+                onceki.iptal()
+        if not config.DB_ARKAPLAN_IS_PARCACIGI:
+            self._calistir(istek, fn, args, kwargs)
+            self._tamamlandi(istek)
+            return istek
+        self._havuz.submit(self._calistir, istek, fn, args, kwargs)
+        return istek
+
+    def _calistir(self, istek, fn, args, kwargs):
+        if not istek.future.set_running_or_notify_cancel():
+            return
+        try:
+            istek.future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            istek.future.set_exception(e)
+        if config.DB_ARKAPLAN_IS_PARCACIGI:
+            self._kopru.tamamlandi.emit(istek)
+
+    def _tamamlandi(self, istek):
+        if istek.anahtar is not None:
+            with self._kilit:
+                if self._son_istekler.get(istek.anahtar) is istek:
+                    del self._son_istekler[istek.anahtar]
+        if istek.iptal_edildi or istek.future.cancelled():
+            return
+        hata = istek.future.exception()
+        if hata is not None:
+            if istek.hata:
+                istek.hata(hata)
+            else:
+                log.error("Veritabanı isteği hatası: %s", hata)
+            return
+        if istek.basarili:
+            istek.basarili(istek.future.result())
+
+    def iptal(self, anahtar):
+        with self._kilit:
+            istek = self._son_istekler.pop(anahtar, None)
+        if istek is not None:
+            istek.iptal()
+
+    def kapat(self):
+        with self._kilit:
+            bekleyenler = list(self._son_istekler.values())
+            self._son_istekler.clear()
+        for istek in bekleyenler:
+            istek.iptal()
+        self._havuz.shutdown(wait=True, cancel_futures=True)
+
+
+_worker = None
+
+def worker():
+    """Uygulama genelindeki tek DbWorker; ilk çağrıda (GUI iş parçacığında) oluşturulur."""
+    global _worker
+    if _worker is None:
+        _worker = DbWorker()
+    return _worker
+
+def calistir(fn, *args, **kwargs):
+    return worker().calistir(fn, *args, **kwargs)
+
+def kapat():
+    global _worker
+    if _worker is not None:
+        _worker.kapat()
+        _worker = None
+
+
+class UIDonmaOlcer(QObject):
+    """GUI olay döngüsünün ne kadar geciktiğini ölçer.
+
+    Sabit aralıklı bir QTimer'ın gerçek tetiklenme aralığından beklenen aralık
+    çıkarılır; fark, olay döngüsünün o süre boyunca kilitli kaldığını gösterir.
+    """
+
+    def __init__(self, aralik_ms=16, donma_esigi_ms=50, parent=None):
+        super().__init__(parent)
+        self.aralik_ms = aralik_ms
+        self.donma_esigi_ms = donma_esigi_ms
+        self._gecikmeler = deque(maxlen=100_000)
+        self._onceki = None
+        self._zamanlayici = QTimer(self)
+        self._zamanlayici.setInterval(aralik_ms)
+        self._zamanlayici.timeout.connect(self._tik)
+
+    def baslat(self):
+        self._onceki = time.perf_counter()
+        self._zamanlayici.start()
+
+    def durdur(self):
+        self._zamanlayici.stop()
+
+    def _tik(self):
+        simdi = time.perf_counter()
+        gecen_ms = (simdi - self._onceki) * 1000
+        self._onceki = simdi
+        self._gecikmeler.append(max(0.0, gecen_ms - self.aralik_ms))
+
+    def ozet(self):
+        gecikmeler = sorted(self._gecikmeler)
+        if not gecikmeler:
+            return {"tik": 0}
+        def yuzdelik(p):
+            return gecikmeler[min(len(gecikmeler) - 1, int(len(gecikmeler) * p))]
+        donmalar = [g for g in gecikmeler if g >= self.donma_esigi_ms]
+        return {
+            "tik": len(gecikmeler),
+            "p50_ms": round(yuzdelik(0.50), 1),
+            "p95_ms": round(yuzdelik(0.95), 1),
+            "p99_ms": round(yuzdelik(0.99), 1),
+            "en_uzun_ms": round(gecikmeler[-1], 1),
+            "donma_sayisi": len(donmalar),
+            "toplam_donma_ms": round(sum(donmalar), 1),
+        }
+
+    def yazdir(self):
+        log.info("UI donma ölçümü (arka plan=%s): %s",
+                 "açık" if config.DB_ARKAPLAN_IS_PARCACIGI else "kapalı", self.ozet())
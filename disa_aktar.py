@@ -0,0 +1,162 @@
+import os
+import csv
+import sys
+import gzip
+import json
+import time
+import pathlib
+import sqlite3
+
+import config
+import database
+import gunluk
+
+# Envanterin tamamını dışa aktarır: malzeme -> sticker -> şu anki sahibi -> şube/kat.
+#
+#   rapor = disa_aktar.dosyaya_yaz("envanter.csv.gz")
+#   for satir in disa_aktar.satirlar(): ...
+#
+#   python disa_aktar.py envanter.jsonl [--db erp_database.db] [--bicim csv|jsonl] [--gzip]
+#
+# Tek bir JOIN sorgusu stickerları sahipleriyle birleştirir; satırlar fetchmany
+# ile DISA_AKTARIM_PARCA_BOYUTU'luk parçalar halinde okunup hemen yazılır. Bellek
+# kullanımı sticker sayısıyla büyümez. Sorgu tek bir okuma işlemidir: dosya,
+# aktarım sürerken yapılan yazmalardan etkilenmeyen tutarlı bir anlık görüntüdür.
+# Okuma ayrı, salt okunur bir bağlantıdan yapılır; uygulamanın bağlantıları
+# beklemez. Dosya önce .tmp uzantısıyla yazılır, bitince yerine taşınır.
+
+log = gunluk.kaydedici(__name__)
+
+SUTUNLAR = ("stokkodu", "malzeme", "kategori", "stickerkod",
+            "kisiisim", "bulunansube", "bulunankat", "zimmet_tarihi")
+
+_SORGU = '''
+    SELECT st.stokkodu, m.isim, m.kategori, st.stickerkod,
+           k.kisiisim, k.bulunansube, k.bulunankat, a.olusturmatarihi
+    FROM stickerlar st
+    LEFT JOIN malzemetypes m ON m.stokkodu = st.stokkodu
+    LEFT JOIN assignments a ON a.sticker_id = st.stickerkod
+    LEFT JOIN kisiler k ON k.id = a.kisi_id
+    ORDER BY st.stokkodu, st.stickerkod
+'''
+
+def _salt_okunur_baglanti(yol):
+    uri = pathlib.Path(os.path.abspath(yol)).as_uri() + "?mode=ro"
+    return sqlite3.connect(uri, uri=True)
+
+def parcalar(yol=None, parca_boyutu=None):
+    """Satırları (SUTUNLAR sırasıyla demetler) parça parça üretir."""
+    parca_boyutu = parca_boyutu or config.DISA_AKTARIM_PARCA_BOYUTU
+    conn = _salt_okunur_baglanti(yol or database.DB_PATH)
+    try:
+        cursor = conn.execute(_SORGU)
+        while True:
+            parca = cursor.fetchmany(parca_boyutu)
+            if not parca:
+                break
+            yield parca
+    finally:
+        conn.close()
+
+def satirlar(yol=None, parca_boyutu=None):
+    """Satırları sözlük olarak tek tek üretir."""
+    for parca in parcalar(yol, parca_boyutu):
+        for satir in parca:
+            yield dict(zip(SUTUNLAR, satir))
+
+def bicim_tahmini(dosya):
+    """Dosya adından (bicim, gzip) çıkarır: envanter.jsonl.gz -> ('jsonl', True)."""
+    ad = dosya.lower()
+    sikistir = ad.endswith(".gz")
+    if sikistir:
+        ad = ad[:-3]
+    return ("jsonl" if ad.endswith((".jsonl", ".json")) else "csv"), sikistir
+
+def _csv_yaz(f, kaynak, ilerleme):
+    yazici = csv.writer(f)
+    yazici.writerow(SUTUNLAR)
+    adet = 0
+    for parca in kaynak:
+        yazici.writerows(parca)
+        adet += len(parca)
+        if ilerleme:
+            ilerleme(adet)
+    return adet
+
+def _jsonl_yaz(f, kaynak, ilerleme):
+    kodla = json.JSONEncoder(ensure_ascii=False).encode
+    adet = 0
+    for parca in kaynak:
+        f.write("".join(kodla(dict(zip(SUTUNLAR, satir))) + "\n" for satir in parca))
+        adet += len(parca)
+        if ilerleme:
+            ilerleme(adet)
+    return adet
+
+def dosyaya_yaz(dosya, bicim=None, sikistir=None, yol=None, parca_boyutu=None, ilerleme=None):
+    """Envanteri dosyaya yazar; bicim/sikistir verilmezse dosya adından çıkarılır.
+
+    ilerleme(adet) her parçadan sonra çağrılır. Dönüş: {'dosya', 'bicim', 'gzip',
+    'satir', 'bayt', 'sure_sn', 'satir_sn'}; hata olursa None (yarım dosya kalmaz).
+    """
+    tahmin_bicim, tahmin_gzip = bicim_tahmini(dosya)
+    bicim = bicim or tahmin_bicim
+    sikistir = tahmin_gzip if sikistir is None else sikistir
+    if bicim not in ("csv", "jsonl"):
+        log.warning("Bilinmeyen dışa aktarım biçimi: %s", bicim)
+        return None
+    gecici = dosya + ".tmp"
+    yaz = _csv_yaz if bicim == "csv" else _jsonl_yaz
+    t0 = time.perf_counter()
+    kaynak = parcalar(yol, parca_boyutu)
+    try:
+        if sikistir:
+            f = gzip.open(gecici, "wt", encoding="utf-8", newline="", compresslevel=6)
+        else:
+            f = open(gecici, "w", encoding="utf-8", newline="")
+        with f:
+            adet = yaz(f, kaynak, ilerleme)
+        os.replace(gecici, dosya)
+    except Exception as e:
+        log.error("Dışa aktarım hatası: %s", e)
+        if os.path.exists(gecici):
+            os.remove(gecici)
+        return None
+    finally:
+        kaynak.close()
+    sure = time.perf_counter() - t0
+    rapor = {"dosya": dosya, "bicim": bicim, "gzip": sikistir, "satir": adet,
+             "bayt": os.path.getsize(dosya), "sure_sn": round(sure, 3),
+             "satir_sn": round(adet / sure) if sure > 0 else 0}
+    log.info("Envanter dışa aktarıldı: %s (%s satır, %s satır/sn)", dosya, adet, rapor["satir_sn"])
+    return rapor
+
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(description="ERP-APP envanter dışa aktarımı")
+    ap.add_argument("dosya", help="Hedef dosya (.csv, .jsonl; sonuna .gz eklenirse sıkıştırılır)")
+    ap.add_argument("--db", default=database.DB_PATH, help="Veritabanı dosyası")
+    ap.add_argument("--bicim", choices=("csv", "jsonl"), help="Dosya adından farklıysa")
+    ap.add_argument("--gzip", action="store_true", default=None, help="Dosya adı .gz ile bitmese de sıkıştır")
+    ap.add_argument("--parca", type=int, default=None, help="Okuma/yazma parça boyutu")
+    args = ap.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"Veritabanı bulunamadı: {args.db}", file=sys.stderr)
+        return 1
+    t0 = time.perf_counter()
+    def ilerleme(adet):
+        gecen = time.perf_counter() - t0
+        print(f"\r{adet} satır, {adet / gecen if gecen else 0:,.0f} satır/sn", end="", file=sys.stderr)
+    rapor = dosyaya_yaz(args.dosya, args.bicim, args.gzip, yol=args.db, parca_boyutu=args.parca,
+                        ilerleme=ilerleme if sys.stderr.isatty() else None)
+    if rapor is None:
+        print("\nDışa aktarım başarısız.", file=sys.stderr)
+        return 1
+    print(f"\r{rapor['dosya']}: {rapor['satir']} satır, {rapor['bayt']} bayt, "
+          f"{rapor['sure_sn']} sn ({rapor['satir_sn']} satır/sn)", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,8 +4,12 @@ from shutil import copy2
 from PyQt5.QtWidgets import QMainWindow, QFileDialog, QMessageBox
 from PyQt5.QtGui import QPixmap
 from PyQt5.QtCore import Qt, QStringListModel
-from database import add_stokkodlu_malzeme_tip, update_malzeme_type, get_all_malzeme_types, get_all_kategoriler, add_kategori
+from database import add_stokkodlu_malzeme_tip, update_malzeme_type, get_all_kategoriler, add_kategori, get_malzeme_kucuk_resim
 from ekle_duzenle_UI import Ui_kategori_combobox
+import db_worker
+import gunluk
+
+log = gunluk.kaydedici(__name__)
 
 class EkleDuzenleWindow(QMainWindow):
     def __init__(self, main_window, product=None):
@@ -24,19 +28,8 @@ class EkleDuzenleWindow(QMainWindow):
             self.ui.isimtext.setText(product['isim'])
             self.ui.kategori_combobox_2.setCurrentText(product['kategori'])
             if product.get('fotograf_var', 0) == 1:
-                import sqlite3
-                conn = sqlite3.connect('erp_database.db')
-                cursor = conn.cursor()
-                cursor.execute('SELECT fotograf FROM malzemetypes WHERE stokkodu = ?', (product['stokkodu'],))
-                fotograf_data = cursor.fetchone()
-                if fotograf_data:
-                    fotograf_data = fotograf_data[0]
-                    temp_path = os.path.join(os.getcwd(), "temp_edit.jpg")
-                    with open(temp_path, 'wb') as f:
-                        f.write(fotograf_data)
-                    pixmap = QPixmap(temp_path)
-                    self.ui.resim_label.setPixmap(pixmap.scaled(100, 100, Qt.AspectRatioMode.KeepAspectRatio))
-                conn.close()
+                db_worker.calistir(get_malzeme_kucuk_resim, product['stokkodu'], 100,
+                                   anahtar=f"urun_resmi_{id(self)}", basarili=self.show_photo)
         
         self.ui.geributton.clicked.connect(self.go_back)
         self.ui.yenilebutton.clicked.connect(self.refresh_ui)
@@ -44,17 +37,21 @@ class EkleDuzenleWindow(QMainWindow):
         self.ui.resimsecbutton.clicked.connect(self.select_image)
         self.ui.farkli_kategori_button.clicked.connect(self.add_category)
 
+    def show_photo(self, fotograf_data):
+        if fotograf_data and self.product and not self.secilen_resim_yolu:
+            pixmap = QPixmap()
+            pixmap.loadFromData(fotograf_data)
+            self.ui.resim_label.setPixmap(pixmap.scaled(100, 100, Qt.AspectRatioMode.KeepAspectRatio))
+
     def load_categories(self):
-        kategoriler = get_all_kategoriler()
-        
-        items = get_all_malzeme_types()
-        malzeme_kategorileri = list(set(item['kategori'] for item in items if item['kategori']))
-        
-        tum_kategoriler = list(set(kategoriler + malzeme_kategorileri))
-        tum_kategoriler.sort()
-        
+        db_worker.calistir(get_all_kategoriler, anahtar=f"kategoriler_{id(self)}", basarili=self.fill_categories)
+
+    def fill_categories(self, tum_kategoriler):
+        secili = self.ui.kategori_combobox_2.currentText() or (self.product['kategori'] if self.product else "")
         self.ui.kategori_combobox_2.clear()
         self.ui.kategori_combobox_2.addItems(tum_kategoriler)
+        if secili:
+            self.ui.kategori_combobox_2.setCurrentText(secili)
 
     def add_category(self):
         yeni_kategori = self.ui.farkli_kategori_text.text().strip()
@@ -66,7 +63,11 @@ class EkleDuzenleWindow(QMainWindow):
             QMessageBox.information(self, "Bilgi", f"'{yeni_kategori}' kategorisi zaten mevcut!")
             return
             
-        if add_kategori(yeni_kategori):
+        db_worker.calistir(add_kategori, yeni_kategori,
+                           basarili=lambda result: self.on_category_added(result, yeni_kategori))
+
+    def on_category_added(self, result, yeni_kategori):
+        if result:
             self.ui.kategori_combobox_2.addItem(yeni_kategori)
             self.ui.kategori_combobox_2.setCurrentText(yeni_kategori)
             self.ui.farkli_kategori_text.clear()
@@ -93,9 +94,9 @@ class EkleDuzenleWindow(QMainWindow):
         
         try:
             copy2(file_path, hedef_yol)
-            print(f"Resim başarıyla kopyalandı: {hedef_yol}")
+            log.debug("Resim başarıyla kopyalandı: %s", hedef_yol)
         except Exception as e:
-            print(f"Resim kopyalama hatası: {e}")
+            log.error("Resim kopyalama hatası: %s", e)
             return
         
         self.ui.resim_label.setPixmap(QPixmap(hedef_yol).scaled(100, 100, Qt.AspectRatioMode.KeepAspectRatio))
@@ -111,22 +112,24 @@ class EkleDuzenleWindow(QMainWindow):
             QMessageBox.warning(self, "Hata", "Stok kodu ve isim alanları boş bırakılamaz!")
             return
 
-        success = False
         if self.product:
-            success = update_malzeme_type(
-                eski_stokkodu=self.product['stokkodu'],
-                isim=isim,
-                kategori=kategori,
-                fotograf_yolu=resim_yolu
-            )
             kayit_mesaji = f"Güncellendi: {stokkodu} - {isim}"
+            db_worker.calistir(update_malzeme_type,
+                               eski_stokkodu=self.product['stokkodu'],
+                               isim=isim,
+                               kategori=kategori,
+                               fotograf_yolu=resim_yolu,
+                               basarili=lambda success: self.on_saved(success, kayit_mesaji))
         else:
-            success = add_stokkodlu_malzeme_tip(stokkodu, isim, kategori, resim_yolu)
-            if not success:
-                QMessageBox.warning(self, "Hata", f"'{stokkodu}' stok kodlu malzeme zaten var! Farklı bir stok kodu kullanın.")
-                return
             kayit_mesaji = f"Eklendi: {stokkodu} - {isim}"
+            def eklendi(success):
+                if not success:
+                    QMessageBox.warning(self, "Hata", f"'{stokkodu}' stok kodlu malzeme zaten var! Farklı bir stok kodu kullanın.")
+                    return
+                self.on_saved(success, kayit_mesaji)
+            db_worker.calistir(add_stokkodlu_malzeme_tip, stokkodu, isim, kategori, resim_yolu, basarili=eklendi)
 
+    def on_saved(self, success, kayit_mesaji):
         if success:
             model = self.ui.kaydetme_listbox.model()
             
@@ -155,13 +158,6 @@ class EkleDuzenleWindow(QMainWindow):
         self.load_categories()
         self.secilen_resim_yolu = None
         
-        temp_path = os.path.join(os.getcwd(), "temp_edit.jpg")
-        if os.path.exists(temp_path):
-            try:
-                os.remove(temp_path)
-            except:
-                pass
-        
         if self.product:
             self.ui.stokkoduekle_text.setReadOnly(False)
             self.product = None
\ No newline at end of file
@@ -0,0 +1,249 @@
+import os
+import sys
+
+import database
+import gunluk
+from connection_manager import get_connection
+
+# Envanter panosu: malzeme, kategori, kişi ve şube/kat başına sticker sayıları.
+#
+#   envanter.stok_durumu("IT0012")   -> {'toplam': 40, 'zimmetli': 31, 'bosta': 9, ...}
+#   envanter.sube_durumu("istanbul") -> {'zimmetli': 812, 'katlar': [...]}
+#
+# Sayılar stok_sayaclari, kategori_sayaclari, kisi_sayaclari ve konum_sayaclari
+# tablolarından okunur (bkz. migrations.py adım 10). Tablolar sticker, zimmet,
+# kişi ve malzeme yazmalarında tetikleyicilerle aynı işlemde güncellenir; burada
+# hiçbir sorgu stickerları ya da zimmetleri saymaz.
+#
+# Tanımlar:
+#   stok      toplam = malzemenin stickerları, zimmetli = bunlardan zimmetli olanlar
+#   kategori  malzemelerinin toplamı ('' kategorisiz malzemelerdir)
+#   kisi      kişinin zimmetleri
+#   konum     (bulunansube, bulunankat) başına, o konumdaki kişilerin zimmetleri
+#
+# yeniden_hesapla() sayaçları kaynak tablolardan baştan kurar; dogrula() kaynak
+# tablolarla karşılaştırıp farkları döndürür.
+#
+#   python envanter.py [--db erp_database.db] [--dogrula] [--onar]
+
+log = gunluk.kaydedici(__name__)
+
+# tablo -> (anahtar sütunları, değer sütunları, kaynak tablolardan beklenen değerler)
+_BEKLENEN = {
+    "stok_sayaclari": (("stokkodu",), ("kategori", "toplam", "zimmetli"), '''
+        SELECT m.stokkodu, IFNULL(m.kategori, ''),
+               (SELECT COUNT(*) FROM stickerlar st WHERE st.stokkodu = m.stokkodu),
+               (SELECT COUNT(*) FROM stickerlar st JOIN assignments a ON a.sticker_id = st.stickerkod
+                WHERE st.stokkodu = m.stokkodu)
+        FROM malzemetypes m
+    '''),
+    "kategori_sayaclari": (("kategori",), ("toplam", "zimmetli"), '''
+        SELECT IFNULL(m.kategori, ''), COUNT(st.stickerkod), COUNT(a.sticker_id)
+        FROM malzemetypes m
+        JOIN stickerlar st ON st.stokkodu = m.stokkodu
+        LEFT JOIN assignments a ON a.sticker_id = st.stickerkod
+        GROUP BY IFNULL(m.kategori, '')
+    '''),
+    "kisi_sayaclari": (("kisi_id",), ("zimmetli",), '''
+        SELECT k.id, (SELECT COUNT(*) FROM assignments a WHERE a.kisi_id = k.id) FROM kisiler k
+    '''),
+    "konum_sayaclari": (("bulunansube", "bulunankat"), ("zimmetli",), '''
+        SELECT IFNULL(k.bulunansube, ''), IFNULL(CAST(k.bulunankat AS TEXT), ''), COUNT(a.sticker_id)
+        FROM kisiler k LEFT JOIN assignments a ON a.kisi_id = k.id
+        GROUP BY 1, 2
+    '''),
+}
+
+def _sayaclari_hesapla(cursor):
+    adet = 0
+    for tablo, (anahtarlar, degerler, sorgu) in _BEKLENEN.items():
+        cursor.execute(f'DELETE FROM {tablo}')
+        cursor.execute(f"INSERT INTO {tablo} ({', '.join(anahtarlar + degerler)}) {sorgu}")
+        adet += cursor.rowcount
+    # Henüz malzemesi olmayan kategoriler de panoda sıfırla görünür.
+    cursor.execute("INSERT OR IGNORE INTO kategori_sayaclari (kategori) SELECT kategori_adi FROM kategoriler")
+    cursor.execute("INSERT OR IGNORE INTO kategori_sayaclari (kategori) SELECT kategori FROM stok_sayaclari")
+    return adet
+
+def _bos_mu(degerler):
+    return all(d in (0, '') for d in degerler)
+
+def yeniden_hesapla(yol=None):
+    """Sayaç tablolarını kaynak tablolardan baştan kurar."""
+    conn = None
+    try:
+        conn = get_connection(yol or database.DB_PATH)
+        cursor = conn.cursor()
+        cursor.execute('BEGIN IMMEDIATE')
+        adet = _sayaclari_hesapla(cursor)
+        conn.commit()
+        log.info("Envanter sayaçları yeniden hesaplandı: %s satır.", adet)
+        return True
+    except Exception as e:
+        log.error("Envanter sayaçlarını hesaplama hatası: %s", e)
+        if conn:
+            conn.rollback()
+        return False
+
+def dogrula(yol=None):
+    """Sayaçları kaynak tablolarla karşılaştırır.
+
+    Dönüş: {tablo: [{'anahtar', 'beklenen', 'mevcut'}]}; tutarlıysa boş sözlük,
+    hata olursa None. Sıfır sayaçlı satırla satırın hiç olmaması aynı sayılır.
+    """
+    try:
+        cursor = get_connection(yol or database.DB_PATH).cursor()
+        farklar = {}
+        for tablo, (anahtarlar, degerler, sorgu) in _BEKLENEN.items():
+            n = len(anahtarlar)
+            cursor.execute(sorgu)
+            beklenen = {tuple(row[:n]): tuple(row[n:]) for row in cursor.fetchall()}
+            cursor.execute(f"SELECT {', '.join(anahtarlar + degerler)} FROM {tablo}")
+            mevcut = {tuple(row[:n]): tuple(row[n:]) for row in cursor.fetchall()}
+            for anahtar in sorted(beklenen.keys() | mevcut.keys(), key=repr):
+                b, m = beklenen.get(anahtar), mevcut.get(anahtar)
+                if b == m or (b is None and _bos_mu(m[1:] if tablo == "stok_sayaclari" else m)) \
+                        or (m is None and _bos_mu(b)):
+                    continue
+                farklar.setdefault(tablo, []).append({
+                    'anahtar': anahtar if n > 1 else anahtar[0],
+                    'beklenen': dict(zip(degerler, b)) if b else None,
+                    'mevcut': dict(zip(degerler, m)) if m else None,
+                })
+        if farklar:
+            log.warning("Envanter sayaçları tutarsız: %s",
+                        ", ".join(f"{tablo} ({len(f)})" for tablo, f in farklar.items()))
+        return farklar
+    except Exception as e:
+        log.error("Envanter doğrulama hatası: %s", e)
+        return None
+
+def _stok_satiri(row):
+    durum = dict(row)
+    durum['bosta'] = durum['toplam'] - durum['zimmetli']
+    return durum
+
+def stok_durumu(stokkodu):
+    try:
+        cursor = get_connection(database.DB_PATH).cursor()
+        cursor.execute('SELECT stokkodu, kategori, toplam, zimmetli FROM stok_sayaclari WHERE stokkodu = ?',
+                       (stokkodu,))
+        row = cursor.fetchone()
+        return _stok_satiri(row) if row else None
+    except Exception as e:
+        log.error("Stok durumu getirme hatası: %s", e)
+        return None
+
+def stok_durumlari():
+    try:
+        cursor = get_connection(database.DB_PATH).cursor()
+        cursor.execute('SELECT stokkodu, kategori, toplam, zimmetli FROM stok_sayaclari ORDER BY stokkodu')
+        return [_stok_satiri(row) for row in cursor.fetchall()]
+    except Exception as e:
+        log.error("Stok durumları getirme hatası: %s", e)
+        return []
+
+def kategori_durumlari():
+    try:
+        cursor = get_connection(database.DB_PATH).cursor()
+        cursor.execute('SELECT kategori, toplam, zimmetli FROM kategori_sayaclari ORDER BY kategori')
+        return [_stok_satiri(row) for row in cursor.fetchall()]
+    except Exception as e:
+        log.error("Kategori durumları getirme hatası: %s", e)
+        return []
+
+def kisi_zimmet_adedi(kisiisim):
+    """Kişinin zimmet sayısı; kişi yoksa None."""
+    try:
+        cursor = get_connection(database.DB_PATH).cursor()
+        cursor.execute('''
+            SELECT IFNULL(s.zimmetli, 0) FROM kisiler k LEFT JOIN kisi_sayaclari s ON s.kisi_id = k.id
+            WHERE k.kisiisim = ?
+        ''', (kisiisim,))
+        row = cursor.fetchone()
+        return row[0] if row else None
+    except Exception as e:
+        log.error("Kişi zimmet sayısı getirme hatası: %s", e)
+        return None
+
+# konum_sayaclari katı metin olarak tutar ('' = kat yok); kisiler.bulunankat gibi
+# sayı (ya da None) döndürülür, katlar sayısal sırayla gelir.
+_KAT_SIRASI = "CAST(NULLIF(bulunankat, '') AS INTEGER), bulunankat"
+
+def _kat(deger):
+    if deger == '':
+        return None
+    return int(deger) if deger.lstrip('-').isdigit() else deger
+
+def _konum_satiri(row):
+    konum = dict(row)
+    konum['bulunankat'] = _kat(konum['bulunankat'])
+    if 'bulunansube' in konum:
+        konum['bulunansube'] = konum['bulunansube'] or None
+    return konum
+
+def sube_durumu(bulunansube):
+    """Şubedeki zimmetler, kat kat."""
+    try:
+        cursor = get_connection(database.DB_PATH).cursor()
+        cursor.execute(f'SELECT bulunankat, zimmetli FROM konum_sayaclari WHERE bulunansube = ? ORDER BY {_KAT_SIRASI}',
+                       (bulunansube or '',))
+        katlar = [_konum_satiri(row) for row in cursor.fetchall()]
+        return {'bulunansube': bulunansube, 'zimmetli': sum(kat['zimmetli'] for kat in katlar), 'katlar': katlar}
+    except Exception as e:
+        log.error("Şube durumu getirme hatası: %s", e)
+        return None
+
+def konum_durumlari():
+    try:
+        cursor = get_connection(database.DB_PATH).cursor()
+        cursor.execute(f'SELECT bulunansube, bulunankat, zimmetli FROM konum_sayaclari ORDER BY bulunansube, {_KAT_SIRASI}')
+        return [_konum_satiri(row) for row in cursor.fetchall()]
+    except Exception as e:
+        log.error("Konum durumları getirme hatası: %s", e)
+        return []
+
+def ozet():
+    """Tüm envanterin toplamları (kategori sayaçlarından)."""
+    try:
+        cursor = get_connection(database.DB_PATH).cursor()
+        cursor.execute('SELECT IFNULL(SUM(toplam), 0) AS toplam, IFNULL(SUM(zimmetli), 0) AS zimmetli FROM kategori_sayaclari')
+        return _stok_satiri(cursor.fetchone())
+    except Exception as e:
+        log.error("Envanter özeti getirme hatası: %s", e)
+        return None
+
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(description="ERP-APP envanter sayaçları")
+    ap.add_argument("--db", default=database.DB_PATH, help="Veritabanı dosyası")
+    ap.add_argument("--dogrula", action="store_true", help="Sayaçları kaynak tablolarla karşılaştır")
+    ap.add_argument("--onar", action="store_true", help="Sayaçları baştan hesapla")
+    args = ap.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"Veritabanı bulunamadı: {args.db}", file=sys.stderr)
+        return 1
+    database.DB_PATH = args.db
+    if args.onar and not yeniden_hesapla():
+        return 1
+    if args.dogrula:
+        farklar = dogrula()
+        if farklar is None:
+            return 1
+        for tablo, satirlar in farklar.items():
+            for fark in satirlar:
+                print(f"{tablo:<20}{fark['anahtar']!s:<24}beklenen={fark['beklenen']} mevcut={fark['mevcut']}")
+        print("Sayaçlar tutarlı." if not farklar else f"{sum(map(len, farklar.values()))} fark bulundu.")
+        return 1 if farklar else 0
+    genel = ozet()
+    if genel is None:
+        return 1
+    print(f"Toplam {genel['toplam']} sticker, {genel['zimmetli']} zimmetli, {genel['bosta']} boşta")
+    for kategori in kategori_durumlari():
+        print(f"  {kategori['kategori'] or '(kategorisiz)':<24}{kategori['toplam']:>8}{kategori['zimmetli']:>8}{kategori['bosta']:>8}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,17 +1,15 @@
 import sys
 import os
-import sqlite3
 from PyQt5.QtWidgets import QApplication, QMainWindow, QGraphicsScene
-from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QPixmap, QStandardItemModel, QStandardItem
-from database import get_all_malzeme_types, search_malzeme_types, delete_malzeme_type_complete
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtGui import QPixmap
+from database import delete_malzeme_type_complete, get_malzeme_kucuk_resim
+from malzeme_model import MalzemeTableModel
+import db_worker
 from erpmain_UI import Ui_MainWindow
-from ekle_duzenle import EkleDuzenleWindow
-from zimmetle import ZimmetleWindow
-from io import BytesIO
-from PIL import Image
+import gunluk
 
-UserRole = 256
+log = gunluk.kaydedici(__name__)
 
 class ErpMain(QMainWindow):
     def __init__(self):
@@ -20,15 +18,17 @@ class ErpMain(QMainWindow):
         self.ui.setupUi(self)
         self.selected_product = None
     
-        self.table_model = QStandardItemModel(0, 3)
-        self.table_model.setHorizontalHeaderLabels(["Stok Kodu", "Kategori", "İsim"])
+        self.table_model = MalzemeTableModel(self)
+        self.table_model.yuklendi.connect(self.on_model_loaded)
         self.ui.malzemelist.setModel(self.table_model)
         
         self.ui.malzemelist.setColumnWidth(0, 150) 
         self.ui.malzemelist.setColumnWidth(1, 150)
         self.ui.malzemelist.setColumnWidth(2, 250) 
         
-        self.load_malzeme_types()
+        # Sıralama veritabanında yapılır; bu çağrı ilk sayfayı da yükler.
+        self.ui.malzemelist.horizontalHeader().setSortIndicator(2, Qt.AscendingOrder)
+        self.ui.malzemelist.setSortingEnabled(True)
         self.ui.arabutton.clicked.connect(self.search_products)
         self.ui.eklebutton.clicked.connect(self.open_ekle_duzenle)
         self.ui.duzenlebutton.clicked.connect(self.open_ekle_duzenle)
@@ -38,95 +38,85 @@ class ErpMain(QMainWindow):
         self.ui.yenilebutton.clicked.connect(self.refresh_ui)
         
         self.ui.searchbox.returnPressed.connect(self.search_products)
+        
+        # Yazarken arama: son tuştan kısa süre sonra aranır, eski aramalar iptal edilir.
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(250)
+        self.search_timer.timeout.connect(self.search_products)
+        self.ui.searchbox.textChanged.connect(self.search_timer.start)
+
 
+    def set_sort_indicator(self, column):
+        # Yalnızca başlıktaki oku günceller; modelin yeniden sıralanmasını tetiklemez.
+        header = self.ui.malzemelist.horizontalHeader()
+        header.blockSignals(True)
+        header.setSortIndicator(column, Qt.AscendingOrder)
+        header.blockSignals(False)
+        header.viewport().update()
 
     def load_malzeme_types(self):
-        items = get_all_malzeme_types()
-        self.table_model.setRowCount(0)
-        
-        for row, item in enumerate(items):
-            stok_kodu = QStandardItem(item['stokkodu'])
-            isim = QStandardItem(item['isim'])
-            kategori = QStandardItem(item['kategori'] if 'kategori' in item else "")
-            
-            self.table_model.setItem(row, 0, stok_kodu)
-            self.table_model.setItem(row, 1, kategori)
-            self.table_model.setItem(row, 2, isim)
-            
-            stok_kodu.setData(item, UserRole) 
+        if self.ui.malzemelist.horizontalHeader().sortIndicatorSection() < 0:
+            self.set_sort_indicator(2)
+        self.table_model.ara("")
 
 
     def search_products(self):
+        self.search_timer.stop()
         text = self.ui.searchbox.text().strip()
         if not text:
             self.load_malzeme_types()
             return
-            
-        results = search_malzeme_types(text)
         
-        if results:
-            self.table_model.setRowCount(0)
-    
-            for row, item in enumerate(results):
-                stok_kodu = QStandardItem(item['stokkodu'])
-                isim = QStandardItem(item['isim'])
-                kategori = QStandardItem(item['kategori'] if item['kategori'] else "")
-                
-                self.table_model.setItem(row, 0, stok_kodu)
-                self.table_model.setItem(row, 1, kategori)
-                self.table_model.setItem(row, 2, isim)
-                
-                
-                stok_kodu.setData(item, UserRole)
-            
-            if self.table_model.rowCount() > 0:
-                index = self.table_model.index(0, 0)
-                self.ui.malzemelist.setCurrentIndex(index)
-                self.on_list_click(index)
-            
-            print(f"Arama sonucu: {len(results)} ürün bulundu.")
+        # Arama sonuçları ilgiye göre sıralanır; başlığa tıklanırsa kolona göre.
+        self.set_sort_indicator(-1)
+        self.table_model.ara(text)
+
+    def on_model_loaded(self, toplam):
+        text = self.table_model.arama_metni()
+        if not text:
+            return
+        if self.table_model.rowCount() > 0:
+            index = self.table_model.index(0, 0)
+            self.ui.malzemelist.setCurrentIndex(index)
+            self.on_list_click(index)
+            log.debug("Arama sonucu: %s ürün bulundu.", toplam)
         else:
-            self.table_model.setRowCount(0)
             self.ui.chosenmalzeme_label.setText("Sonuç bulunamadı")
             self.ui.urunfotograf_display.setScene(QGraphicsScene())
-            print(f"Arama sonucu: '{text}' için ürün bulunamadı.")
+            log.debug("Arama sonucu: '%s' için ürün bulunamadı.", text)
             
     def on_list_click(self, index):
         if index.isValid():
-            item = self.table_model.itemFromIndex(index.siblingAtColumn(0))
-            
-            if item:
-                self.selected_product = item.data(UserRole)
-                if self.selected_product:
-                    self.ui.chosenmalzeme_label.setText(self.selected_product['isim'])
-                    
-                    if self.selected_product.get('fotograf_var', 0) == 1:
-                        conn = sqlite3.connect('erp_database.db')
-                        cursor = conn.cursor()
-                        cursor.execute('SELECT fotograf FROM malzemetypes WHERE stokkodu = ?', (self.selected_product['stokkodu'],))
-                        fotograf_data = cursor.fetchone()
-                        if fotograf_data:
-                            fotograf_data = fotograf_data[0]
-                            temp_path = os.path.join(os.getcwd(), "temp_product.jpg")
-                            with open(temp_path, 'wb') as f:
-                                f.write(fotograf_data)
-                            pixmap = QPixmap(temp_path)
-                        else:
-                            pixmap = QPixmap()
-                        conn.close()
-                    else:
-                        pixmap = QPixmap()
-                        
-                    
-                    scene = QGraphicsScene()
-                    scene.addPixmap(pixmap.scaled(1000, 1000, Qt.AspectRatioMode.KeepAspectRatio))
-                    self.ui.urunfotograf_display.setScene(scene)
+            self.selected_product = self.table_model.satir(index.row())
+            if self.selected_product:
+                self.ui.chosenmalzeme_label.setText(self.selected_product['isim'])
+                
+                if self.selected_product.get('fotograf_var', 0) == 1:
+                    stokkodu = self.selected_product['stokkodu']
+                    db_worker.calistir(get_malzeme_kucuk_resim, stokkodu, 1000, anahtar="urun_fotografi",
+                                       basarili=lambda data: self.show_photo(stokkodu, data))
+                else:
+                    db_worker.worker().iptal("urun_fotografi")
+                    self.show_photo(self.selected_product['stokkodu'], None)
+
+    def show_photo(self, stokkodu, fotograf_data):
+        if not self.selected_product or self.selected_product['stokkodu'] != stokkodu:
+            return
+        pixmap = QPixmap()
+        if fotograf_data:
+            pixmap.loadFromData(fotograf_data)
+        scene = QGraphicsScene()
+        scene.addPixmap(pixmap.scaled(1000, 1000, Qt.AspectRatioMode.KeepAspectRatio))
+        self.ui.urunfotograf_display.setScene(scene)
 
     def select_product(self):
         if self.selected_product:
             self.ui.chosenmalzeme_label.setText(self.selected_product['isim'])
 
+    # İkincil pencereler (ve *_UI modülleri) açılışı yavaşlatmasın diye ilk kullanımda yüklenir.
     def open_ekle_duzenle(self):
+        from ekle_duzenle import EkleDuzenleWindow
         self.edit_window = EkleDuzenleWindow(self, self.selected_product)
         self.edit_window.show()
         self.hide()
@@ -134,6 +124,7 @@ class ErpMain(QMainWindow):
     def open_zimmetle(self):
         if not self.selected_product:
             return
+        from zimmetle import ZimmetleWindow
         self.zimmet_window = ZimmetleWindow(self, self.selected_product)
         self.zimmet_window.show()
         self.hide()
@@ -141,12 +132,12 @@ class ErpMain(QMainWindow):
     def delete_product(self):
         if not self.selected_product:
             return
-        result = delete_malzeme_type_complete(self.selected_product['stokkodu'])
-        if result:
-            self.refresh_ui()
+        db_worker.calistir(delete_malzeme_type_complete, self.selected_product['stokkodu'],
+                           basarili=lambda result: self.refresh_ui() if result else None)
 
     def refresh_ui(self):
         self.ui.searchbox.clear()
+        self.search_timer.stop()
         self.ui.chosenmalzeme_label.setText("")
         
         
@@ -154,13 +145,6 @@ class ErpMain(QMainWindow):
         
         self.selected_product = None
         self.load_malzeme_types()
-        
-        temp_path = os.path.join(os.getcwd(), "temp_product.jpg")
-        if os.path.exists(temp_path):
-            try:
-                os.remove(temp_path)
-            except:
-                pass
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
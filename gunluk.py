@@ -0,0 +1,73 @@
+import sys
+import atexit
+import logging
+
+import config
+
+# Uygulama günlüğü. Modüller kendi kaydedicisini alır:
+#
+#   log = gunluk.kaydedici(__name__)
+#   log.debug("'%s' kişisi eklendi. ID: %s", isim, kisi_id)
+#
+# Mesajlar % biçiminde, argümanlar ayrı verilir; seviye kapalıysa metin hiç
+# biçimlendirilmez. kur() çağrıldığında kayıtlar bir kuyruğa bırakılır ve
+# dosyaya/konsola ayrı bir iş parçacığı yazar; çağıran iş parçacığı G/Ç beklemez.
+# logging.handlers yalnızca kur() içinde yüklenir (açılışta ~10 ms).
+
+KOK = "erp"
+BICIM = "%(asctime)s %(levelname)-7s %(threadName)s %(name)s: %(message)s"
+
+_dinleyici = None
+_isleyici = None
+
+def kaydedici(ad):
+    """'erp' altında bir kaydedici döndürür (ör. erp.database)."""
+    return logging.getLogger(f"{KOK}.{ad}")
+
+def _hedef_isleyici():
+    if config.LOG_DOSYASI:
+        from logging.handlers import RotatingFileHandler
+        isleyici = RotatingFileHandler(
+            config.LOG_DOSYASI, maxBytes=config.LOG_DOSYA_BOYUTU, backupCount=3, encoding="utf-8")
+    elif sys.stderr is not None:
+        isleyici = logging.StreamHandler(sys.stderr)
+    else:
+        # PyInstaller console=False: yazılacak konsol yok.
+        return None
+    isleyici.setFormatter(logging.Formatter(BICIM))
+    return isleyici
+
+def kur(seviye=None):
+    """Günlüğü ERP_LOG_SEVIYESI / ERP_LOG_DOSYASI ayarlarıyla kurar. Tekrar çağrılırsa yalnızca seviyeyi değiştirir."""
+    global _dinleyici, _isleyici
+    kok = logging.getLogger(KOK)
+    kok.setLevel((seviye or config.LOG_SEVIYESI).upper())
+    if _isleyici is not None:
+        return kok
+    hedef = _hedef_isleyici()
+    if hedef is None:
+        _isleyici = logging.NullHandler()
+    else:
+        import queue
+        from logging.handlers import QueueHandler, QueueListener
+        kuyruk = queue.SimpleQueue()
+        _isleyici = QueueHandler(kuyruk)
+        _dinleyici = QueueListener(kuyruk, hedef, respect_handler_level=True)
+        _dinleyici.start()
+    kok.addHandler(_isleyici)
+    kok.propagate = False
+    return kok
+
+def kapat():
+    """Kuyrukta bekleyen kayıtları yazar ve yazıcı iş parçacığını durdurur."""
+    global _dinleyici, _isleyici
+    kok = logging.getLogger(KOK)
+    if _isleyici is not None:
+        kok.removeHandler(_isleyici)
+        kok.propagate = True
+        _isleyici = None
+    if _dinleyici is not None:
+        _dinleyici.stop()
+        _dinleyici = None
+
+atexit.register(kapat)
@@ -0,0 +1,298 @@
+import os
+import re
+import csv
+import sys
+import time
+from itertools import islice
+
+import config
+import database
+import gunluk
+import referans_onbellek
+from connection_manager import get_connection
+
+# Toplu içe aktarım: kişiler, malzemeler ve etiketi zaten basılmış stickerlar
+# (isteğe bağlı sahibiyle). Yeni bir şubenin açılışı gibi binlerce satırlık
+# girişler için.
+#
+#   python ice_aktar.py kisiler kisiler.csv [--db erp_database.db] [--kuru]
+#   rapor = ice_aktar.dosyadan_aktar("stickerlar.csv", "stickerlar")
+#
+# Sütunlar (başlık satırı, büyük/küçük harf önemsiz):
+#   kisiler     kisiisim, [bulunankat], [bulunansube]
+#   malzemeler  stokkodu, isim, [kategori]
+#   stickerlar  stickerkod, stokkodu, [kisiisim]
+#
+# Dosya satır satır okunur; satırlar ICE_AKTARIM_PARCA_BOYUTU'luk parçalar halinde
+# doğrulanır, hem dosyanın kendi içinde hem veritabanındaki kayıtlara karşı
+# tekrarlardan ayıklanır ve her parça tek işlemde executemany ile yazılır.
+# Geçmeyen satırlar nedeniyle birlikte ret dosyasına (<dosya>.red.csv) yazılır.
+# --kuru her parçayı yazıp geri alır: veritabanı değişmez, rapor ve ret dosyası
+# gerçek çalıştırmadakiyle aynıdır. Stickerlar için malzemeler ve kişiler önce
+# aktarılmış olmalıdır. Excel'in ';' ayırıcılı, BOM'lu CSV çıktısı olduğu gibi okunur.
+
+log = gunluk.kaydedici(__name__)
+
+_STOKKODU = re.compile(r"[\w\- ]+")
+
+def _alan(satir, ad):
+    return (satir.get(ad) or "").strip()
+
+def _kisi_hazirla(satir):
+    kisiisim = _alan(satir, "kisiisim")
+    if not kisiisim:
+        return None, "eksik_kisiisim"
+    bulunankat = _alan(satir, "bulunankat")
+    if bulunankat:
+        # Kat add_kisi'deki gibi herhangi bir tam sayıdır: zemin 0, bodrum -1.
+        try:
+            bulunankat = int(bulunankat)
+        except ValueError:
+            return None, "gecersiz_kat"
+    else:
+        bulunankat = None
+    return (kisiisim, bulunankat, _alan(satir, "bulunansube") or None), None
+
+def _malzeme_hazirla(satir):
+    stokkodu, isim = _alan(satir, "stokkodu"), _alan(satir, "isim")
+    if not stokkodu or not isim:
+        return None, "eksik_stokkodu_isim"
+    if not _STOKKODU.fullmatch(stokkodu):
+        return None, "gecersiz_stokkodu"
+    return (stokkodu, isim, _alan(satir, "kategori") or None), None
+
+def _sticker_hazirla(satir):
+    stickerkod, stokkodu = _alan(satir, "stickerkod"), _alan(satir, "stokkodu")
+    if not stickerkod or not stokkodu:
+        return None, "eksik_stickerkod_stokkodu"
+    numara = database.sticker_numarasi(stickerkod, stokkodu)
+    if numara is None:
+        return None, "gecersiz_stickerkod"
+    return (stickerkod, stokkodu, _alan(satir, "kisiisim") or None, numara), None
+
+def _mevcut(cursor, sorgu, degerler):
+    # IN listesi SQLite'ın parametre sınırına takılmasın diye bölünür.
+    degerler, mevcut = list(set(degerler)), {}
+    for i in range(0, len(degerler), 1000):
+        dilim = degerler[i:i + 1000]
+        cursor.execute(sorgu.format(database._yer_tutucular(len(dilim))), dilim)
+        mevcut.update((row[0], row) for row in cursor.fetchall())
+    return mevcut
+
+def _kisileri_yaz(cursor, adaylar):
+    mevcut = _mevcut(cursor, 'SELECT kisiisim FROM kisiler WHERE kisiisim IN ({})',
+                     [deger[0] for _, _, deger in adaylar])
+    redler = [(no, satir, "mevcut") for no, satir, deger in adaylar if deger[0] in mevcut]
+    yeni = [deger for _, _, deger in adaylar if deger[0] not in mevcut]
+    cursor.executemany('INSERT INTO kisiler (kisiisim, bulunankat, bulunansube) VALUES (?, ?, ?)', yeni)
+    return len(yeni), redler
+
+def _malzemeleri_yaz(cursor, adaylar):
+    mevcut = _mevcut(cursor, 'SELECT stokkodu FROM malzemetypes WHERE stokkodu IN ({})',
+                     [deger[0] for _, _, deger in adaylar])
+    redler = [(no, satir, "mevcut") for no, satir, deger in adaylar if deger[0] in mevcut]
+    yeni = [deger for _, _, deger in adaylar if deger[0] not in mevcut]
+    cursor.executemany('INSERT INTO malzemetypes (stokkodu, isim, kategori) VALUES (?, ?, ?)', yeni)
+    for stokkodu, _, _ in yeni:
+        database._create_stokkodu_table(cursor, stokkodu)
+    return len(yeni), redler
+
+def _stickerlari_yaz(cursor, adaylar):
+    malzemeler = _mevcut(cursor, 'SELECT stokkodu, isim, kategori FROM malzemetypes WHERE stokkodu IN ({})',
+                         [deger[1] for _, _, deger in adaylar])
+    stickerlar = _mevcut(cursor, 'SELECT stickerkod FROM stickerlar WHERE stickerkod IN ({})',
+                         [deger[0] for _, _, deger in adaylar])
+    kisiler = _mevcut(cursor, 'SELECT kisiisim, id FROM kisiler WHERE kisiisim IN ({})',
+                      [deger[2] for _, _, deger in adaylar if deger[2]])
+    redler, yeni = [], []
+    for no, satir, deger in adaylar:
+        stickerkod, stokkodu, kisiisim, _ = deger
+        if stokkodu not in malzemeler:
+            redler.append((no, satir, "malzeme_yok"))
+        elif stickerkod in stickerlar:
+            redler.append((no, satir, "mevcut"))
+        elif kisiisim and kisiisim not in kisiler:
+            redler.append((no, satir, "kisi_yok"))
+        else:
+            yeni.append(deger)
+    gruplar = {}
+    for deger in yeni:
+        gruplar.setdefault(deger[1], []).append(deger)
+    son_numaralar = {}
+    for stokkodu, grup in gruplar.items():
+        malzeme = malzemeler[stokkodu]
+        table_name = database._create_stokkodu_table(cursor, stokkodu)
+        cursor.executemany(f'INSERT INTO {table_name} (stickerkod, isim, kategori) VALUES (?, ?, ?)',
+                           [(deger[0], malzeme['isim'], malzeme['kategori']) for deger in grup])
+        for _, _, _, (yil, numara) in grup:
+            anahtar = (stokkodu, yil)
+            son_numaralar[anahtar] = max(son_numaralar.get(anahtar, 0), numara)
+    cursor.executemany('INSERT INTO stickerlar (stickerkod, stokkodu) VALUES (?, ?)',
+                       [(deger[0], deger[1]) for deger in yeni])
+    # Yeni basılacak stickerlar aktarılan numaraların üstünden devam eder; sayaç
+    # satırı yoksa ilk sticker eklenirken zaten en büyük numaradan başlatılır.
+    cursor.executemany('''
+        UPDATE sticker_sayaclari SET son_numara = MAX(son_numara, ?) WHERE stokkodu = ? AND yil = ?
+    ''', [(numara, stokkodu, yil) for (stokkodu, yil), numara in son_numaralar.items()])
+    database._olaylari_yaz(cursor, 'sticker_olustur', [(deger[0], None, None) for deger in yeni])
+    zimmetler = [(deger[0], kisiler[deger[2]]['id'], malzemeler[deger[1]]['isim']) for deger in yeni if deger[2]]
+    cursor.executemany('INSERT INTO assignments (sticker_id, kisi_id, isim) VALUES (?, ?, ?)', zimmetler)
+    database._olaylari_yaz(cursor, 'zimmet', [(stickerid, kisi_id, None) for stickerid, kisi_id, _ in zimmetler])
+    return len(yeni), redler
+
+# tür -> (zorunlu sütunlar, satır hazırlayıcı, parça yazıcı, önbellekten düşecek veriler)
+TURLER = {
+    "kisiler": (("kisiisim",), _kisi_hazirla, _kisileri_yaz, ("kisiler",)),
+    "malzemeler": (("stokkodu", "isim"), _malzeme_hazirla, _malzemeleri_yaz, ("kategoriler", "kategori_sayilari")),
+    "stickerlar": (("stickerkod", "stokkodu"), _sticker_hazirla, _stickerlari_yaz, ()),
+}
+
+def aktar(tur, satirlar, yol=None, kuru=False, parca_boyutu=None, reddet=None, ilerleme=None, ilk_no=1):
+    """satirlar (sütun adı -> metin sözlükleri) içindeki kayıtları ekler.
+
+    reddet(no, satir, neden) geçmeyen her satır için, ilerleme(rapor) her
+    parçadan sonra çağrılır; no, ilk_no'dan başlayan satır numarasıdır.
+    Dönüş: {'tur', 'kuru', 'okunan', 'eklenen', 'reddedilen', 'nedenler',
+    'sure_sn', 'satir_sn'}.
+    """
+    _, hazirla, yaz, onbellek = TURLER[tur]
+    parca_boyutu = parca_boyutu or config.ICE_AKTARIM_PARCA_BOYUTU
+    conn = get_connection(yol or database.DB_PATH)
+    cursor = conn.cursor()
+    if conn.in_transaction:
+        conn.commit()
+    rapor = {"tur": tur, "kuru": kuru, "okunan": 0, "eklenen": 0, "reddedilen": 0,
+             "nedenler": {}, "sure_sn": 0.0, "satir_sn": 0}
+
+    def red(no, satir, neden):
+        rapor["reddedilen"] += 1
+        rapor["nedenler"][neden] = rapor["nedenler"].get(neden, 0) + 1
+        if reddet:
+            reddet(no, satir, neden)
+
+    gorulen = set()
+    satirlar = enumerate(satirlar, ilk_no)
+    t0 = time.perf_counter()
+    while True:
+        parca = list(islice(satirlar, parca_boyutu))
+        if not parca:
+            break
+        rapor["okunan"] += len(parca)
+        adaylar, redler = [], []
+        for no, satir in parca:
+            deger, neden = hazirla(satir)
+            if neden:
+                redler.append((no, satir, neden))
+            elif deger[0] in gorulen:
+                redler.append((no, satir, "dosyada_tekrar"))
+            else:
+                gorulen.add(deger[0])
+                adaylar.append((no, satir, deger))
+        if adaylar:
+            try:
+                cursor.execute('BEGIN IMMEDIATE')
+                eklenen, yazilmayan = yaz(cursor, adaylar)
+                if kuru:
+                    conn.rollback()
+                else:
+                    conn.commit()
+            except Exception as e:
+                log.error("İçe aktarım hatası (satır %s-%s): %s", adaylar[0][0], adaylar[-1][0], e)
+                conn.rollback()
+                eklenen, yazilmayan = 0, [(no, satir, "hata") for no, satir, _ in adaylar]
+            rapor["eklenen"] += eklenen
+            redler.extend(yazilmayan)
+        for no, satir, neden in sorted(redler, key=lambda r: r[0]):
+            red(no, satir, neden)
+        sure = time.perf_counter() - t0
+        rapor["sure_sn"] = round(sure, 3)
+        rapor["satir_sn"] = round(rapor["okunan"] / sure) if sure > 0 else 0
+        if ilerleme:
+            ilerleme(rapor)
+    if rapor["eklenen"] and not kuru and onbellek:
+        referans_onbellek.gecersiz_kil(*onbellek)
+    log.info("İçe aktarım (%s%s): %s okundu, %s eklendi, %s reddedildi.", tur, ", kuru" if kuru else "",
+             rapor["okunan"], rapor["eklenen"], rapor["reddedilen"])
+    return rapor
+
+def red_dosyasi_adi(dosya):
+    kok, _ = os.path.splitext(dosya)
+    return kok + ".red.csv"
+
+def dosyadan_aktar(dosya, tur, red_dosyasi=None, ayirici=None, **kwargs):
+    """CSV dosyasını aktarır; geçmeyen satırları red_dosyasi'na yazar.
+
+    Ayırıcı verilmezse başlık satırına bakılarak ',', ';' ya da sekme seçilir.
+    Dönüş aktar()'ınkiyle aynı, ek olarak 'red_dosyasi' (ret yoksa None);
+    dosya okunamaz ya da zorunlu sütun eksikse None.
+    """
+    zorunlu = TURLER[tur][0]
+    red_dosyasi = red_dosyasi or red_dosyasi_adi(dosya)
+    red_f = red_yazici = None
+    try:
+        with open(dosya, encoding="utf-8-sig", newline="") as f:
+            baslik = f.readline()
+            f.seek(0)
+            ayirici = ayirici or max((",", ";", "\t"), key=baslik.count)
+            okuyucu = csv.DictReader(f, delimiter=ayirici)
+            okuyucu.fieldnames = [(ad or "").strip().lower() for ad in okuyucu.fieldnames or []]
+            eksik = [ad for ad in zorunlu if ad not in okuyucu.fieldnames]
+            if eksik:
+                log.warning("'%s' dosyasında zorunlu sütunlar eksik: %s", dosya, ", ".join(eksik))
+                return None
+
+            def reddet(no, satir, neden):
+                nonlocal red_f, red_yazici
+                if red_yazici is None:
+                    red_f = open(red_dosyasi, "w", encoding="utf-8-sig", newline="")
+                    red_yazici = csv.DictWriter(red_f, ["satir", "neden"] + okuyucu.fieldnames,
+                                                delimiter=ayirici, extrasaction="ignore")
+                    red_yazici.writeheader()
+                red_yazici.writerow(dict(satir, satir=no, neden=neden))
+
+            # Başlık 1. satırdır; numaralar dosyadaki satır numaralarıyla eşleşir.
+            rapor = aktar(tur, okuyucu, reddet=reddet, ilk_no=2, **kwargs)
+    except (OSError, UnicodeDecodeError, csv.Error) as e:
+        log.error("'%s' dosyası okunamadı: %s", dosya, e)
+        return None
+    finally:
+        if red_f is not None:
+            red_f.close()
+    rapor["red_dosyasi"] = red_dosyasi if red_yazici is not None else None
+    return rapor
+
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(description="ERP-APP toplu içe aktarım")
+    ap.add_argument("tur", choices=sorted(TURLER), help="Aktarılacak kayıtlar")
+    ap.add_argument("dosya", help="CSV dosyası (başlık satırı zorunlu)")
+    ap.add_argument("--db", default=database.DB_PATH, help="Veritabanı dosyası")
+    ap.add_argument("--kuru", action="store_true", help="Doğrula ve yaz, sonra geri al (veritabanı değişmez)")
+    ap.add_argument("--red", help="Ret dosyası (varsayılan: <dosya>.red.csv)")
+    ap.add_argument("--ayirici", help="Sütun ayırıcı (varsayılan: başlıktan tahmin)")
+    ap.add_argument("--parca", type=int, default=None, help="İşlem başına satır")
+    args = ap.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"Veritabanı bulunamadı: {args.db}", file=sys.stderr)
+        return 1
+    def ilerleme(rapor):
+        print(f"\r{rapor['okunan']} okundu, {rapor['eklenen']} eklendi, {rapor['reddedilen']} reddedildi, "
+              f"{rapor['satir_sn']} satır/sn", end="", file=sys.stderr)
+    rapor = dosyadan_aktar(args.dosya, args.tur, red_dosyasi=args.red, ayirici=args.ayirici, yol=args.db,
+                           kuru=args.kuru, parca_boyutu=args.parca,
+                           ilerleme=ilerleme if sys.stderr.isatty() else None)
+    if rapor is None:
+        print("İçe aktarım başarısız.", file=sys.stderr)
+        return 1
+    print(f"\r{'[kuru] ' if rapor['kuru'] else ''}{rapor['okunan']} okundu, {rapor['eklenen']} eklendi, "
+          f"{rapor['reddedilen']} reddedildi; {rapor['sure_sn']} sn ({rapor['satir_sn']} satır/sn)", file=sys.stderr)
+    for neden, adet in sorted(rapor["nedenler"].items()):
+        print(f"  {neden:<28}{adet:>8}", file=sys.stderr)
+    if rapor["red_dosyasi"]:
+        print(f"Reddedilen satırlar: {rapor['red_dosyasi']}", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,45 @@
 import sys
+from PyQt5.QtCore import QTimer
 from PyQt5.QtWidgets import QApplication
 from erpmain import ErpMain
-from database import create_database
+from database import create_database, zimmet_anlik_goruntusu_gerekirse
+from connection_manager import close_all
+import config
+import db_worker
+import gunluk
+import yedek
 
-def main():
+def baslat(argv):
+    """Veritabanını hazırlar, uygulamayı ve ana pencereyi oluşturup gösterir."""
+    gunluk.kur()
     create_database()
-    app = QApplication(sys.argv)
+    app = QApplication(argv)
+    if config.UI_DONMA_OLCUMU:
+        donma_olcer = db_worker.UIDonmaOlcer(parent=app)
+        donma_olcer.baslat()
+        app.aboutToQuit.connect(donma_olcer.yazdir)
     main_window = ErpMain()
     main_window.showMaximized()
+    if config.ZIMMET_ANLIK_GORUNTU_KONTROL_DK > 0:
+        goruntu_zamanlayici = QTimer(app)
+        goruntu_zamanlayici.timeout.connect(lambda: db_worker.calistir(zimmet_anlik_goruntusu_gerekirse))
+        goruntu_zamanlayici.start(config.ZIMMET_ANLIK_GORUNTU_KONTROL_DK * 60 * 1000)
+    if config.YEDEK_ARALIK_SAAT > 0:
+        # Yedek db_worker'ı bekletmesin diye kendi iş parçacığında alınır.
+        yedek_zamanlayici = QTimer(app)
+        yedek_zamanlayici.timeout.connect(yedek.arka_planda_yedek_gerekirse)
+        yedek_zamanlayici.start(60 * 60 * 1000)
+        QTimer.singleShot(60 * 1000, yedek.arka_planda_yedek_gerekirse)
+    app.aboutToQuit.connect(db_worker.kapat)
+    app.aboutToQuit.connect(close_all)
+    if config.SORGU_IZLEME and config.SORGU_IZLEME_DOSYASI:
+        import sorgu_izleme
+        app.aboutToQuit.connect(lambda: sorgu_izleme.json_yaz(config.SORGU_IZLEME_DOSYASI))
+    return app, main_window
+
+def main():
+    app, main_window = baslat(sys.argv)
     sys.exit(app.exec_())
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
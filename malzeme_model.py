@@ -0,0 +1,143 @@
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, pyqtSignal
+
+import config
+import db_worker
+import gunluk
+from database import (get_malzeme_types_sayfa, count_malzeme_types,
+                      search_malzeme_types, count_search_malzeme_types)
+
+log = gunluk.kaydedici(__name__)
+
+# Ana penceredeki malzeme listesi için sanal tablo modeli.
+# Satırlar veritabanından sayfa sayfa, görünüm kaydırıldıkça (canFetchMore/fetchMore)
+# yüklenir; sıralama SQL tarafında yapılır. Açılış ve yenileme maliyeti yalnızca
+# ilk sayfaya bağlıdır, katalog büyüklüğüne değil. Sorgular db_worker üzerinden
+# arka planda çalışır; yeni bir arama ya da sıralama, bekleyen eski sorguyu iptal eder.
+
+class MalzemeTableModel(QAbstractTableModel):
+    KOLONLAR = (("stokkodu", "Stok Kodu"), ("kategori", "Kategori"), ("isim", "İsim"))
+
+    # İlk sayfa yüklendiğinde toplam satır sayısıyla yayınlanır.
+    yuklendi = pyqtSignal(int)
+
+    def __init__(self, parent=None, sayfa_boyutu=None):
+        super().__init__(parent)
+        self.sayfa_boyutu = sayfa_boyutu or config.MALZEME_LISTE_SAYFA_BOYUTU
+        self._satirlar = []
+        self._bitti = False
+        self._toplam = 0
+        self._sirala = "isim"
+        self._azalan = False
+        self._arama = None
+        self._bekleyen = None
+        self._istek_anahtari = f"malzeme_listesi_{id(self)}"
+
+    # ------------------- Qt arayüzü -------------------
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._satirlar)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.KOLONLAR)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.KOLONLAR[section][1]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._satirlar):
+            return None
+        satir = self._satirlar[index.row()]
+        if role == Qt.DisplayRole:
+            return satir[self.KOLONLAR[index.column()][0]] or ""
+        if role == Qt.UserRole:
+            return dict(satir)
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._bitti and self._bekleyen is None
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        self._gonder(self._sayfa_sorgusu(), self._sayfa_geldi)
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        if not 0 <= column < len(self.KOLONLAR):
+            return
+        self._sirala = self.KOLONLAR[column][0]
+        self._azalan = order == Qt.DescendingOrder
+        self.yenile()
+
+    # ------------------- Uygulama arayüzü -------------------
+    def satir(self, row):
+        """Satırın sözlük kopyası (stokkodu, isim, kategori, fotograf_var) ya da None."""
+        if 0 <= row < len(self._satirlar):
+            return dict(self._satirlar[row])
+        return None
+
+    def toplam(self):
+        """Listedeki (ya da aramadaki) toplam satır sayısı; yalnızca yüklenenler değil."""
+        return self._toplam
+
+    def ara(self, metin):
+        """Boş metin tam listeye döner. Arama sonuçları, kolon seçilmediyse ilgiye göre sıralanır."""
+        metin = (metin or "").strip()
+        self._arama = metin or None
+        if self._arama:
+            self._sirala, self._azalan = None, False
+        elif self._sirala is None:
+            self._sirala = "isim"
+        self.yenile()
+
+    def arama_metni(self):
+        return self._arama
+
+    def yenile(self):
+        self.beginResetModel()
+        self._satirlar = []
+        self._bitti = False
+        self._toplam = 0
+        self.endResetModel()
+        arama = self._arama
+        sayfa_sorgusu = self._sayfa_sorgusu()
+        def ilk_sayfa():
+            toplam = count_search_malzeme_types(arama) if arama else count_malzeme_types()
+            return toplam, sayfa_sorgusu()
+        self._gonder(ilk_sayfa, self._ilk_sayfa_geldi)
+
+    def _gonder(self, sorgu, basarili):
+        istek = db_worker.calistir(sorgu, anahtar=self._istek_anahtari,
+                                   basarili=basarili, hata=self._sorgu_hatasi)
+        # Arka plan kapalıysa geri çağrı zaten çalışmıştır.
+        self._bekleyen = None if istek.future.done() else istek
+
+    def _sayfa_sorgusu(self):
+        # Parametreler şimdi alınır; sorgu arka planda modelin o anki durumuna dokunmadan çalışır.
+        arama, sirala, azalan, limit = self._arama, self._sirala, self._azalan, self.sayfa_boyutu
+        if arama:
+            offset = len(self._satirlar)
+            return lambda: search_malzeme_types(arama, sirala=sirala, azalan=azalan, limit=limit, offset=offset)
+        sonra = self._satirlar[-1] if self._satirlar else None
+        return lambda: get_malzeme_types_sayfa(sirala, azalan, sonra, limit)
+
+    def _ilk_sayfa_geldi(self, sonuc):
+        self._toplam, sayfa = sonuc
+        self._sayfa_geldi(sayfa)
+        self.yuklendi.emit(self._toplam)
+
+    def _sayfa_geldi(self, sayfa):
+        self._bekleyen = None
+        if len(sayfa) < self.sayfa_boyutu:
+            self._bitti = True
+        if not sayfa:
+            return
+        ilk = len(self._satirlar)
+        self.beginInsertRows(QModelIndex(), ilk, ilk + len(sayfa) - 1)
+        self._satirlar.extend(sayfa)
+        self.endInsertRows()
+
+    def _sorgu_hatasi(self, hata):
+        self._bekleyen = None
+        self._bitti = True
+        log.error("Malzeme listesi yükleme hatası: %s", hata)
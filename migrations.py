@@ -0,0 +1,685 @@
+import os
+import sys
+import time
+import sqlite3
+
+import config
+import database
+import envanter
+import gunluk
+from connection_manager import get_connection
+
+# Şema sürümleri ve taşıma adımları.
+#
+# Veritabanının sürümü PRAGMA user_version'da tutulur. Her adımın bir sürüm
+# numarası vardır; migrate() sürümü veritabanınınkinden büyük adımları sırayla
+# uygular. Adım ve sürüm yazımı aynı işlemdedir (BEGIN IMMEDIATE ... COMMIT):
+# bir adım yarıda kalırsa hiçbir izi kalmaz ve sonraki açılışta yeniden denenir.
+# Adımlar yine de idempotent yazılır (IF NOT EXISTS, INSERT OR IGNORE, ...);
+# eski bir sürüm numarasıyla işaretlenmiş veritabanında tekrar çalışmaları zararsızdır.
+#
+# parcali=True adımlar büyük tablolarda çevrimiçi doldurma içindir: her çağrıda
+# en fazla parca_boyutu satır işler, her parçadan sonra işlem kapatılır ve
+# diğer bağlantılar araya girebilir. 0 döndüğünde sürüm yazılır.
+#
+# Yeni adım eklemek: en sona, bir sonraki sürüm numarasıyla @adim ekleyin.
+# Yayınlanmış bir adım sonradan değiştirilmez; düzeltme yeni bir adımla yapılır.
+
+log = gunluk.kaydedici(__name__)
+
+ADIMLAR = []
+
+class Adim:
+    def __init__(self, surum, ad, fn, parcali):
+        self.surum = surum
+        self.ad = ad
+        self.fn = fn
+        self.parcali = parcali
+
+def adim(surum, ad, parcali=False):
+    def kaydet(fn):
+        if ADIMLAR and surum <= ADIMLAR[-1].surum:
+            raise ValueError(f"Taşıma adımı sürümleri artan olmalı: {surum} <= {ADIMLAR[-1].surum}")
+        ADIMLAR.append(Adim(surum, ad, fn, parcali))
+        return fn
+    return kaydet
+
+def son_surum():
+    return ADIMLAR[-1].surum if ADIMLAR else 0
+
+def surum(conn):
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+def bekleyen_adimlar(conn, hedef=None):
+    mevcut = surum(conn)
+    hedef = son_surum() if hedef is None else hedef
+    return [a for a in ADIMLAR if mevcut < a.surum <= hedef]
+
+def _surum_yaz(cursor, deger):
+    cursor.execute(f'PRAGMA user_version = {int(deger)}')
+
+def _adimi_uygula(conn, a, parca_boyutu):
+    cursor = conn.cursor()
+    satir = 0
+    if not a.parcali:
+        cursor.execute('BEGIN IMMEDIATE')
+        try:
+            satir = a.fn(cursor) or 0
+            _surum_yaz(cursor, a.surum)
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        return satir
+    while True:
+        cursor.execute('BEGIN IMMEDIATE')
+        try:
+            islenen = a.fn(cursor, parca_boyutu) or 0
+            if islenen == 0:
+                _surum_yaz(cursor, a.surum)
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        if islenen == 0:
+            return satir
+        satir += islenen
+
+def _kuru_uygula(conn, adimlar, parca_boyutu):
+    # Tüm bekleyen adımlar tek işlemde çalıştırılır ve sonunda geri alınır. Süreler
+    # gerçek çalışmaya yakındır; yazma kilidi süre boyunca tutulur.
+    rapor = []
+    cursor = conn.cursor()
+    cursor.execute('BEGIN IMMEDIATE')
+    try:
+        for a in adimlar:
+            t0 = time.perf_counter()
+            if a.parcali:
+                satir = 0
+                while True:
+                    islenen = a.fn(cursor, parca_boyutu) or 0
+                    if islenen == 0:
+                        break
+                    satir += islenen
+            else:
+                satir = a.fn(cursor) or 0
+            rapor.append({"surum": a.surum, "ad": a.ad, "durum": "kuru",
+                          "sure_ms": round((time.perf_counter() - t0) * 1000, 3), "satir": satir})
+    except Exception as e:
+        rapor.append({"surum": a.surum, "ad": a.ad, "durum": "hata", "hata": str(e),
+                      "sure_ms": round((time.perf_counter() - t0) * 1000, 3), "satir": 0})
+    finally:
+        conn.rollback()
+    return rapor
+
+def migrate(yol=None, kuru=False, parca_boyutu=None, hedef=None):
+    """Bekleyen adımları uygular (kuru=True ise deneyip geri alır).
+
+    Dönüş: {"baslangic_surumu", "surum", "basarili", "adimlar": [{surum, ad, durum, sure_ms, satir}]}
+    """
+    conn = get_connection(yol or database.DB_PATH)
+    parca_boyutu = parca_boyutu or config.TOPLU_ISLEM_PARCA_BOYUTU
+    if conn.in_transaction:
+        conn.commit()
+    baslangic = surum(conn)
+    adimlar = bekleyen_adimlar(conn, hedef)
+    rapor = {"baslangic_surumu": baslangic, "surum": baslangic, "basarili": True, "adimlar": []}
+    if not adimlar:
+        return rapor
+    if kuru:
+        rapor["adimlar"] = _kuru_uygula(conn, adimlar, parca_boyutu)
+        rapor["basarili"] = all(r["durum"] == "kuru" for r in rapor["adimlar"])
+        return rapor
+    for a in adimlar:
+        t0 = time.perf_counter()
+        try:
+            satir = _adimi_uygula(conn, a, parca_boyutu)
+        except Exception as e:
+            sure_ms = round((time.perf_counter() - t0) * 1000, 3)
+            log.error("Taşıma adımı %s (%s) başarısız: %s", a.surum, a.ad, e)
+            rapor["adimlar"].append({"surum": a.surum, "ad": a.ad, "durum": "hata", "hata": str(e),
+                                     "sure_ms": sure_ms, "satir": 0})
+            rapor["basarili"] = False
+            break
+        sure_ms = round((time.perf_counter() - t0) * 1000, 3)
+        log.info("Taşıma adımı %s (%s) uygulandı: %s satır, %.1f ms", a.surum, a.ad, satir, sure_ms)
+        rapor["adimlar"].append({"surum": a.surum, "ad": a.ad, "durum": "uygulandi",
+                                 "sure_ms": sure_ms, "satir": satir})
+        rapor["surum"] = a.surum
+    return rapor
+
+
+# ------------------- Adımlar -------------------
+
+@adim(1, "temel_sema")
+def _temel_sema(cursor):
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS malzemetypes (
+        stokkodu TEXT PRIMARY KEY,
+        isim TEXT NOT NULL,
+        kategori TEXT,
+        fotograf BLOB,
+        fotograf_hash TEXT
+    )
+    ''')
+    cursor.execute('PRAGMA table_info(malzemetypes)')
+    if 'fotograf_hash' not in {row['name'] for row in cursor.fetchall()}:
+        cursor.execute('ALTER TABLE malzemetypes ADD COLUMN fotograf_hash TEXT')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_malzemetypes_fotograf_hash ON malzemetypes (fotograf_hash)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_malzemetypes_isim ON malzemetypes (isim, stokkodu)')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_malzemetypes_kategori ON malzemetypes (IFNULL(kategori, ''), stokkodu)")
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS fotograflar (
+        id INTEGER PRIMARY KEY,
+        hash TEXT UNIQUE NOT NULL,
+        boyut INTEGER NOT NULL,
+        veri BLOB NOT NULL
+    )
+    ''')
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS kisiler (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        kisiisim TEXT NOT NULL,
+        bulunankat INTEGER,
+        bulunansube TEXT
+    )
+    ''')
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS kategoriler (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        kategori_adi TEXT UNIQUE NOT NULL
+    )
+    ''')
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS assignments (
+        sticker_id TEXT PRIMARY KEY,
+        kisi_id INTEGER NOT NULL,
+        isim TEXT NOT NULL,
+        olusturmatarihi TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_assignments_kisi_id ON assignments (kisi_id)')
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS stickerlar (
+        stickerkod TEXT PRIMARY KEY,
+        stokkodu TEXT NOT NULL
+    ) WITHOUT ROWID
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_stickerlar_stokkodu ON stickerlar (stokkodu)')
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS sticker_sayaclari (
+        stokkodu TEXT NOT NULL,
+        yil INTEGER NOT NULL,
+        son_numara INTEGER NOT NULL,
+        PRIMARY KEY (stokkodu, yil)
+    ) WITHOUT ROWID
+    ''')
+
+    cursor.execute('PRAGMA table_info(kucuk_resimler)')
+    if 'stokkodu' in {row['name'] for row in cursor.fetchall()}:
+        # Eski küçük resimler stok koduna bağlıydı; fotoğraf özetine göre yeniden üretilecekler.
+        cursor.execute('DROP TABLE kucuk_resimler')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS kucuk_resimler (
+        fotograf_hash TEXT NOT NULL,
+        boyut INTEGER NOT NULL,
+        veri BLOB NOT NULL,
+        PRIMARY KEY (fotograf_hash, boyut)
+    )
+    ''')
+
+@adim(2, "arama_indeksi")
+def _arama_indeksi(cursor):
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='malzemetypes_fts'")
+    if cursor.fetchone():
+        return 0
+    try:
+        cursor.execute("CREATE VIRTUAL TABLE malzemetypes_fts USING fts5(stokkodu, isim, kategori, tokenize='trigram')")
+    except sqlite3.OperationalError:
+        try:
+            cursor.execute('''
+                CREATE VIRTUAL TABLE malzemetypes_fts USING fts5(
+                    stokkodu, isim, kategori, tokenize='unicode61 remove_diacritics 2', prefix='1 2 3'
+                )
+            ''')
+        except sqlite3.OperationalError as e:
+            log.warning("FTS5 kullanılamıyor, arama LIKE ile yapılacak: %s", e)
+            return 0
+    stokkodu, isim, kategori = (database._turkce_katla_sql(f"new.{kolon}") for kolon in ("stokkodu", "isim", "kategori"))
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS malzemetypes_fts_ai AFTER INSERT ON malzemetypes BEGIN
+            INSERT INTO malzemetypes_fts (rowid, stokkodu, isim, kategori)
+            VALUES (new.rowid, {stokkodu}, {isim}, {kategori});
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS malzemetypes_fts_ad AFTER DELETE ON malzemetypes BEGIN
+            DELETE FROM malzemetypes_fts WHERE rowid = old.rowid;
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS malzemetypes_fts_au AFTER UPDATE OF stokkodu, isim, kategori ON malzemetypes BEGIN
+            UPDATE malzemetypes_fts SET stokkodu = {stokkodu}, isim = {isim}, kategori = {kategori}
+            WHERE rowid = old.rowid;
+        END
+    ''')
+    return database._arama_indeksini_doldur(cursor)
+
+@adim(3, "kisi_malzemeleri_tablolari")
+def _kisi_malzemeleri_tablolari(cursor):
+    # Eski sürümlerde her kişinin ayrı {kisiisim}_malzemeleri tablosu vardı.
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name LIKE '%\\_malzemeleri' ESCAPE '\\'")
+    eski_tablolar = {row[0] for row in cursor.fetchall()}
+    if not eski_tablolar:
+        return 0
+    cursor.execute('SELECT id, kisiisim FROM kisiler')
+    tasinan = 0
+    for kisi_id, kisiisim in cursor.fetchall():
+        table_name = database.kisi_malzemeleri_tablo_adi(kisiisim)
+        if table_name not in eski_tablolar:
+            continue
+        cursor.execute(f'''
+            INSERT OR IGNORE INTO assignments (sticker_id, kisi_id, isim, olusturmatarihi)
+            SELECT stickerid, ?, isim, olusturmatarihi FROM "{table_name}" ORDER BY id
+        ''', (kisi_id,))
+        tasinan += cursor.rowcount
+        cursor.execute(f'DROP TABLE "{table_name}"')
+        eski_tablolar.discard(table_name)
+    for table_name in sorted(eski_tablolar):
+        log.warning("'%s' tablosu hiçbir kişiyle eşleşmedi, taşınmadı.", table_name)
+    return tasinan
+
+@adim(4, "sticker_kayitlari")
+def _sticker_kayitlari(cursor):
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name LIKE 'stok\\_%' ESCAPE '\\'")
+    stok_tablolari = {row[0] for row in cursor.fetchall()}
+    cursor.execute('SELECT stokkodu FROM malzemetypes')
+    eklenen = 0
+    for (stokkodu,) in cursor.fetchall():
+        table_name = database.stok_tablo_adi(stokkodu)
+        if table_name not in stok_tablolari:
+            continue
+        cursor.execute(f'''
+            INSERT OR IGNORE INTO stickerlar (stickerkod, stokkodu)
+            SELECT stickerkod, ? FROM {table_name}
+        ''', (stokkodu,))
+        eklenen += cursor.rowcount
+    return eklenen
+
+@adim(5, "sticker_sayaclari")
+def _sticker_sayaclari(cursor):
+    cursor.execute('SELECT stickerkod, stokkodu FROM stickerlar')
+    sayaclar = {}
+    for row in cursor.fetchall():
+        numara = database.sticker_numarasi(row['stickerkod'], row['stokkodu'])
+        if numara is None:
+            continue
+        anahtar = (row['stokkodu'], numara[0])
+        sayaclar[anahtar] = max(sayaclar.get(anahtar, 0), numara[1])
+    cursor.executemany('INSERT OR IGNORE INTO sticker_sayaclari (stokkodu, yil, son_numara) VALUES (?, ?, ?)',
+                       [(stokkodu, yil, son) for (stokkodu, yil), son in sayaclar.items()])
+    return len(sayaclar)
+
+@adim(6, "fotograflar", parcali=True)
+def _fotograflar(cursor, parca_boyutu):
+    # Satır içi fotoğrafları fotograflar tablosuna taşır; her çağrı bir parça.
+    cursor.execute('SELECT rowid, fotograf FROM malzemetypes WHERE fotograf IS NOT NULL LIMIT ?', (parca_boyutu,))
+    satirlar = cursor.fetchall()
+    for rowid, fotograf in satirlar:
+        foto_hash = database._fotograf_kaydet(cursor, fotograf, kucuk_resim=False) if fotograf else None
+        cursor.execute('UPDATE malzemetypes SET fotograf_hash = ?, fotograf = NULL WHERE rowid = ?',
+                       (foto_hash, rowid))
+    return len(satirlar)
+
+@adim(7, "indeksler")
+def _indeksler(cursor):
+    # kisiisim eşitlikle aranır ve isim sırasıyla listelenir. Uygulama aynı isimle
+    # ikinci kişi eklemez; eski bir veritabanında yine de tekrar varsa indeks
+    # benzersiz olmadan oluşturulur ve uyarı yazılır.
+    cursor.execute('SELECT kisiisim FROM kisiler GROUP BY kisiisim HAVING COUNT(*) > 1 LIMIT 5')
+    tekrarlar = [row[0] for row in cursor.fetchall()]
+    if tekrarlar:
+        log.warning("kisiler.kisiisim tekrar eden değerler içeriyor (%s); indeks benzersiz olmadan oluşturuldu.",
+                    ", ".join(tekrarlar))
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_kisiler_kisiisim ON kisiler (kisiisim)')
+    else:
+        cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_kisiler_kisiisim ON kisiler (kisiisim)')
+
+    # get_zimmetli_malzemeler: kişinin zimmetleri tarih sırasıyla, tabloya gitmeden.
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_assignments_kisi_tarih
+        ON assignments (kisi_id, olusturmatarihi, sticker_id, isim)
+    ''')
+
+    # Malzeme listesi sayfaları her sıralamada indeksten okunur (kapsayan indeksler).
+    cursor.execute('DROP INDEX IF EXISTS idx_malzemetypes_isim')
+    cursor.execute('DROP INDEX IF EXISTS idx_malzemetypes_kategori')
+    cursor.execute('''
+        CREATE INDEX idx_malzemetypes_isim
+        ON malzemetypes (isim, stokkodu, kategori, fotograf_hash)
+    ''')
+    cursor.execute('''
+        CREATE INDEX idx_malzemetypes_kategori
+        ON malzemetypes (IFNULL(kategori, ''), stokkodu, kategori, isim, fotograf_hash)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_malzemetypes_stokkodu_liste
+        ON malzemetypes (stokkodu, isim, kategori, fotograf_hash)
+    ''')
+
+    # get_stickers: stok tablolarında tarih sırası.
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name LIKE 'stok\\_%' ESCAPE '\\'")
+    stok_tablolari = [row[0] for row in cursor.fetchall()]
+    for table_name in stok_tablolari:
+        database._stok_tablosu_indeksi(cursor, table_name)
+    return len(stok_tablolari)
+
+@adim(8, "kategori_sayilari")
+def _kategori_sayilari(cursor):
+    # kategoriler tek kategori kaynağı olur: malzemelerde geçen her kategori burada
+    # da bulunur ve malzeme_adedi tetikleyicilerle güncel tutulur. Kategori listesi
+    # ve sayıları malzemetypes satırlarına dokunmadan okunur.
+    cursor.execute('PRAGMA table_info(kategoriler)')
+    if 'malzeme_adedi' not in {row['name'] for row in cursor.fetchall()}:
+        cursor.execute('ALTER TABLE kategoriler ADD COLUMN malzeme_adedi INTEGER NOT NULL DEFAULT 0')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS malzemetypes_kategori_ai AFTER INSERT ON malzemetypes
+        WHEN IFNULL(new.kategori, '') != '' BEGIN
+            INSERT OR IGNORE INTO kategoriler (kategori_adi) VALUES (new.kategori);
+            UPDATE kategoriler SET malzeme_adedi = malzeme_adedi + 1 WHERE kategori_adi = new.kategori;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS malzemetypes_kategori_ad AFTER DELETE ON malzemetypes
+        WHEN IFNULL(old.kategori, '') != '' BEGIN
+            UPDATE kategoriler SET malzeme_adedi = malzeme_adedi - 1 WHERE kategori_adi = old.kategori;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS malzemetypes_kategori_au AFTER UPDATE OF kategori ON malzemetypes
+        WHEN old.kategori IS NOT new.kategori BEGIN
+            UPDATE kategoriler SET malzeme_adedi = malzeme_adedi - 1 WHERE kategori_adi = old.kategori;
+            INSERT OR IGNORE INTO kategoriler (kategori_adi) SELECT new.kategori WHERE IFNULL(new.kategori, '') != '';
+            UPDATE kategoriler SET malzeme_adedi = malzeme_adedi + 1 WHERE kategori_adi = new.kategori;
+        END
+    ''')
+    return database._kategori_sayilarini_hesapla(cursor)
+
+@adim(9, "zimmet_olaylari")
+def _zimmet_olaylari(cursor):
+    # Zimmet ve sticker değişikliklerinin yalnızca eklenebilen kaydı. Kişi isimleri
+    # olay anındaki haliyle saklanır; kişi sonradan silinse ya da adı değişse de
+    # geçmiş okunabilir.
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS zimmet_olaylari (
+            id INTEGER PRIMARY KEY,
+            zaman TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            tur TEXT NOT NULL,
+            stickerkod TEXT NOT NULL,
+            kisi_id INTEGER,
+            kisiisim TEXT,
+            eski_kisi_id INTEGER,
+            eski_kisiisim TEXT
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_zimmet_olaylari_sticker ON zimmet_olaylari (stickerkod, zaman)')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_zimmet_olaylari_kisi ON zimmet_olaylari (kisi_id)
+        WHERE kisi_id IS NOT NULL
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_zimmet_olaylari_eski_kisi ON zimmet_olaylari (eski_kisi_id)
+        WHERE eski_kisi_id IS NOT NULL
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS zimmet_olaylari_degismez BEFORE UPDATE ON zimmet_olaylari BEGIN
+            SELECT RAISE(ABORT, 'zimmet_olaylari yalnızca eklenebilir');
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS zimmet_olaylari_silinmez BEFORE DELETE ON zimmet_olaylari BEGIN
+            SELECT RAISE(ABORT, 'zimmet_olaylari yalnızca eklenebilir');
+        END
+    ''')
+
+    # Anlık görüntüler: olay_id'ye kadarki olaylar uygulanmış sahiplik durumu.
+    # "Tarihte kimdeydi" sorguları en yakın görüntüden başlar, tüm kaydı oynatmaz.
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS zimmet_anlik_goruntuleri (
+            id INTEGER PRIMARY KEY,
+            olay_id INTEGER NOT NULL,
+            zaman TIMESTAMP NOT NULL,
+            adet INTEGER NOT NULL
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_zimmet_anlik_goruntuleri_zaman ON zimmet_anlik_goruntuleri (zaman)')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS zimmet_anlik_satirlari (
+            goruntu_id INTEGER NOT NULL,
+            stickerkod TEXT NOT NULL,
+            kisi_id INTEGER NOT NULL,
+            kisiisim TEXT,
+            PRIMARY KEY (goruntu_id, stickerkod)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_zimmet_anlik_satirlari_kisi
+        ON zimmet_anlik_satirlari (goruntu_id, kisi_id)
+    ''')
+    # Geçmiş bu adımla başlar; ilk görüntü mevcut zimmetleri başlangıç durumu olarak saklar.
+    cursor.execute('SELECT 1 FROM zimmet_anlik_goruntuleri LIMIT 1')
+    if cursor.fetchone():
+        return 0
+    return database._zimmet_anlik_goruntusu(cursor)
+
+def _sticker_sayac_govdesi(satir, isaret):
+    return f"""
+            UPDATE kategori_sayaclari SET toplam = toplam {isaret} 1,
+                zimmetli = zimmetli {isaret} EXISTS (SELECT 1 FROM assignments WHERE sticker_id = {satir}.stickerkod)
+            WHERE kategori = (SELECT kategori FROM stok_sayaclari WHERE stokkodu = {satir}.stokkodu);
+            UPDATE stok_sayaclari SET toplam = toplam {isaret} 1,
+                zimmetli = zimmetli {isaret} EXISTS (SELECT 1 FROM assignments WHERE sticker_id = {satir}.stickerkod)
+            WHERE stokkodu = {satir}.stokkodu;"""
+
+def _zimmet_sayac_govdesi(satir, isaret):
+    return f"""
+            UPDATE kisi_sayaclari SET zimmetli = zimmetli {isaret} 1 WHERE kisi_id = {satir}.kisi_id;
+            UPDATE konum_sayaclari SET zimmetli = zimmetli {isaret} 1
+            WHERE (bulunansube, bulunankat) = (SELECT IFNULL(bulunansube, ''), IFNULL(CAST(bulunankat AS TEXT), '')
+                                               FROM kisiler WHERE id = {satir}.kisi_id);
+            UPDATE kategori_sayaclari SET zimmetli = zimmetli {isaret} 1
+            WHERE kategori = (SELECT s.kategori FROM stickerlar st JOIN stok_sayaclari s ON s.stokkodu = st.stokkodu
+                              WHERE st.stickerkod = {satir}.sticker_id);
+            UPDATE stok_sayaclari SET zimmetli = zimmetli {isaret} 1
+            WHERE stokkodu = (SELECT stokkodu FROM stickerlar WHERE stickerkod = {satir}.sticker_id);"""
+
+def _kisi_konum_govdesi(satir, isaret):
+    return f"""
+            UPDATE konum_sayaclari
+            SET zimmetli = zimmetli {isaret} IFNULL((SELECT zimmetli FROM kisi_sayaclari WHERE kisi_id = {satir}.id), 0)
+            WHERE (bulunansube, bulunankat) = (IFNULL({satir}.bulunansube, ''), IFNULL(CAST({satir}.bulunankat AS TEXT), ''));"""
+
+@adim(10, "envanter_sayaclari")
+def _envanter_sayaclari(cursor):
+    # Envanter panosunun sayaçları (bkz. envanter.py). Sticker, zimmet, kişi ve
+    # malzeme yazmalarında tetikleyicilerle aynı işlemde güncellenir; panodaki
+    # sorgular sticker sayısından bağımsız olarak tek satır okur.
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS stok_sayaclari (
+            stokkodu TEXT PRIMARY KEY,
+            kategori TEXT NOT NULL DEFAULT '',
+            toplam INTEGER NOT NULL DEFAULT 0,
+            zimmetli INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS kategori_sayaclari (
+            kategori TEXT PRIMARY KEY,
+            toplam INTEGER NOT NULL DEFAULT 0,
+            zimmetli INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS kisi_sayaclari (
+            kisi_id INTEGER PRIMARY KEY,
+            zimmetli INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS konum_sayaclari (
+            bulunansube TEXT NOT NULL,
+            bulunankat TEXT NOT NULL,
+            zimmetli INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (bulunansube, bulunankat)
+        ) WITHOUT ROWID
+    ''')
+
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS stickerlar_sayac_ai AFTER INSERT ON stickerlar BEGIN
+            {_sticker_sayac_govdesi('new', '+')}
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS stickerlar_sayac_ad AFTER DELETE ON stickerlar BEGIN
+            {_sticker_sayac_govdesi('old', '-')}
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS assignments_sayac_ai AFTER INSERT ON assignments BEGIN
+            {_zimmet_sayac_govdesi('new', '+')}
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS assignments_sayac_ad AFTER DELETE ON assignments BEGIN
+            {_zimmet_sayac_govdesi('old', '-')}
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS assignments_sayac_au AFTER UPDATE OF sticker_id, kisi_id ON assignments BEGIN
+            {_zimmet_sayac_govdesi('old', '-')}
+            {_zimmet_sayac_govdesi('new', '+')}
+        END
+    ''')
+
+    # Yeni kişi ve malzemenin sayaç satırı baştan açılır; yukarıdaki güncellemeler
+    # satır eklemeden yalnızca UPDATE yapar.
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS kisiler_sayac_ai AFTER INSERT ON kisiler BEGIN
+            INSERT OR IGNORE INTO konum_sayaclari (bulunansube, bulunankat)
+            VALUES (IFNULL(new.bulunansube, ''), IFNULL(CAST(new.bulunankat AS TEXT), ''));
+            INSERT OR REPLACE INTO kisi_sayaclari (kisi_id, zimmetli)
+            VALUES (new.id, (SELECT COUNT(*) FROM assignments WHERE kisi_id = new.id));
+            {_kisi_konum_govdesi('new', '+')}
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS kisiler_sayac_ad AFTER DELETE ON kisiler BEGIN
+            {_kisi_konum_govdesi('old', '-')}
+            DELETE FROM kisi_sayaclari WHERE kisi_id = old.id;
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS kisiler_sayac_au AFTER UPDATE OF bulunansube, bulunankat ON kisiler
+        WHEN IFNULL(old.bulunansube, '') != IFNULL(new.bulunansube, '')
+          OR IFNULL(CAST(old.bulunankat AS TEXT), '') != IFNULL(CAST(new.bulunankat AS TEXT), '') BEGIN
+            INSERT OR IGNORE INTO konum_sayaclari (bulunansube, bulunankat)
+            VALUES (IFNULL(new.bulunansube, ''), IFNULL(CAST(new.bulunankat AS TEXT), ''));
+            {_kisi_konum_govdesi('old', '-')}
+            {_kisi_konum_govdesi('new', '+')}
+        END
+    ''')
+
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS kategoriler_sayac_ai AFTER INSERT ON kategoriler BEGIN
+            INSERT OR IGNORE INTO kategori_sayaclari (kategori) VALUES (new.kategori_adi);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS malzemetypes_sayac_ai AFTER INSERT ON malzemetypes BEGIN
+            INSERT OR IGNORE INTO kategori_sayaclari (kategori) VALUES (IFNULL(new.kategori, ''));
+            INSERT OR IGNORE INTO stok_sayaclari (stokkodu) VALUES (new.stokkodu);
+            UPDATE stok_sayaclari SET kategori = IFNULL(new.kategori, '') WHERE stokkodu = new.stokkodu;
+        END
+    ''')
+    # Stok kodu değişince eski kodun stickerları aynı işlemde silinir (update_malzeme_type);
+    # eski satır kategorisiyle birlikte kalır, silmeler onu sıfıra indirir ve
+    # update_malzeme_type sonra siler.
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS malzemetypes_sayac_stokkodu_au AFTER UPDATE OF stokkodu ON malzemetypes
+        WHEN old.stokkodu != new.stokkodu BEGIN
+            INSERT OR IGNORE INTO kategori_sayaclari (kategori) VALUES (IFNULL(new.kategori, ''));
+            INSERT OR IGNORE INTO stok_sayaclari (stokkodu) VALUES (new.stokkodu);
+            UPDATE stok_sayaclari SET kategori = IFNULL(new.kategori, '') WHERE stokkodu = new.stokkodu;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS malzemetypes_sayac_kategori_au AFTER UPDATE OF kategori ON malzemetypes
+        WHEN old.stokkodu = new.stokkodu AND IFNULL(old.kategori, '') != IFNULL(new.kategori, '') BEGIN
+            INSERT OR IGNORE INTO kategori_sayaclari (kategori) VALUES (IFNULL(new.kategori, ''));
+            UPDATE kategori_sayaclari SET
+                toplam = toplam - IFNULL((SELECT toplam FROM stok_sayaclari WHERE stokkodu = new.stokkodu), 0),
+                zimmetli = zimmetli - IFNULL((SELECT zimmetli FROM stok_sayaclari WHERE stokkodu = new.stokkodu), 0)
+            WHERE kategori = IFNULL(old.kategori, '');
+            UPDATE kategori_sayaclari SET
+                toplam = toplam + IFNULL((SELECT toplam FROM stok_sayaclari WHERE stokkodu = new.stokkodu), 0),
+                zimmetli = zimmetli + IFNULL((SELECT zimmetli FROM stok_sayaclari WHERE stokkodu = new.stokkodu), 0)
+            WHERE kategori = IFNULL(new.kategori, '');
+            UPDATE stok_sayaclari SET kategori = IFNULL(new.kategori, '') WHERE stokkodu = new.stokkodu;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS malzemetypes_sayac_ad AFTER DELETE ON malzemetypes BEGIN
+            DELETE FROM stok_sayaclari WHERE stokkodu = old.stokkodu AND toplam = 0 AND zimmetli = 0;
+        END
+    ''')
+    return envanter._sayaclari_hesapla(cursor)
+
+@adim(11, "sahipsiz_zimmetler")
+def _sahipsiz_zimmetler(cursor):
+    # Malzeme silme, stok kodu değiştirme ve son sticker'ı silme eskiden stickerı
+    # silip zimmetini bırakıyordu. Artık zimmet aynı işlemde kaldırılıyor; kalmış
+    # olanlar burada 'iade' olayıyla kaldırılır.
+    sahipsiz = 'SELECT a.sticker_id FROM assignments a WHERE NOT EXISTS (SELECT 1 FROM stickerlar st WHERE st.stickerkod = a.sticker_id)'
+    database._sticker_zimmetlerini_kaldir(cursor, sahipsiz, ())
+    return cursor.rowcount
+
+@adim(12, "eski_stok_sayaclari")
+def _eski_stok_sayaclari(cursor):
+    # Stok kodu değişince eski kodun sıfırlanmış sayaç satırı kalıyordu ve
+    # envanter.stok_durumlari onu listeliyordu.
+    cursor.execute('''
+        DELETE FROM stok_sayaclari WHERE toplam = 0 AND zimmetli = 0
+            AND stokkodu NOT IN (SELECT stokkodu FROM malzemetypes)
+    ''')
+    return cursor.rowcount
+
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(description="ERP-APP veritabanı şema taşıma")
+    ap.add_argument("--db", default=database.DB_PATH, help="Veritabanı dosyası")
+    ap.add_argument("--kuru", action="store_true", help="Adımları çalıştır, süreleri raporla ve geri al")
+    ap.add_argument("--parca", type=int, default=None, help="Parçalı adımlarda işlem başına satır")
+    ap.add_argument("--hedef", type=int, default=None, help="Bu sürümde dur")
+    args = ap.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"Veritabanı bulunamadı: {args.db}", file=sys.stderr)
+        return 1
+    rapor = migrate(args.db, kuru=args.kuru, parca_boyutu=args.parca, hedef=args.hedef)
+    print(f"Sürüm: {rapor['baslangic_surumu']} -> {rapor['surum']} (son: {son_surum()})")
+    for r in rapor["adimlar"]:
+        print(f"{r['surum']:>4}  {r['ad']:<28}{r['durum']:<11}{r['sure_ms']:>10.1f} ms{r['satir']:>9} satır"
+              + (f"  {r['hata']}" if "hata" in r else ""))
+    if not rapor["adimlar"]:
+        print("Bekleyen adım yok.")
+    return 0 if rapor["basarili"] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
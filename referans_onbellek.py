@@ -0,0 +1,112 @@
+import threading
+
+import config
+from connection_manager import get_connection, nesil
+
+# Sık okunan, az değişen referans verileri (kişi ve kategori listeleri) için
+# süreç içi önbellek.
+#
+#   def get_all_kisiler():
+#       return referans_onbellek.getir("kisiler", DB_PATH, _kisileri_oku, _kisi_kopyasi)
+#
+#   ... conn.commit(); referans_onbellek.gecersiz_kil("kisiler")
+#
+# Bu süreçteki yazmaları database.py'deki yazan fonksiyonlar gecersiz_kil ile
+# bildirir. Başka bir sürecin (ya da bu süreçte başka bir bağlantının) yazmaları
+# PRAGMA data_version ile fark edilir: okuyan bağlantının değeri son bakıştan bu
+# yana değiştiyse hangi tablonun değiştiği bilinmediğinden önbelleğin tamamı
+# boşaltılır. İlk kez görülen bir bağlantının karşılaştıracak değeri olmadığı
+# için o da önbelleği boşaltır. close_all sonrası (ör. veritabanı dosyası
+# değişti) önbellek baştan kurulur.
+#
+# Çağıran her seferinde kendi kopyasını alır; önbellekteki değer değişmez.
+# Bağlantı yeniden kullanımı kapalıysa (ERP_SQLITE_BAGLANTI_YENIDEN_KULLAN=0)
+# data_version izlenemez ve önbellek devre dışıdır.
+
+_kilit = threading.Lock()
+_girdiler = {}      # (yol, ad) -> değer
+_gorulen = {}       # id(bağlantı) -> (bağlantı, data_version)
+_surum = 0          # her boşaltmada artar; yükleme sırasında boşaltılan değer saklanmaz
+_nesil = None
+_sayaclar = {}
+_harici_degisiklik = 0
+
+def acik():
+    return config.REFERANS_ONBELLEK and config.SQLITE_BAGLANTI_YENIDEN_KULLAN
+
+def _sayac(ad):
+    sayac = _sayaclar.get(ad)
+    if sayac is None:
+        sayac = _sayaclar[ad] = {"isabet": 0, "iska": 0, "gecersiz": 0}
+    return sayac
+
+def _bosalt():
+    global _surum
+    _girdiler.clear()
+    _surum += 1
+
+def _data_version(conn):
+    if not config.REFERANS_ONBELLEK_DATA_VERSION:
+        return None
+    return conn.execute("PRAGMA data_version").fetchone()[0]
+
+def getir(ad, yol, yukleyici, kopya=list):
+    """ad verisini önbellekten döndürür; yoksa yukleyici(conn) ile okuyup saklar."""
+    global _nesil, _harici_degisiklik
+    conn = get_connection(yol)
+    if not acik():
+        return yukleyici(conn)
+    surum_degeri = _data_version(conn)
+    with _kilit:
+        if _nesil != nesil():
+            _nesil = nesil()
+            _gorulen.clear()
+            _bosalt()
+        if surum_degeri is not None:
+            onceki = _gorulen.get(id(conn))
+            _gorulen[id(conn)] = (conn, surum_degeri)
+            if onceki is None or onceki[1] != surum_degeri:
+                if _girdiler:
+                    _harici_degisiklik += 1
+                _bosalt()
+        sayac = _sayac(ad)
+        deger = _girdiler.get((yol, ad))
+        if deger is not None:
+            sayac["isabet"] += 1
+            return kopya(deger)
+        sayac["iska"] += 1
+        surum = _surum
+    deger = yukleyici(conn)
+    with _kilit:
+        if surum == _surum:
+            _girdiler[(yol, ad)] = deger
+    return kopya(deger)
+
+def gecersiz_kil(*adlar):
+    """Verilen verileri (commit'ten sonra) önbellekten düşürür."""
+    global _surum
+    with _kilit:
+        for anahtar in [a for a in _girdiler if a[1] in adlar]:
+            del _girdiler[anahtar]
+        for ad in adlar:
+            _sayac(ad)["gecersiz"] += 1
+        _surum += 1
+
+def temizle():
+    with _kilit:
+        _bosalt()
+
+def sifirla():
+    """İsabet/ıska sayaçlarını sıfırlar."""
+    global _harici_degisiklik
+    with _kilit:
+        _sayaclar.clear()
+        _harici_degisiklik = 0
+
+def istatistik():
+    with _kilit:
+        veriler = {}
+        for ad, sayac in _sayaclar.items():
+            toplam = sayac["isabet"] + sayac["iska"]
+            veriler[ad] = dict(sayac, isabet_orani=round(sayac["isabet"] / toplam, 3) if toplam else 0.0)
+        return {"veriler": veriler, "harici_degisiklik": _harici_degisiklik, "girdi": len(_girdiler)}
@@ -0,0 +1,232 @@
+import re
+import sys
+import json
+import time
+import sqlite3
+import threading
+from collections import deque
+
+import config
+
+# İsteğe bağlı sorgu ölçümü. Açıkken connection_manager bağlantıları
+# IzlenenBaglanti ile açar; her ifade için süre, dönen/etkilenen satır sayısı,
+# ifadenin parmak izi ve onu çalıştıran database.py fonksiyonu kaydedilir.
+# Kapalıyken bağlantılar düz sqlite3.Connection'dır; ek maliyet yoktur.
+#
+#   ERP_SORGU_IZLEME=1 python main.py
+#   ...
+#   sorgu_izleme.json_yaz("sorgular.json")
+#
+# Bir SELECT'in süresi execute ile başlar ve satırlar çekilirken büyür; kayıt,
+# imleç yeni bir ifade çalıştırdığında, kapandığında ya da yok edildiğinde
+# kapanır. Çekilmeden bırakılan satırlar sayılmaz.
+
+_kilit = threading.Lock()
+_toplamlar = {}
+_yavas = deque(maxlen=max(1, config.SORGU_YAVAS_KAYIT_ADEDI))
+
+_DIZE = re.compile(r"'(?:[^']|'')*'")
+_SAYI = re.compile(r"\b\d+(?:\.\d+)?\b")
+# Adı stok_ ile başlayan sabit tablolar; malzeme başına tablolarla birleştirilmez.
+_SABIT_STOK_TABLOLARI = ("stok_sayaclari",)
+_STOK_TABLOSU = re.compile(r'"?stok_(?!(?:%s)\b)[^\s"(]+"?'
+                           % "|".join(re.escape(ad[len("stok_"):]) for ad in _SABIT_STOK_TABLOLARI))
+_IN_LISTESI = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_BOSLUK = re.compile(r"\s+")
+
+def parmak_izi(sql):
+    """Değerleri ve malzeme başına sticker tablo adlarını soyutlayarak aynı
+    biçimdeki ifadeleri eşler.
+
+    "SELECT * FROM stok_LAPTOP01 WHERE id = 5" -> "SELECT * FROM stok_? WHERE id = ?"
+    stok_sayaclari gibi sabit tablolar adıyla kalır.
+    """
+    sql = _DIZE.sub("?", sql)
+    sql = _STOK_TABLOSU.sub("stok_?", sql)
+    sql = _SAYI.sub("?", sql)
+    sql = _IN_LISTESI.sub("(?...)", sql)
+    return _BOSLUK.sub(" ", sql).strip()
+
+def _cagiran():
+    # Bu modülün dışındaki ilk çerçeve; genelde bir database.py fonksiyonudur.
+    cerceve = sys._getframe(1)
+    while cerceve is not None and cerceve.f_globals.get("__name__") == __name__:
+        cerceve = cerceve.f_back
+    if cerceve is None:
+        return "?"
+    return f"{cerceve.f_globals.get('__name__', '?')}.{cerceve.f_code.co_name}"
+
+
+class _Olcum:
+    __slots__ = ("sql", "cagiran", "sure", "satir", "baslangic")
+
+    def __init__(self, sql, cagiran):
+        self.sql = sql
+        self.cagiran = cagiran
+        self.sure = 0.0
+        self.satir = 0
+        self.baslangic = time.time()
+
+
+def _kaydet(olcum):
+    ms = olcum.sure * 1000.0
+    anahtar = parmak_izi(olcum.sql)
+    with _kilit:
+        toplam = _toplamlar.get(anahtar)
+        if toplam is None:
+            toplam = _toplamlar[anahtar] = {"adet": 0, "toplam_ms": 0.0, "en_uzun_ms": 0.0,
+                                            "satir": 0, "cagiranlar": {}}
+        toplam["adet"] += 1
+        toplam["toplam_ms"] += ms
+        toplam["satir"] += olcum.satir
+        if ms > toplam["en_uzun_ms"]:
+            toplam["en_uzun_ms"] = ms
+        toplam["cagiranlar"][olcum.cagiran] = toplam["cagiranlar"].get(olcum.cagiran, 0) + 1
+        if ms >= config.SORGU_YAVAS_ESIK_MS:
+            _yavas.append({
+                "zaman": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(olcum.baslangic)),
+                "sure_ms": round(ms, 3),
+                "satir": olcum.satir,
+                "cagiran": olcum.cagiran,
+                "parmak_izi": anahtar,
+                "sql": _BOSLUK.sub(" ", olcum.sql).strip(),
+            })
+
+
+class IzlenenCursor(sqlite3.Cursor):
+    _olcum = None
+
+    def _bitir(self):
+        olcum = self._olcum
+        if olcum is not None:
+            self._olcum = None
+            _kaydet(olcum)
+
+    def _olc(self, yontem, sql, *args):
+        self._bitir()
+        olcum = _Olcum(sql, _cagiran())
+        t0 = time.perf_counter()
+        try:
+            return yontem(sql, *args)
+        finally:
+            olcum.sure = time.perf_counter() - t0
+            if self.description is None:
+                # DML/DDL: satır çekilmez, kayıt hemen kapanır.
+                olcum.satir = max(self.rowcount, 0)
+                _kaydet(olcum)
+            else:
+                self._olcum = olcum
+
+    def execute(self, sql, parameters=()):
+        return self._olc(super().execute, sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self._olc(super().executemany, sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self._olc(super().executescript, sql_script)
+
+    def _cek(self, yontem, *args):
+        olcum = self._olcum
+        if olcum is None:
+            return yontem(*args)
+        t0 = time.perf_counter()
+        try:
+            return yontem(*args)
+        finally:
+            olcum.sure += time.perf_counter() - t0
+
+    def fetchone(self):
+        satir = self._cek(super().fetchone)
+        if satir is None:
+            self._bitir()
+        elif self._olcum is not None:
+            self._olcum.satir += 1
+        return satir
+
+    def fetchmany(self, size=None):
+        satirlar = self._cek(super().fetchmany, self.arraysize if size is None else size)
+        if self._olcum is not None:
+            self._olcum.satir += len(satirlar)
+        return satirlar
+
+    def fetchall(self):
+        satirlar = self._cek(super().fetchall)
+        if self._olcum is not None:
+            self._olcum.satir += len(satirlar)
+        self._bitir()
+        return satirlar
+
+    def __next__(self):
+        try:
+            satir = self._cek(super().__next__)
+        except StopIteration:
+            self._bitir()
+            raise
+        if self._olcum is not None:
+            self._olcum.satir += 1
+        return satir
+
+    def close(self):
+        self._bitir()
+        super().close()
+
+    def __del__(self):
+        try:
+            self._bitir()
+        except Exception:
+            pass
+
+
+class IzlenenBaglanti(sqlite3.Connection):
+    def cursor(self, factory=IzlenenCursor):
+        return super().cursor(factory)
+
+    # Connection.execute* kısayolları cursor()'u çağırmaz; imleç burada açılır.
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
+
+
+def acik():
+    return config.SORGU_IZLEME
+
+def etkinlestir(deger=True):
+    """Ölçümü çalışma anında açar/kapatır. Mevcut bağlantılar kapatılır; sonraki
+    get_connection çağrıları yeni ayara göre açılır."""
+    from connection_manager import close_all
+    config.SORGU_IZLEME = bool(deger)
+    close_all()
+
+def sifirla():
+    with _kilit:
+        _toplamlar.clear()
+        _yavas.clear()
+
+def ozet(siralama="toplam_ms"):
+    """Parmak izi başına toplamlar (büyükten küçüğe) ve yavaş sorgu kaydı."""
+    with _kilit:
+        sorgular = []
+        for anahtar, toplam in _toplamlar.items():
+            sorgular.append({
+                "parmak_izi": anahtar,
+                "adet": toplam["adet"],
+                "toplam_ms": round(toplam["toplam_ms"], 3),
+                "ortalama_ms": round(toplam["toplam_ms"] / toplam["adet"], 3),
+                "en_uzun_ms": round(toplam["en_uzun_ms"], 3),
+                "satir": toplam["satir"],
+                "cagiranlar": dict(toplam["cagiranlar"]),
+            })
+        yavas = list(_yavas)
+    sorgular.sort(key=lambda s: s[siralama], reverse=True)
+    return {"yavas_esik_ms": config.SORGU_YAVAS_ESIK_MS, "sorgular": sorgular, "yavas_sorgular": yavas}
+
+def json_yaz(yol):
+    with open(yol, "w", encoding="utf-8") as f:
+        json.dump(ozet(), f, ensure_ascii=False, indent=2)
+    return yol
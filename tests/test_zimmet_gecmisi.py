@@ -0,0 +1,100 @@
+import datetime
+import os
+import tempfile
+import time
+import unittest
+
+import connection_manager
+import database
+import envanter
+import referans_onbellek
+
+
+class ZimmetGecmisiTestleri(unittest.TestCase):
+    def setUp(self):
+        self._klasor = tempfile.TemporaryDirectory()
+        self._eski_yol = database.DB_PATH
+        database.DB_PATH = os.path.join(self._klasor.name, "erp.db")
+        referans_onbellek.sifirla()
+        self.assertTrue(database.create_database())
+        self.assertTrue(database.add_kisi("Ayşe Yılmaz", 2, "Merkez"))
+        self.assertTrue(database.add_stokkodlu_malzeme_tip("IT01", "Dizüstü", "Bilgisayar"))
+        self.stickerlar = database.add_sticker_stokkodlutablo("IT01", 2)
+        for stickerkod in self.stickerlar:
+            self.assertTrue(database.add_zimmetle_malzeme("Ayşe Yılmaz", stickerkod, "Dizüstü"))
+        self.yarin = datetime.date.today() + datetime.timedelta(days=1)
+
+    def tearDown(self):
+        connection_manager.close_all()
+        database.DB_PATH = self._eski_yol
+        referans_onbellek.sifirla()
+        self._klasor.cleanup()
+
+    def _sahipsiz_zimmetler(self):
+        cursor = connection_manager.get_connection(database.DB_PATH).cursor()
+        cursor.execute('''SELECT COUNT(*) FROM assignments a WHERE NOT EXISTS
+            (SELECT 1 FROM stickerlar st WHERE st.stickerkod = a.sticker_id)''')
+        return cursor.fetchone()[0]
+
+    def _olay_turleri(self, stickerkod):
+        return [olay["tur"] for olay in database.get_sticker_gecmisi(stickerkod)]
+
+    def _bosta_mi(self, stickerkod):
+        sahip = database.get_sticker_sahibi_tarihte(stickerkod, self.yarin)
+        return sahip["durum"] == "bosta" and sahip["kisiisim"] is None
+
+    def test_malzeme_silinince_zimmet_iade_edilir(self):
+        self.assertTrue(database.delete_malzeme_type_complete("IT01"))
+        for stickerkod in self.stickerlar:
+            self.assertTrue(self._bosta_mi(stickerkod))
+            self.assertEqual(self._olay_turleri(stickerkod)[-2:], ["iade", "sticker_sil"])
+        self.assertEqual(database.get_zimmetler_tarihte(self.yarin), [])
+        self.assertEqual(database.get_zimmetler_tarihte(self.yarin, "Ayşe Yılmaz"), [])
+        self.assertEqual(self._sahipsiz_zimmetler(), 0)
+        self.assertEqual(envanter.dogrula(), {})
+
+    def test_son_sticker_silinince_zimmet_iade_edilir(self):
+        self.assertTrue(database.delete_last_sticker_stokkodlutablo("IT01"))
+        self.assertTrue(self._bosta_mi(self.stickerlar[-1]))
+        kalan = database.get_zimmetler_tarihte(self.yarin)
+        self.assertEqual([z["stickerid"] for z in kalan], self.stickerlar[:1])
+        self.assertEqual(self._sahipsiz_zimmetler(), 0)
+        self.assertEqual(envanter.dogrula(), {})
+
+    def test_stok_kodu_degisince_eski_zimmetler_iade_edilir(self):
+        self.assertTrue(database.update_malzeme_type("IT01", yeni_stokkodu="IT02"))
+        for stickerkod in self.stickerlar:
+            self.assertTrue(self._bosta_mi(stickerkod))
+        self.assertEqual(database.get_zimmetler_tarihte(self.yarin), [])
+        self.assertEqual(self._sahipsiz_zimmetler(), 0)
+        self.assertEqual(envanter.dogrula(), {})
+        self.assertEqual([s["stokkodu"] for s in envanter.stok_durumlari()], ["IT02"])
+
+
+class OlayZamaniTestleri(unittest.TestCase):
+    def setUp(self):
+        if not hasattr(time, "tzset"):
+            self.skipTest("time.tzset yok")
+        self._eski_tz = os.environ.get("TZ")
+        os.environ["TZ"] = "Europe/Istanbul"
+        time.tzset()
+
+    def tearDown(self):
+        if self._eski_tz is None:
+            os.environ.pop("TZ", None)
+        else:
+            os.environ["TZ"] = self._eski_tz
+        time.tzset()
+
+    def test_yerel_gun_sonu_utc_ye_cevrilir(self):
+        self.assertEqual(database._olay_zamani("2024-03-01"), "2024-03-01 20:59:59")
+        self.assertEqual(database._olay_zamani(datetime.date(2024, 3, 1)), "2024-03-01 20:59:59")
+
+    def test_saatli_tarih_yerel_saattir(self):
+        self.assertEqual(database._olay_zamani("2024-03-02 01:30"), "2024-03-01 22:30:00")
+        utc = datetime.datetime(2024, 3, 2, 1, 30, tzinfo=datetime.timezone.utc)
+        self.assertEqual(database._olay_zamani(utc), "2024-03-02 01:30:00")
+
+
+if __name__ == "__main__":
+    unittest.main()
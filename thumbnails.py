@@ -0,0 +1,81 @@
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+import config
+import gunluk
+
+log = gunluk.kaydedici(__name__)
+
+# Malzeme fotoğrafları için küçük resim üretimi ve bellek içi LRU önbellek.
+# PIL yalnızca ilk kullanımda içe aktarılır.
+
+def kucuk_resimler_olustur(fotograf, boyutlar=None):
+    """Fotoğraf baytlarından {boyut: jpeg baytları} sözlüğü üretir. PIL yoksa boş döner."""
+    if not fotograf:
+        return {}
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:
+        log.warning("Pillow yüklü değil, küçük resim üretilemedi.")
+        return {}
+    boyutlar = sorted(boyutlar or config.KUCUK_RESIM_BOYUTLARI, reverse=True)
+    try:
+        resim = Image.open(BytesIO(fotograf))
+        resim.draft("RGB", (boyutlar[0], boyutlar[0]))
+        resim = ImageOps.exif_transpose(resim)
+        if resim.mode in ("RGBA", "LA", "P"):
+            resim = resim.convert("RGBA")
+            zemin = Image.new("RGB", resim.size, (255, 255, 255))
+            zemin.paste(resim, mask=resim.getchannel("A"))
+            resim = zemin
+        elif resim.mode != "RGB":
+            resim = resim.convert("RGB")
+        sonuc = {}
+        for boyut in boyutlar:
+            resim.thumbnail((boyut, boyut), Image.LANCZOS)
+            cikti = BytesIO()
+            resim.save(cikti, "JPEG", quality=config.KUCUK_RESIM_JPEG_KALITESI, optimize=True)
+            sonuc[boyut] = cikti.getvalue()
+        return sonuc
+    except Exception as e:
+        log.error("Küçük resim oluşturma hatası: %s", e)
+        return {}
+
+def uygun_boyut(istenen):
+    boyutlar = sorted(config.KUCUK_RESIM_BOYUTLARI)
+    for boyut in boyutlar:
+        if boyut >= istenen:
+            return boyut
+    return boyutlar[-1]
+
+class LRUOnbellek:
+    def __init__(self, kapasite):
+        self.kapasite = kapasite
+        self._veri = OrderedDict()
+        self._kilit = threading.Lock()
+
+    def get(self, anahtar):
+        with self._kilit:
+            deger = self._veri.get(anahtar)
+            if deger is not None:
+                self._veri.move_to_end(anahtar)
+            return deger
+
+    def put(self, anahtar, deger):
+        with self._kilit:
+            self._veri[anahtar] = deger
+            self._veri.move_to_end(anahtar)
+            while len(self._veri) > self.kapasite:
+                self._veri.popitem(last=False)
+
+    def discard(self, ilk_anahtar):
+        with self._kilit:
+            for anahtar in [a for a in self._veri if a[0] == ilk_anahtar]:
+                del self._veri[anahtar]
+
+    def clear(self):
+        with self._kilit:
+            self._veri.clear()
+
+onbellek = LRUOnbellek(config.KUCUK_RESIM_ONBELLEK_ADEDI)
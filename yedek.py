@@ -0,0 +1,258 @@
+import os
+import re
+import sys
+import gzip
+import time
+import shutil
+import pathlib
+import sqlite3
+import datetime
+import threading
+
+import config
+import database
+import gunluk
+
+# Uygulama açıkken çevrimiçi yedek: sqlite3 backup API'si ile tutarlı anlık görüntü.
+#
+#   rapor = yedek.yedekle()                  -> yedekler/erp_database-20240301-020000.db.gz
+#   yedek.dogrula("yedekler/erp_database-20240301-020000.db.gz")
+#
+#   python yedek.py [--db erp_database.db] [--klasor yedekler] [--saklama 7]
+#   python yedek.py --listele | --dogrula DOSYA
+#
+# Sayfalar YEDEK_SAYFA_ADIMI'lık adımlarla kopyalanır ve adımlar arasında
+# YEDEK_ADIM_BEKLEME_MS beklenir; yazmalar hiçbir zaman yedeğin bitmesini beklemez.
+# WAL kipinde kaynakta tek bir okuma işlemi açık tutulur: yedek, başladığı andaki
+# veritabanıdır ve araya giren yazmalar kopyalamayı baştan başlatmaz (yedek sürerken
+# WAL dosyası checkpoint edilemediği için büyür). Kopya önce .tmp dosyasına yazılır,
+# PRAGMA quick_check ile açılıp denetlenir, sonra gzip ile sıkıştırılıp yerine taşınır.
+# Klasörde en yeni YEDEK_SAKLAMA_ADEDI yedek tutulur, eskileri silinir.
+# Fotoğraflar fotograflar tablosundadır; yedeğe dahildir.
+
+log = gunluk.kaydedici(__name__)
+
+_ZAMAN_BICIMI = "%Y%m%d-%H%M%S"
+_calisiyor = threading.Lock()
+
+def yedek_klasoru(yol=None):
+    if config.YEDEK_KLASORU:
+        return config.YEDEK_KLASORU
+    return os.path.join(os.path.dirname(os.path.abspath(yol or database.DB_PATH)), "yedekler")
+
+def _yedek_deseni(yol):
+    kok = os.path.splitext(os.path.basename(yol))[0]
+    return re.compile(re.escape(kok) + r"-(\d{8}-\d{6})\.db(\.gz)?$")
+
+def yedekler(yol=None, klasor=None):
+    """Klasördeki yedekler, en yenisi önce: [{'dosya', 'zaman', 'bayt'}]."""
+    yol = yol or database.DB_PATH
+    klasor = klasor or yedek_klasoru(yol)
+    if not os.path.isdir(klasor):
+        return []
+    desen = _yedek_deseni(yol)
+    liste = []
+    for ad in os.listdir(klasor):
+        eslesme = desen.match(ad)
+        if eslesme:
+            dosya = os.path.join(klasor, ad)
+            liste.append({'dosya': dosya, 'bayt': os.path.getsize(dosya),
+                          'zaman': datetime.datetime.strptime(eslesme.group(1), _ZAMAN_BICIMI)})
+    return sorted(liste, key=lambda y: y['zaman'], reverse=True)
+
+def _eskileri_sil(yol, klasor, saklama):
+    silinen = []
+    for eski in yedekler(yol, klasor)[max(saklama, 1):]:
+        try:
+            os.remove(eski['dosya'])
+            silinen.append(eski['dosya'])
+        except OSError as e:
+            log.warning("Eski yedek silinemedi: %s (%s)", eski['dosya'], e)
+    return silinen
+
+def _hizli_denetim(dosya):
+    uri = pathlib.Path(os.path.abspath(dosya)).as_uri() + "?mode=ro"
+    conn = sqlite3.connect(uri, uri=True)
+    try:
+        sonuc = [row[0] for row in conn.execute("PRAGMA quick_check")]
+    finally:
+        conn.close()
+    return sonuc == ["ok"], sonuc
+
+def _kopyala(kaynak_yol, hedef_yol, sayfa_adimi, bekleme_ms):
+    kaynak = sqlite3.connect(kaynak_yol, isolation_level=None, timeout=config.SQLITE_BUSY_TIMEOUT_MS / 1000)
+    hedef = sqlite3.connect(hedef_yol, isolation_level=None)
+    adimlar = 0
+    sayfa = 0
+
+    def ilerleme(durum, kalan, toplam):
+        nonlocal adimlar, sayfa
+        adimlar += 1
+        sayfa = toplam
+        if kalan and bekleme_ms > 0:
+            time.sleep(bekleme_ms / 1000)
+
+    try:
+        wal = kaynak.execute("PRAGMA journal_mode").fetchone()[0].lower() == "wal"
+        if wal:
+            # Okuma işlemi kaynağın o anki görüntüsünü sabitler.
+            kaynak.execute("BEGIN")
+            kaynak.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+        kaynak.backup(hedef, pages=sayfa_adimi, progress=ilerleme)
+        if wal:
+            kaynak.execute("COMMIT")
+        # Kopya WAL başlığını da taşır; tek dosya olarak açılabilsin.
+        hedef.execute("PRAGMA journal_mode = DELETE")
+    finally:
+        hedef.close()
+        kaynak.close()
+    return sayfa, adimlar
+
+def _sikistir(kaynak, hedef):
+    with open(kaynak, "rb") as giris, gzip.open(hedef, "wb", compresslevel=config.YEDEK_GZIP_SEVIYESI) as cikis:
+        shutil.copyfileobj(giris, cikis, 1024 * 1024)
+
+def yedekle(yol=None, klasor=None, saklama=None, sikistir=None, sayfa_adimi=None, bekleme_ms=None):
+    """Veritabanını yedekler, doğrular, sıkıştırır ve eski yedekleri siler.
+
+    Dönüş: {'dosya', 'sayfa', 'adim', 'db_bayt', 'bayt', 'silinen', 'kopyalama_sn',
+    'sikistirma_sn', 'sure_sn', 'mb_sn'}; hata olursa ya da kopya denetimden
+    geçmezse None (yarım dosya kalmaz). Başka bir yedek sürüyorsa hemen None döner.
+    """
+    yol = yol or database.DB_PATH
+    klasor = klasor or yedek_klasoru(yol)
+    saklama = config.YEDEK_SAKLAMA_ADEDI if saklama is None else saklama
+    sikistir = config.YEDEK_SIKISTIR if sikistir is None else sikistir
+    sayfa_adimi = sayfa_adimi or config.YEDEK_SAYFA_ADIMI
+    bekleme_ms = config.YEDEK_ADIM_BEKLEME_MS if bekleme_ms is None else bekleme_ms
+    if not _calisiyor.acquire(blocking=False):
+        log.warning("Yedekleme zaten sürüyor.")
+        return None
+    kok = os.path.splitext(os.path.basename(yol))[0]
+    ad = f"{kok}-{datetime.datetime.now().strftime(_ZAMAN_BICIMI)}.db"
+    dosya = os.path.join(klasor, ad + (".gz" if sikistir else ""))
+    gecici = os.path.join(klasor, ad + ".tmp")
+    try:
+        os.makedirs(klasor, exist_ok=True)
+        t0 = time.perf_counter()
+        sayfa, adim = _kopyala(yol, gecici, sayfa_adimi, bekleme_ms)
+        t1 = time.perf_counter()
+        saglam, sonuc = _hizli_denetim(gecici)
+        if not saglam:
+            log.error("Yedek denetimden geçmedi: %s", "; ".join(sonuc[:5]))
+            return None
+        db_bayt = os.path.getsize(gecici)
+        t2 = time.perf_counter()
+        if sikistir:
+            _sikistir(gecici, gecici + ".gz")
+            os.replace(gecici + ".gz", dosya)
+            os.remove(gecici)
+        else:
+            os.replace(gecici, dosya)
+        t3 = time.perf_counter()
+        silinen = _eskileri_sil(yol, klasor, saklama)
+    except Exception as e:
+        log.error("Yedekleme hatası: %s", e)
+        return None
+    finally:
+        for artik in (gecici, gecici + ".gz"):
+            if os.path.exists(artik):
+                os.remove(artik)
+        _calisiyor.release()
+    sure = t3 - t0
+    rapor = {'dosya': dosya, 'sayfa': sayfa, 'adim': adim, 'db_bayt': db_bayt,
+             'bayt': os.path.getsize(dosya), 'silinen': silinen,
+             'kopyalama_sn': round(t1 - t0, 3), 'sikistirma_sn': round(t3 - t2, 3),
+             'sure_sn': round(sure, 3), 'mb_sn': round(db_bayt / 1e6 / sure, 1) if sure > 0 else 0}
+    log.info("Yedek alındı: %s (%s sayfa, %s bayt, %s sn, %s MB/sn)",
+             dosya, sayfa, rapor['bayt'], rapor['sure_sn'], rapor['mb_sn'])
+    return rapor
+
+def dogrula(dosya):
+    """Yedeği (gerekirse açıp) PRAGMA quick_check ile denetler.
+
+    Dönüş: {'dosya', 'saglam', 'sonuc', 'sure_sn'}; dosya okunamazsa None.
+    """
+    t0 = time.perf_counter()
+    gecici = None
+    try:
+        if dosya.endswith(".gz"):
+            gecici = dosya[:-3] + ".dogrula.tmp"
+            with gzip.open(dosya, "rb") as giris, open(gecici, "wb") as cikis:
+                shutil.copyfileobj(giris, cikis, 1024 * 1024)
+        saglam, sonuc = _hizli_denetim(gecici or dosya)
+    except (OSError, EOFError, sqlite3.Error) as e:
+        log.error("Yedek doğrulanamadı: %s (%s)", dosya, e)
+        return None
+    finally:
+        if gecici and os.path.exists(gecici):
+            os.remove(gecici)
+    if not saglam:
+        log.error("Yedek bozuk: %s", dosya)
+    return {'dosya': dosya, 'saglam': saglam, 'sonuc': sonuc, 'sure_sn': round(time.perf_counter() - t0, 3)}
+
+def yedek_gerekirse(yol=None):
+    """En yeni yedek YEDEK_ARALIK_SAAT'ten eskiyse (ya da hiç yoksa) yedek alır."""
+    if config.YEDEK_ARALIK_SAAT <= 0:
+        return None
+    liste = yedekler(yol)
+    if liste and datetime.datetime.now() - liste[0]['zaman'] < datetime.timedelta(hours=config.YEDEK_ARALIK_SAAT):
+        return None
+    return yedekle(yol)
+
+def arka_planda_yedek_gerekirse(yol=None):
+    """yedek_gerekirse'yi ayrı bir iş parçacığında çalıştırır.
+
+    db_worker'ın tek iş parçacığı yedek sürerken pencerelerin çağrılarını
+    bekletmesin diye ayrı iş parçacığı kullanılır.
+    """
+    if _calisiyor.locked():
+        return None
+    is_parcacigi = threading.Thread(target=yedek_gerekirse, args=(yol,), name="yedek", daemon=True)
+    is_parcacigi.start()
+    return is_parcacigi
+
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(description="ERP-APP çevrimiçi yedekleme")
+    ap.add_argument("--db", default=database.DB_PATH, help="Veritabanı dosyası")
+    ap.add_argument("--klasor", help="Yedek klasörü (varsayılan: veritabanının yanında yedekler/)")
+    ap.add_argument("--saklama", type=int, default=None, help="Tutulacak yedek sayısı")
+    ap.add_argument("--sikistirma-yok", action="store_true", help="Yedeği gzip ile sıkıştırma")
+    ap.add_argument("--adim", type=int, default=None, help="Adım başına kopyalanan sayfa")
+    ap.add_argument("--bekleme", type=int, default=None, help="Adımlar arası bekleme (ms)")
+    ap.add_argument("--listele", action="store_true", help="Mevcut yedekleri listele")
+    ap.add_argument("--dogrula", metavar="DOSYA", help="Bir yedeği quick_check ile denetle")
+    args = ap.parse_args()
+
+    if args.dogrula:
+        sonuc = dogrula(args.dogrula)
+        if sonuc is None:
+            return 1
+        print(f"{sonuc['dosya']}: {'sağlam' if sonuc['saglam'] else 'BOZUK'} ({sonuc['sure_sn']} sn)")
+        if not sonuc['saglam']:
+            for satir in "\n".join(sonuc['sonuc']).splitlines()[:20]:
+                print(f"  {satir}")
+        return 0 if sonuc['saglam'] else 1
+    if args.listele:
+        for y in yedekler(args.db, args.klasor):
+            print(f"{y['zaman']:%Y-%m-%d %H:%M:%S}  {y['bayt']:>14,}  {y['dosya']}")
+        return 0
+    if not os.path.exists(args.db):
+        print(f"Veritabanı bulunamadı: {args.db}", file=sys.stderr)
+        return 1
+    rapor = yedekle(args.db, args.klasor, args.saklama, False if args.sikistirma_yok else None,
+                    args.adim, args.bekleme)
+    if rapor is None:
+        print("Yedekleme başarısız.", file=sys.stderr)
+        return 1
+    print(f"{rapor['dosya']}: {rapor['sayfa']} sayfa / {rapor['adim']} adım, {rapor['db_bayt']:,} -> "
+          f"{rapor['bayt']:,} bayt; kopyalama {rapor['kopyalama_sn']} sn, sıkıştırma {rapor['sikistirma_sn']} sn, "
+          f"toplam {rapor['sure_sn']} sn ({rapor['mb_sn']} MB/sn)")
+    for eski in rapor['silinen']:
+        print(f"  silindi: {eski}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
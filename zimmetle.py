@@ -5,8 +5,24 @@ from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QPixmap, QFont
 from database import get_all_kisiler, add_sticker_stokkodlutablo, add_zimmetle_malzeme, get_kisi, get_stickers, delete_last_sticker_stokkodlutablo, update_kisi, delete_kisi_by_id, delete_last_zimmet
 from zimmetle_UI import Ui_MainWindow
-from zimmetleyeni import ZimmetleYeniWindow
 from database import add_kisi
+import db_worker
+import gunluk
+
+log = gunluk.kaydedici(__name__)
+
+def _sticker_olustur_ve_zimmetle(stokkodu, kisiisim, urun_isim):
+    stickers = add_sticker_stokkodlutablo(stokkodu, 1)
+    if not stickers:
+        return None, False
+    sticker_id = stickers[0]
+    return sticker_id, add_zimmetle_malzeme(kisiisim, sticker_id, urun_isim)
+
+def _son_zimmeti_sil(kisiisim, stokkodu):
+    result = delete_last_zimmet(kisiisim)
+    if result:
+        delete_last_sticker_stokkodlutablo(stokkodu)
+    return result
 
 class ZimmetleWindow(QMainWindow):
     def __init__(self, main_window, product):
@@ -42,8 +58,11 @@ class ZimmetleWindow(QMainWindow):
         self.ui.kisi_combobox.currentIndexChanged.connect(self.on_kisi_selected)
 
     def load_kisiler(self):
+        db_worker.calistir(get_all_kisiler, anahtar=f"kisiler_{id(self)}", basarili=self.fill_kisiler)
+
+    def fill_kisiler(self, kisiler):
         self.ui.kisi_combobox.clear()
-        self.kisiler = get_all_kisiler()
+        self.kisiler = kisiler
         for kisi in self.kisiler:
             display_name = kisi['kisiisim']
             self.ui.kisi_combobox.addItem(display_name)
@@ -78,19 +97,23 @@ class ZimmetleWindow(QMainWindow):
             
             selected_kisi = self.kisiler[self.selected_kisi_index]
             
-            result = update_kisi(selected_kisi['id'], yeni_isim, int(yeni_kat), yeni_sube)
-            if result:
-                print(f"Kişi bilgileri güncellendi: {yeni_isim}")
-            else:
-                print(f"Kişi bilgileri güncellenemedi: {yeni_isim}")
+            def guncellendi(result):
+                if result:
+                    log.debug("Kişi bilgileri güncellendi: %s", yeni_isim)
+                else:
+                    log.warning("Kişi bilgileri güncellenemedi: %s", yeni_isim)
+                self.load_kisiler()
+            db_worker.calistir(update_kisi, selected_kisi['id'], yeni_isim, int(yeni_kat), yeni_sube,
+                               basarili=guncellendi)
         else:
-            kisi_id = add_kisi(yeni_isim, int(yeni_kat), yeni_sube)
-            if kisi_id != -1:
-                print(f"Yeni kişi eklendi: {yeni_isim}")
-            else:
-                print(f"Kişi eklenemedi: {yeni_isim}")
+            def eklendi(kisi_id):
+                if kisi_id != -1:
+                    log.debug("Yeni kişi eklendi: %s", yeni_isim)
+                else:
+                    log.warning("Kişi eklenemedi: %s", yeni_isim)
+                self.load_kisiler()
+            db_worker.calistir(add_kisi, yeni_isim, int(yeni_kat), yeni_sube, basarili=eklendi)
         
-        self.load_kisiler()
         self.ui.sahisisim_text.clear()
         self.selected_kisi_index = -1
         
@@ -102,18 +125,15 @@ class ZimmetleWindow(QMainWindow):
             
         selected_kisi = self.kisiler[self.selected_kisi_index]
 
-        print(f"Kişi siliniyor: ID={selected_kisi['id']}, İsim={selected_kisi['kisiisim']}")
-        result = delete_kisi_by_id(selected_kisi['id'], selected_kisi['kisiisim'])
+        log.debug("Kişi siliniyor: ID=%s, İsim=%s", selected_kisi['id'], selected_kisi['kisiisim'])
         
-        if result:
-            print(f"Kişi başarıyla silindi: {selected_kisi['kisiisim']}")
-            self.load_kisiler()
-            self.ui.sahisisim_text.clear()
-            self.selected_kisi_index = -1
-        else:
-            print(f"Kişi silme işlemi başarısız: {selected_kisi['kisiisim']}")
-            
-        self.refresh_ui()
+        def silindi(result):
+            if result:
+                log.debug("Kişi başarıyla silindi: %s", selected_kisi['kisiisim'])
+            else:
+                log.warning("Kişi silme işlemi başarısız: %s", selected_kisi['kisiisim'])
+            self.refresh_ui()
+        db_worker.calistir(delete_kisi_by_id, selected_kisi['id'], selected_kisi['kisiisim'], basarili=silindi)
 
     def zimmetle(self):
         selected_index = self.ui.kisi_combobox.currentIndex()
@@ -133,13 +153,14 @@ class ZimmetleWindow(QMainWindow):
                 
         if not selected_kisi:
             return
-            
-        stickers = add_sticker_stokkodlutablo(self.product['stokkodu'], 1)
-        if not stickers:
+        
+        db_worker.calistir(_sticker_olustur_ve_zimmetle, self.product['stokkodu'], selected_kisi['kisiisim'],
+                           self.product['isim'],
+                           basarili=lambda sonuc: self.show_zimmet_result(sonuc[0], sonuc[1], selected_kisi_name))
+
+    def show_zimmet_result(self, sticker_id, result, selected_kisi_name):
+        if not sticker_id:
             return
-            
-        sticker_id = stickers[0]
-        result = add_zimmetle_malzeme(selected_kisi['kisiisim'], sticker_id, self.product['isim'])
         
         if result:
             self.current_sticker_id = sticker_id
@@ -153,9 +174,9 @@ class ZimmetleWindow(QMainWindow):
             scene.addItem(text_item)
             self.ui.stickerview.setScene(scene)
             
-            print(f"Zimmetleme başarılı: {sticker_id} -> {selected_kisi_name}")
+            log.debug("Zimmetleme başarılı: %s -> %s", sticker_id, selected_kisi_name)
         else:
-            print(f"Zimmetleme başarısız: {sticker_id} -> {selected_kisi_name}")
+            log.warning("Zimmetleme başarısız: %s -> %s", sticker_id, selected_kisi_name)
 
     def delete_last_zimmet_clicked(self):
         selected_index = self.ui.kisi_combobox.currentIndex()
@@ -173,12 +194,12 @@ class ZimmetleWindow(QMainWindow):
                 
         if not selected_kisi:
             return
-            
-        result = delete_last_zimmet(selected_kisi['kisiisim'])
-        if result:
+        
+        db_worker.calistir(_son_zimmeti_sil, selected_kisi['kisiisim'], self.product['stokkodu'],
+                           basarili=lambda result: self.show_delete_result(result, selected_kisi_name))
 
-            sticker_id = delete_last_sticker_stokkodlutablo(self.product['stokkodu'])
-            
+    def show_delete_result(self, result, selected_kisi_name):
+        if result:
             self.ui.stickerview.setScene(None)
             self.current_sticker_id = result
             scene = QGraphicsScene()
@@ -190,9 +211,9 @@ class ZimmetleWindow(QMainWindow):
             scene.addItem(text_item)
             self.ui.stickerview.setScene(scene)
             
-            print(f"Son zimmet silindi: {result}, ID tekrar kullanılabilir")
+            log.debug("Son zimmet silindi: %s, ID tekrar kullanılabilir", result)
         else:
-            print(f"Son zimmet silme başarısız: {selected_kisi_name}")
+            log.warning("Son zimmet silme başarısız: %s", selected_kisi_name)
 
     def open_zimmetleyeni(self):
         if not self.product:
@@ -200,6 +221,7 @@ class ZimmetleWindow(QMainWindow):
             
         sticker_id = self.current_sticker_id
         
+        from zimmetleyeni import ZimmetleYeniWindow
         self.yeni_window = ZimmetleYeniWindow(self, sticker_id, self.product['isim'], self.product['stokkodu'])
         self.yeni_window.show()
         self.hide()
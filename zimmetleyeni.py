@@ -1,11 +1,24 @@
 import os
-import sqlite3
 import sys
 from PyQt5.QtWidgets import QMainWindow, QGraphicsScene, QGraphicsTextItem
 from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QPixmap, QFont
-from database import get_all_kisiler, get_stickers, update_varolana_yenizimmet
+from database import get_all_kisiler, get_stickers, update_varolana_yenizimmet, get_sticker_sahibi
 from zimmetleyeni_UI import Ui_MainWindow
+import db_worker
+import gunluk
+
+log = gunluk.kaydedici(__name__)
+
+def _zimmet_aktar(sticker_id, kisi_id):
+    # Liste referans önbelleğinden gelir; isim pencere açıldıktan sonra değişmiş olabilir.
+    selected_kisi = next((kisi for kisi in get_all_kisiler() if kisi['id'] == kisi_id), None)
+    if not selected_kisi:
+        return None
+    sahip = get_sticker_sahibi(sticker_id)
+    mevcut_kisi = sahip['kisiisim'] if sahip else None
+    result = update_varolana_yenizimmet(sticker_id, selected_kisi['kisiisim'])
+    return mevcut_kisi, selected_kisi['kisiisim'], result
 
 class ZimmetleYeniWindow(QMainWindow):
     def __init__(self, zimmetle_window, sticker_id=None, urun_isim=None, stokkodu=None):
@@ -31,8 +44,10 @@ class ZimmetleYeniWindow(QMainWindow):
         self.ui.zimmetlekaydetyeni_button.clicked.connect(self.transfer_zimmet)
 
     def load_kisiler(self):
+        db_worker.calistir(get_all_kisiler, anahtar=f"kisiler_{id(self)}", basarili=self.fill_kisiler)
+
+    def fill_kisiler(self, kisiler):
         self.ui.yenizimmetle.clear()
-        kisiler = get_all_kisiler()
         for kisi in kisiler:
             display_name = kisi['kisiisim']
             self.ui.yenizimmetle.addItem(display_name)
@@ -41,14 +56,17 @@ class ZimmetleYeniWindow(QMainWindow):
     def load_sticker_ids(self):
         self.ui.stickerid_combobox.setEditable(True)
         if self.stokkodu:
-            stickers = get_stickers(self.stokkodu)
-            sticker_ids = [s['stickerkod'] for s in stickers]
-            self.ui.stickerid_combobox.clear()
-            self.ui.stickerid_combobox.addItems(sticker_ids)
-            
-            if self.sticker_id and self.sticker_id in sticker_ids:
-                index = sticker_ids.index(self.sticker_id)
-                self.ui.stickerid_combobox.setCurrentIndex(index)
+            db_worker.calistir(get_stickers, self.stokkodu, anahtar=f"stickerlar_{id(self)}",
+                               basarili=self.fill_sticker_ids)
+
+    def fill_sticker_ids(self, stickers):
+        sticker_ids = [s['stickerkod'] for s in stickers]
+        self.ui.stickerid_combobox.clear()
+        self.ui.stickerid_combobox.addItems(sticker_ids)
+        
+        if self.sticker_id and self.sticker_id in sticker_ids:
+            index = sticker_ids.index(self.sticker_id)
+            self.ui.stickerid_combobox.setCurrentIndex(index)
 
     def transfer_zimmet(self):
         selected_index = self.ui.yenizimmetle.currentIndex()
@@ -57,53 +75,28 @@ class ZimmetleYeniWindow(QMainWindow):
             
         selected_kisi_id = self.ui.yenizimmetle.itemData(selected_index)
         selected_kisi_name = self.ui.yenizimmetle.currentText()
-        kisiler = get_all_kisiler()
-        selected_kisi = None
-        for kisi in kisiler:
-            if kisi['id'] == selected_kisi_id:
-                selected_kisi = kisi
-                break
-                
-        if not selected_kisi:
-            return
-            
         sticker_id = self.ui.stickerid_combobox.currentText()
         
         if not sticker_id:
             return
         
+        db_worker.calistir(_zimmet_aktar, sticker_id, selected_kisi_id,
+                           basarili=lambda sonuc: self.show_transfer_result(sticker_id, selected_kisi_name, sonuc))
+
+    def show_transfer_result(self, sticker_id, selected_kisi_name, sonuc):
+        if not sonuc:
+            return
+        mevcut_kisi, yeni_kisi, result = sonuc
+        mevcut_kisi_display = mevcut_kisi
         
-        conn = sqlite3.connect('erp_database.db')
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        tum_kisiler = get_all_kisiler()
-        sticker_bulundu = False
-        mevcut_kisi = None
-        mevcut_kisi_display = None
-        
-        for kisi in tum_kisiler:
-            kisi_tablo_adi = f"{kisi['kisiisim']}_malzemeleri".replace(' ', '').lower()
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (kisi_tablo_adi,))
-            if cursor.fetchone():
-                cursor.execute(f'SELECT stickerid FROM "{kisi_tablo_adi}" WHERE stickerid = ?', (sticker_id,))
-                if cursor.fetchone():
-                    sticker_bulundu = True
-                    mevcut_kisi = kisi['kisiisim']
-                    mevcut_kisi_display = kisi['kisiisim']
-                    break
-        
-        conn.close()
-        if sticker_bulundu and mevcut_kisi:
-            result = update_varolana_yenizimmet(sticker_id, selected_kisi['kisiisim'])
+        if mevcut_kisi:
             if result:
                 self.ui.yenizimmetbilgi_text.setText(f"Transfer: {sticker_id}\n{mevcut_kisi_display} -> {selected_kisi_name}")
-                print(f"Sticker {sticker_id} {mevcut_kisi}'den {selected_kisi['kisiisim']}'e transfer edildi.")
+                log.debug("Sticker %s %s'den %s'e transfer edildi.", sticker_id, mevcut_kisi, yeni_kisi)
         else:
-            result = update_varolana_yenizimmet(sticker_id, selected_kisi['kisiisim'])
             if result:
                 self.ui.yenizimmetbilgi_text.setText(f"Zimmetlendi: {sticker_id}\n-> {selected_kisi_name}")
-                print(f"Boşta olan sticker {sticker_id} {selected_kisi['kisiisim']}'e zimmetlendi.")
+                log.debug("Boşta olan sticker %s %s'e zimmetlendi.", sticker_id, yeni_kisi)
         
 
     def go_back(self):